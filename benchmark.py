@@ -0,0 +1,220 @@
+"""Offscreen benchmarks of widget construction, toml load/save and queue switching.
+
+Run from the repo root, on a headless box too, results go to a json file that
+can be compared between commits:
+
+    python benchmark.py
+    python benchmark.py --output before.json --repeat 10 --only toml
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SUBSET_COUNTS = (1, 50, 500)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="LoRA Easy Training Scripts ui benchmarks")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="json file to write (default: benchmark_results/<commit>.json)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed runs of each benchmark (default: 5)"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="TEXT",
+        help="only run the benchmarks whose name contains TEXT, can be given several times",
+    )
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_subsets(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"concept{i}",
+            "image_dir": f"/datasets/{i % 10 + 1}_concept{i}",
+            "num_repeats": i % 10 + 1,
+            "caption_extension": ".txt",
+            "shuffle_caption": True,
+            "keep_tokens": 1,
+            "flip_aug": bool(i % 2),
+            "caption_dropout_rate": 0.05,
+        }
+        for i in range(count)
+    ]
+
+
+class Bench(object):
+    """Times callables and collects the results by name."""
+
+    def __init__(self, app, repeat: int, only: list[str]) -> None:
+        self.app = app
+        self.repeat = repeat
+        self.only = only
+        self.results = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.only or any(text in name for text in self.only)
+
+    def run(self, name: str, func, teardown=None) -> None:
+        if not self.wanted(name):
+            return
+        times = []
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            result = func()
+            # deferred layout and deleteLater work belongs to the operation
+            self.app.processEvents()
+            times.append(time.perf_counter() - start)
+            if teardown:
+                teardown(result)
+                self.app.processEvents()
+        self.results[name] = {
+            "runs": len(times),
+            "min_ms": round(min(times) * 1000, 3),
+            "median_ms": round(statistics.median(times) * 1000, 3),
+            "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        }
+        print(f"{name:<48} {self.results[name]['median_ms']:>10.2f} ms")
+
+
+def discard(widget) -> None:
+    widget.deleteLater()
+
+
+def bench_construction(bench: Bench) -> None:
+    from main_ui_files.ArgsListUI import ArgsWidget
+    from main_ui_files.MainUI import MainWidget
+    from main_ui_files.SubsetListUI import SubsetListWidget
+    from modules.BaseWidget import BaseWidget
+
+    for widget_class in sorted(BaseWidget.__subclasses__(), key=lambda x: x.__name__):
+        bench.run(f"construct/{widget_class.__name__}", widget_class, teardown=discard)
+    bench.run("construct/ArgsWidget", ArgsWidget, teardown=discard)
+    bench.run("construct/SubsetListWidget", SubsetListWidget, teardown=discard)
+    bench.run("construct/MainWidget", MainWidget, teardown=discard)
+
+
+def bench_args(bench: Bench, main_widget) -> None:
+    bench.run("args/ArgsWidget.get_args", main_widget.args_widget.get_args)
+
+
+def bench_toml(bench: Bench, main_widget, folder: Path) -> None:
+    for count in SUBSET_COUNTS:
+        toml_file = folder / f"subsets_{count}.toml"
+        main_widget.subset_widget.load_dataset_args({"subsets": make_subsets(count)})
+        main_widget.save_toml(toml_file)
+        bench.run(f"toml/save_toml/{count}_subsets", lambda: main_widget.save_toml(toml_file))
+        bench.run(f"toml/load_toml/{count}_subsets", lambda: main_widget.load_toml(toml_file))
+        bench.run(
+            f"toml/round_trip/{count}_subsets",
+            lambda: (main_widget.save_toml(toml_file), main_widget.load_toml(toml_file)),
+        )
+
+
+def bench_queue(bench: Bench, main_widget) -> None:
+    queue = main_widget.queue_widget
+    for count in (1, 50):
+        main_widget.subset_widget.load_dataset_args({"subsets": make_subsets(count)})
+        queue.add_to_queue()
+        first = queue.selected
+        other = copy.deepcopy(make_subsets(count))
+        for subset in other:
+            subset["num_repeats"] += 1
+        main_widget.subset_widget.load_dataset_args({"subsets": other})
+        queue.add_to_queue()
+        second = queue.selected
+
+        def switch() -> None:
+            queue.update_selected(first if queue.selected is second else second)
+
+        bench.run(f"queue/switch/{count}_subsets", switch)
+        for item in (first, second):
+            queue.select(item)
+            queue.remove_from_queue()
+
+
+def bench_block_presets(bench: Bench, main_widget) -> None:
+    network_widget = main_widget.args_widget.network_widget
+    network_widget.ensure_built()
+    for _, block_widget in network_widget.block_widgets:
+        if not getattr(block_widget, "presets", None):
+            continue
+        preset_count = block_widget.up_preset.count()
+
+        def apply_presets(block_widget=block_widget, preset_count=preset_count) -> None:
+            for index in range(preset_count):
+                block_widget.modify_values(index, True)
+                block_widget.modify_values(index, False)
+
+        arg_name = block_widget.arg_name or "block_weights"
+        bench.run(f"block_weights/presets/{arg_name}", apply_presets)
+
+
+def main() -> None:
+    cli_args = parse_args()
+    output = cli_args.output.resolve() if cli_args.output else None
+    # icons, css and the block weight presets are looked up relative to the repo
+    os.chdir(Path(__file__).parent)
+    from PySide6 import QtWidgets
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    from main_ui_files.MainUI import MainWidget
+
+    bench = Bench(app, max(cli_args.repeat, 1), cli_args.only)
+    bench_construction(bench)
+    main_widget = MainWidget()
+    with tempfile.TemporaryDirectory() as folder:
+        bench_args(bench, main_widget)
+        bench_toml(bench, main_widget, Path(folder))
+        bench_queue(bench, main_widget)
+        bench_block_presets(bench, main_widget)
+
+    from PySide6 import __version__ as pyside_version
+
+    commit = git_commit()
+    output = output or Path("benchmark_results", f"{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside6": pyside_version,
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "repeat": bench.repeat,
+        "results": bench.results,
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,13 @@
+import argparse
 import contextlib
 from pathlib import Path
 import sys
-import json
 from threading import Thread
 
-from PySide6 import QtWidgets
-from qt_material import apply_stylesheet
-import requests
-from main_ui_files.MainWindow import MainWindow
+from modules.StartupProfiler import StartupProfiler
+from modules.BackendClient import BackendClient
+from modules.ConfigStore import ConfigStore
 import subprocess
-import time
 
 
 def run_backend():
@@ -33,20 +31,76 @@ def CreateConfig():
     }
 
 
+def parse_args() -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(description="LoRA Easy Training Scripts")
+    parser.add_argument(
+        "--profile-startup",
+        nargs="?",
+        const="startup_profile.json",
+        default=None,
+        metavar="REPORT",
+        help="time each startup phase and write a json trace to REPORT",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run a queue against the backend without the ui, the exit code reports the result",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        default=Path("queue_store"),
+        help="toml file or folder of tomls to run with --headless, in file name order (default: queue_store)",
+    )
+    parser.add_argument(
+        "--backend",
+        default=None,
+        metavar="URL",
+        help="backend url for --headless (default: backend_url from config.json)",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="with --headless, continue with the next item after a failed one",
+    )
+    return parser.parse_known_args()
+
+
+def run_headless(cli_args: argparse.Namespace) -> int:
+    from modules.HeadlessRunner import run_queue
+
+    url = cli_args.backend or ConfigStore().get("backend_url", "http://127.0.0.1:8000")
+    return run_queue(cli_args.queue, url.rstrip("/"), keep_going=cli_args.keep_going)
+
+
 def main() -> None:
+    cli_args, qt_args = parse_args()
+    if cli_args.headless:
+        sys.exit(run_headless(cli_args))
+    # the ui is only imported here, --headless must not load Qt
+    from PySide6 import QtWidgets
+    from main_ui_files.MainWindow import MainWindow
+    from modules.ThemeCache import apply_cached_stylesheet
+
+    profiler = StartupProfiler()
+    if cli_args.profile_startup:
+        profiler.enable(cli_args.profile_startup)
+    else:
+        profiler.enable_from_env()
     queue_store = Path("queue_store")
     if not queue_store.exists():
         queue_store.mkdir()
-    config = Path("config.json")
-    config_dict = json.loads(config.read_text()) if config.exists() else CreateConfig()
-    if "theme" not in config_dict:
-        config_dict.update(CreateConfig())
-    config.write_text(json.dumps(config_dict, indent=2))
+    with profiler.phase("config.json read"):
+        config = ConfigStore()
+        if "theme" not in config:
+            config.update(CreateConfig())
+        config_dict = config.snapshot()
     backend_thread = None
     if "run_local" in config_dict and config_dict["run_local"]:
         backend_thread = Thread(target=run_backend, daemon=True)
         backend_thread.start()
-    app = QtWidgets.QApplication(sys.argv)
+    with profiler.phase("QApplication"):
+        app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     if config_dict["theme"]["location"]:
         density = config_dict["theme"].get("density_scale", "0")
         extra = {'density_scale': density} if density != "0" else {}
@@ -55,24 +109,30 @@ def main() -> None:
         if density == "-2":
             extra['font_size'] = '15px'
 
-        apply_stylesheet(
-            app,
-            theme=config_dict["theme"]["location"],
-            invert_secondary=config_dict["theme"]["is_light"],
-            extra=extra
-        )
+        with profiler.phase("apply_stylesheet"):
+            apply_cached_stylesheet(
+                app,
+                theme=config_dict["theme"]["location"],
+                invert_secondary=config_dict["theme"]["is_light"],
+                extra=extra
+            )
 
-    window = MainWindow(app)
+    with profiler.phase("MainWindow.__init__"):
+        window = MainWindow(app)
     window.setWindowTitle("LoRA Trainer - 67372a Fork - Refresh Branch")
+    profiler.watch_first_paint(window)
     window.show()
     app.exec()
-    config_dict = json.loads(config.read_text())
-    if not config_dict.get("run_local"):
+    config.flush()
+    controller = window.main_widget.training_controller
+    if controller:
+        # the thread has to end before Qt tears it down, the run it is on is left to finish
+        print("Waiting for the current training run to finish, the rest of the queue will not start.")
+        controller.cancel()
+        controller.wait_finished(app)
+    if not config.get("run_local"):
         return
-    if window.main_widget.training_thread:
-        while window.main_widget.training_thread.is_alive():
-            time.sleep(5.0)
-    requests.get(f"{window.main_widget.backend_url_input.text()}/stop_server")
+    BackendClient().get(config.get("backend_url", "http://127.0.0.1:8000"), "/stop_server")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,7 @@
-import json
-from pathlib import Path
-
 from PySide6.QtWidgets import QWidget
 from ui_files.AccelerateUI import Ui_accelerate_ui
 from modules.BaseWidget import BaseWidget
+from modules.ConfigStore import ConfigStore
 
 
 class AccelerateWidget(BaseWidget):
@@ -57,20 +55,14 @@ class AccelerateWidget(BaseWidget):
 
     def save_to_config(self) -> None:
         """Persist accelerate settings to config.json."""
-        config_path = Path("config.json")
-        config_dict = json.loads(config_path.read_text()) if config_path.exists() else {}
-        config_dict["accelerate"] = self.get_accelerate_settings()
-        config_path.write_text(json.dumps(config_dict, indent=2))
+        ConfigStore().set("accelerate", self.get_accelerate_settings())
 
     def load_from_config(self) -> None:
         """Load accelerate settings from config.json."""
-        config_path = Path("config.json")
-        if not config_path.exists():
+        accel = ConfigStore().get("accelerate")
+        if accel is None:
             return
 
-        config_dict = json.loads(config_path.read_text())
-        accel = config_dict.get("accelerate", {})
-
         self.widget.accelerate_group.setChecked(accel.get("enabled", self.CONFIG_DEFAULTS["enabled"]))
         self.widget.num_processes_input.setValue(accel.get("num_processes", self.CONFIG_DEFAULTS["num_processes"]))
         self.widget.main_process_port_input.setValue(accel.get("main_process_port", self.CONFIG_DEFAULTS["main_process_port"]))
@@ -16,6 +16,8 @@ from main_ui_files.TextualInversionUI import TextualInversionWidget
 from main_ui_files.EDMLossUI import EDMLossWidget  # Add this import
 from main_ui_files.ExtraArgsUI import ExtraArgsWidget
 from modules.BaseWidget import BaseWidget
+from modules.StartupProfiler import StartupProfiler
+from modules.ConfigStore import ConfigStore
 
 
 class ArgsWidget(QtWidgets.QWidget):
@@ -29,12 +31,15 @@ class ArgsWidget(QtWidgets.QWidget):
         self.scroll_area = QtWidgets.QScrollArea()
         self.scroll_widget = QtWidgets.QWidget()
         self.args_widget_array: list[BaseWidget] = []
-        self.network_widget = NetworkWidget()
-        self.optimizer_widget = OptimizerWidget()
-        self.ti_widget = TextualInversionWidget()
+        # collapsed sections only build their ui on first expand
+        self.lazy = bool(ConfigStore().get("lazy_sections", False))
+        self.network_widget = self.new_section(NetworkWidget, lazy=self.lazy)
+        self.optimizer_widget = self.new_section(OptimizerWidget, lazy=self.lazy)
+        self.ti_widget = self.new_section(TextualInversionWidget, lazy=self.lazy)
         self.ti_widget.setVisible(False)
-        self.flux_widget = FluxWidget()
-        self.anima_widget = AnimaWidget()
+        self.bucket_widget = self.new_section(BucketWidget, lazy=self.lazy)
+        self.flux_widget = self.new_section(FluxWidget)
+        self.anima_widget = self.new_section(AnimaWidget)
 
 
         self.setup_widget()
@@ -51,8 +56,14 @@ class ArgsWidget(QtWidgets.QWidget):
         self.scroll_area.setWidget(self.scroll_widget)
         self.layout().addWidget(self.scroll_area)
 
+    @staticmethod
+    def new_section(widget_class: type[BaseWidget], **kwargs) -> BaseWidget:
+        with StartupProfiler().phase(widget_class.__name__):
+            return widget_class(**kwargs)
+
     def setup_args_widgets(self) -> None:
-        general_args = GeneralWidget()
+        general_args = self.new_section(GeneralWidget)
+        self.general_widget = general_args
         general_args.colap.toggle_collapsed()
         general_args.colap.title_frame.setChecked(True)
         general_args.sdxlChecked.connect(lambda x: self.sdxlChecked.emit(x))
@@ -95,11 +106,11 @@ class ArgsWidget(QtWidgets.QWidget):
         self.args_widget_array.append(self.network_widget)
         self.args_widget_array.append(self.ti_widget)
         self.args_widget_array.append(self.optimizer_widget)
-        self.args_widget_array.append(SavingWidget())
-        self.args_widget_array.append(BucketWidget())
-        self.args_widget_array.append(NoiseOffsetWidget())
-        self.args_widget_array.append(SampleWidget())
-        self.args_widget_array.append(LoggingWidget())
+        self.args_widget_array.append(self.new_section(SavingWidget, lazy=self.lazy))
+        self.args_widget_array.append(self.bucket_widget)
+        self.args_widget_array.append(self.new_section(NoiseOffsetWidget, lazy=self.lazy))
+        self.args_widget_array.append(self.new_section(SampleWidget, lazy=self.lazy))
+        self.args_widget_array.append(self.new_section(LoggingWidget, lazy=self.lazy))
         self.args_widget_array.append(self.flux_widget)
         self.args_widget_array.append(self.anima_widget)
         
@@ -144,10 +155,10 @@ class ArgsWidget(QtWidgets.QWidget):
         general_args.widget.v_param_enable.clicked.connect(lambda _: refresh_anima_disabled_state())
         self.flux_widget.Toggled.connect(lambda _: refresh_anima_disabled_state())
 
-        self.args_widget_array.append(EDMLossWidget())
-        self.accelerate_widget = AccelerateWidget()
+        self.args_widget_array.append(self.new_section(EDMLossWidget, lazy=self.lazy))
+        self.accelerate_widget = self.new_section(AccelerateWidget)
         self.args_widget_array.append(self.accelerate_widget)
-        self.args_widget_array.append(ExtraArgsWidget())
+        self.args_widget_array.append(self.new_section(ExtraArgsWidget, lazy=self.lazy))
 
         for widget in self.args_widget_array:
             if widget.name == "textual_inversion_args":
@@ -213,5 +224,8 @@ class ArgsWidget(QtWidgets.QWidget):
 
     def load_args(self, args: dict, dataset_args: dict) -> None:
         for widget in self.args_widget_array:
+            if not widget.is_built:
+                widget.load_unbuilt_args(args, dataset_args)
+                continue
             widget.load_args(args)
             widget.load_dataset_args(dataset_args)
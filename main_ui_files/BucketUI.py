@@ -1,23 +1,39 @@
-from PySide6.QtWidgets import QWidget
+import copy
+from threading import Thread
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QTableWidgetItem, QHeaderView
 from ui_files.BucketUI import Ui_bucket_ui
 from modules.BaseWidget import BaseWidget
+from modules.BucketSimulator import BucketPreview, simulate
 
 
 class BucketWidget(BaseWidget):
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    # the subsets, resolution and batch size live elsewhere, whoever has them calls run_preview
+    previewRequested = Signal()
+    previewFinished = Signal(object)
+
+    DATASET_DEFAULTS = {
+        "enable_bucket": True,
+        "min_bucket_reso": 256,
+        "max_bucket_reso": 3072,
+        "bucket_reso_steps": 64,
+    }
+
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Bucket Args")
         self.widget = Ui_bucket_ui()
 
         self.name = "bucket_args"
-        self.dataset_args = {}
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
         self.widget.setupUi(self.content)
+        self.widget.preview_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
         # Populate dataset_args with initial widget values
         self.enable_disable(self.widget.bucket_group.isChecked())
 
@@ -34,6 +50,8 @@ class BucketWidget(BaseWidget):
             lambda x: self.edit_dataset_args("bucket_reso_steps", x)
         )
         self.widget.bucket_group.clicked.connect(self.enable_disable)
+        self.widget.preview_button.clicked.connect(self.previewRequested.emit)
+        self.previewFinished.connect(self.show_preview)
 
     def handle_no_upscale_clicked(self, checked: bool) -> None:
         self.edit_dataset_args("bucket_no_upscale", checked, True)
@@ -47,6 +65,59 @@ class BucketWidget(BaseWidget):
             self.widget.bucket_no_upscale.setChecked(False)
             self.edit_dataset_args("bucket_no_upscale", False, True)
 
+    def run_preview(self, subsets: list[dict], resolution: int | list[int], batch_size: int) -> None:
+        """Simulates the bucketing on a background thread, show_preview gets the result."""
+        self.widget.preview_button.setEnabled(False)
+        self.widget.preview_summary.setText("Reading image sizes...")
+        Thread(
+            target=self.preview_thread,
+            args=(copy.deepcopy(subsets), resolution, batch_size, copy.deepcopy(self.dataset_args)),
+            daemon=True,
+        ).start()
+
+    def preview_thread(self, subsets: list[dict], resolution, batch_size: int, bucket_args: dict) -> None:
+        try:
+            preview = simulate(subsets, resolution, batch_size, bucket_args)
+        except Exception as e:
+            preview = BucketPreview()
+            preview.warnings.append(f"preview failed: {e}")
+        self.previewFinished.emit(preview)
+
+    def show_preview(self, preview: BucketPreview) -> None:
+        self.widget.preview_button.setEnabled(True)
+        table = self.widget.preview_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(preview.buckets))
+        for row, ((width, height), values) in enumerate(preview.buckets.items()):
+            images, samples, batches, cropped, resized = values
+            # numbers stay numbers so the columns sort by value
+            cells = [
+                f"{width}x{height}",
+                images,
+                samples,
+                batches,
+                f"{cropped / resized:.1%}" if resized else "",
+            ]
+            for column, value in enumerate(cells):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+        cropped = sum(values[3] for values in preview.buckets.values())
+        resized = sum(values[4] for values in preview.buckets.values())
+        lines = [
+            f"{preview.images:,} images"
+            + (f" and {preview.reg_images:,} regularization images" if preview.reg_images else "")
+            + f" in {len(preview.buckets)} buckets, {preview.samples:,} samples per epoch,"
+            f" {preview.batches:,} batches per epoch at batch size {preview.batch_size}.",
+        ]
+        if resized:
+            lines.append(f"{cropped / resized:.1%} of the resized pixels are cropped away.")
+        if preview.unreadable:
+            lines.append(f"{preview.unreadable:,} images could not be read and are left out.")
+        lines.extend(f"Warning: {warning}" for warning in preview.warnings)
+        self.widget.preview_summary.setText("\n".join(lines))
+
     def enable_disable(self, checked: bool) -> None:
         self.dataset_args = {}
         if not checked:
@@ -5,14 +5,20 @@ from PySide6.QtGui import QIcon
 from pathlib import Path
 
 class EDMLossWidget(BaseWidget):
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    DEFAULTS = {
+        "edm2_loss_weighting": False,
+    }
+
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("EDM² Loss Weighting")
         self.widget = Ui_edm_loss_UI()
         self.name = "edm_loss_args"
         
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
+
+    def build_content(self) -> None:
+        super().build_content()
         self.setup_defaults()
         
         # Initialize the UI state based on the checkbox
@@ -6,8 +6,8 @@ from modules.ExtraItem import ExtraItem
 
 
 class ExtraArgsWidget(BaseWidget):
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Extra Args")
         self.widget = Ui_extra_fields_ui()
 
@@ -16,8 +16,7 @@ class ExtraArgsWidget(BaseWidget):
         self.dataset_args = {}
         self.extra_args: list[ExtraItem] = []
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
@@ -334,6 +334,12 @@ class GeneralWidget(BaseWidget):
             return
         self.edit_args("protected_tags_file", self.widget.global_protected_tags_file_input.text(), optional=True)
 
+    def set_global_protected_tags_file(self, path: str) -> None:
+        """Same as enabling the global protected tags file and picking path."""
+        self.widget.global_protected_tags_file_enable.setChecked(True)
+        self.widget.global_protected_tags_file_input.setText(path)
+        self.enable_disable_global_protected_tags(True)
+
     def load_args(self, args: dict) -> bool:
         args = args.get(self.name, {})
 
@@ -14,15 +14,14 @@ class LoggingWidget(BaseWidget):
         "run_name_mode": "default",
     }
 
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Logging Args")
         self.widget = Ui_logging_ui()
 
         self.name = "logging_args"
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
@@ -1,21 +1,18 @@
-import contextlib
-import json
-import os
 from PySide6 import QtWidgets
 from PySide6.QtWidgets import QWidget, QGridLayout, QPushButton
 from main_ui_files.ArgsListUI import ArgsWidget
 from main_ui_files.SubsetListUI import SubsetListWidget
-from modules import ScrollOnSelect, TomlFunctions
+from modules import ScrollOnSelect, TomlFunctions, TrainingJobs
 from modules.LineEditHighlight import LineEditWithHighlight
 from main_ui_files.QueueUI import QueueWidget
-from modules.Enums import TrainingModes
+from modules.Enums import TrainingModes, TrainingStates
+from modules.StartupProfiler import StartupProfiler
+from modules.ConfigStore import ConfigStore
+from modules.TrainingController import TrainingController
+from modules.PathValidator import PathValidator
 from pathlib import Path
 from threading import Thread
 from PySide6.QtCore import Signal
-import requests
-from requests.exceptions import ConnectionError
-from time import sleep
-import shutil
 
 
 class MainWidget(QWidget):
@@ -24,7 +21,7 @@ class MainWidget(QWidget):
 
     def __init__(self, parent: QWidget = None) -> None:
         super().__init__(parent)
-        self.training_thread = None
+        self.training_controller: TrainingController | None = None
         self.main_layout = QGridLayout()
         self.args_widget = ArgsWidget()
         self.subset_widget = SubsetListWidget()
@@ -40,11 +37,12 @@ class MainWidget(QWidget):
     def setup_widget(self) -> None:
         self.setLayout(self.main_layout)
         self.layout().setContentsMargins(0, 0, 0, 0)
-        self.subset_widget.add_empty_subset("subset 1")
-        config = Path("config.json")
-        config_dict = json.loads(config.read_text()) if config.exists() else {}
-        self.backend_url_input.setText(config_dict.get("backend_url", "http://127.0.0.1:8000"))
-        self.backend_url_input.setPlaceholderText("Backend Server URL")
+        with StartupProfiler().phase("SubsetListWidget.add_empty_subset"):
+            self.subset_widget.add_empty_subset("subset 1")
+        config = ConfigStore()
+        urls = config.get("backend_urls") or [config.get("backend_url", "http://127.0.0.1:8000")]
+        self.backend_url_input.setText(", ".join(urls))
+        self.backend_url_input.setPlaceholderText("Backend Server URL, comma separate several to share the queue")
         self.tab_widget.addTab(self.args_widget, "Main Args")
         self.tab_widget.addTab(self.subset_widget, "Subset Args")
 
@@ -72,6 +70,7 @@ class MainWidget(QWidget):
         self.backend_url_input.editingFinished.connect(self.update_url)
         self.training_error.connect(self.show_error)
         self.training_warning.connect(self.show_warning)
+        self.args_widget.bucket_widget.previewRequested.connect(self.preview_buckets)
 
     def show_error(self, title: str, message: str) -> None:
         QtWidgets.QMessageBox.critical(self, title, message)
@@ -79,15 +78,25 @@ class MainWidget(QWidget):
     def show_warning(self, title: str, message: str) -> None:
         QtWidgets.QMessageBox.warning(self, title, message)
 
+    def preview_buckets(self) -> None:
+        general_args = self.args_widget.get_args()["dataset"].get("general_args", {})
+        self.args_widget.bucket_widget.run_preview(
+            list(self.subset_widget.dataset_args.values()),
+            general_args.get("resolution", 1024),
+            general_args.get("batch_size", 1),
+        )
+
     def update_url(self) -> None:
-        url = self.backend_url_input.text()
-        if url.endswith("/"):
-            self.backend_url_input.setText(url.strip("/"))
-            url = url.strip("/")
-        config = Path("config.json")
-        config_dict = json.loads(config.read_text()) if config.exists() else {}
-        config_dict["backend_url"] = url
-        config.write_text(json.dumps(config_dict, indent=2))
+        urls = self.backend_urls()
+        if not urls:
+            return
+        self.backend_url_input.setText(", ".join(urls))
+        # backend_url stays the first one, everything but queue dispatch talks to it
+        ConfigStore().update({"backend_url": urls[0], "backend_urls": urls})
+
+    def backend_urls(self) -> list[str]:
+        urls = [url.strip().strip("/") for url in self.backend_url_input.text().split(",")]
+        return [url for url in urls if url]
 
     def get_args(self) -> tuple[dict, dict]:
         base_args = self.args_widget.get_args()
@@ -102,6 +111,10 @@ class MainWidget(QWidget):
             print("Cannot save TOML while extra args lack values:")
             print(message)
             return
+        TomlFunctions.save_toml(self.get_toml_args(), file_name)
+
+    def get_toml_args(self) -> dict:
+        """The ui state laid out like a saved toml."""
         args, subset_args = self.get_args()
         new_args = {arg: {"args": val} for arg, val in args["args"].items()}
         for arg, val in args["dataset"].items():
@@ -111,7 +124,7 @@ class MainWidget(QWidget):
                 new_args[arg] = {"dataset_args": val}
         new_args["subsets"] = list(subset_args.values())
         new_args["train_mode"] = {"train_mode": self.train_mode.value}
-        TomlFunctions.save_toml(new_args, file_name)
+        return new_args
 
     def load_toml(self, file_name: Path | None = None) -> None:
         args, dataset_args, train_mode = self.process_toml(file_name)
@@ -123,6 +136,8 @@ class MainWidget(QWidget):
             self.set_train_ti()
         self.args_widget.load_args(args, dataset_args)
         self.subset_widget.load_dataset_args(dataset_args)
+        # one batched check for every path the toml filled in
+        PathValidator().validate_all()
 
     def set_train_lora(self) -> None:
         if self.train_mode != TrainingModes.LORA:
@@ -138,28 +153,11 @@ class MainWidget(QWidget):
         loaded_args = TomlFunctions.load_toml(file_name)
         if not loaded_args:
             return {}, {}, self.train_mode
-        args = {}
-        dataset_args = {}
-        if "subsets" in loaded_args:
-            dataset_args["subsets"] = loaded_args["subsets"]
-            del loaded_args["subsets"]
-
-        train_mode = TrainingModes.LORA
-        if "train_mode" in loaded_args:
-            train_mode = TrainingModes(loaded_args["train_mode"]["train_mode"])
-
-        for arg, val in loaded_args.items():
-            if "args" in val:
-                args[arg] = val["args"]
-            if "dataset_args" in val:
-                dataset_args[arg] = val["dataset_args"]
-        return args, dataset_args, train_mode
+        return TrainingJobs.split_toml(loaded_args)
 
     def start_training(self) -> None:
-        if self.training_thread and self.training_thread.is_alive():
-            with contextlib.suppress(Exception):
-                requests.get(f"{self.backend_url_input.text()}/stop_training")
-            self.begin_training_button.setText("Start Training")
+        if self.training_controller and self.training_controller.isRunning():
+            self.training_controller.stop()
             return
         validation_errors = self.args_widget.get_validation_errors()
         if validation_errors:
@@ -168,140 +166,53 @@ class MainWidget(QWidget):
             print("Training blocked until extra args are fixed:")
             print(error_text)
             return
-        self.training_thread = Thread(target=self.start_training_thread)
-        self.training_thread.start()
-
-    def start_training_thread(self) -> None:
-        self.begin_training_button.setText("Stop Training")
-        url = self.backend_url_input.text()
-        if self.queue_widget.elements:
-            while self.queue_widget.elements:
-                queue_file = self.queue_widget.elements[0].queue_file
-                is_checked = self.queue_widget.elements[0].isChecked()
-                self.queue_widget.remove_first_from_queue()
-                if is_checked:
-                    self.save_toml(queue_file)
-                if not self.train_helper(url, queue_file):
-                    self.begin_training_button.setText("Start Training")
-                    return
-        else:
-            self.save_toml(Path("queue_store/temp.toml"))
-            self.train_helper(url, Path("queue_store/temp.toml"))
-        self.begin_training_button.setText("Start Training")
-
-    def train_helper(self, url: str, train_toml: Path) -> bool:
-        args, dataset_args, train_mode = self.process_toml(train_toml)
-        config = json.loads(Path("config.json").read_text())
-
-        # Include accelerate settings in validation request for proper warmup step calculation
-        final_args = {
-            "args": args,
-            "dataset": dataset_args,
-            "accelerate": config.get("accelerate", {}),
-        }
-        try:
-            response = requests.post(f"{url}/validate", json=True, data=json.dumps(final_args))
-        except ConnectionError as e:
-            print(e)
-            self.training_error.emit(
-                "Connection Error",
-                f"Failed to connect to the backend at {url}.\n\n"
-                "Please ensure the backend is running and the URL is correct."
-            )
-            return False
-        if response.status_code != 200:
-            print(f"Item Failed: {response.text}")
-            return False
-        validation_data = response.json()
-        if args.get("saving_args", {}).get("tag_occurrence", None):
-            folder = args["saving_args"].get("tag_file_location", None)
-            self.create_tag_file(
-                validation_data.get("tags", {}),
-                Path(folder) if folder else None,
-                args["saving_args"].get("output_name", "output_tags"),
-            )
-        if args.get("saving_args", {}).get("save_toml", None):
-            folder = args["saving_args"].get("save_toml_location", None)
-            self.create_auto_save_toml(
-                train_toml,
-                Path(folder) if folder else None,
-                args["saving_args"].get("output_name", "output_args"),
-            )
-        os.remove(train_toml)
-        is_sdxl = str(args.get("general_args").get("sdxl", False))
-        is_flux = str(bool(args.get("flux_args")))
-        is_anima = str(bool(args.get("anima_args")))
-
-        # Build train params including accelerate settings
-        train_params = {
-            "train_mode": train_mode.value,
-            "sdxl": is_sdxl,
-            "flux": is_flux,
-            "anima": is_anima,
-        }
-
-        # Add accelerate settings if enabled
-        accel = config.get("accelerate", {})
-        if accel.get("enabled", False):
-            train_params["accelerate_enabled"] = "True"
-            train_params["accelerate_num_processes"] = str(accel.get("num_processes", 2))
-            train_params["accelerate_main_process_port"] = str(accel.get("main_process_port", 29500))
-
-        response = requests.get(f"{url}/train", params=train_params)
-        training = True
-        while training:
-            sleep(5.0)
-            try:
-                response = requests.get(f"{url}/is_training")
-            except Exception:
-                print("Connection Failed, assuming training has stopped.")
-                return False
-            if response.status_code != 200:
-                print("Connection Failed, assuming training has stopped.")
-                return False
-            response = response.json()
-            if not response["training"]:
-                training = False
-            if response["errored"]:
-                return False
-        return True
-
-    def create_tag_file(
-        self,
-        tags: dict,
-        output_location: Path | None = None,
-        output_name: str = "output_tags",
-    ) -> None:
-        if not tags:
-            return
-        if not output_location:
-            output_location = Path("auto_save_store")
-        if not output_location.exists():
-            output_location.mkdir()
-        if output_location.is_file():
-            output_location = output_location.parent
-        output_location = output_location.joinpath(f"{output_name}.txt")
-        with output_location.open("w", encoding="utf-8") as f:
-            f.write("Below is a list of keywords used during the training of this model:\n")
-            for k, v in tags.items():
-                f.write(f"[{v}] {k}\n")
-
-    def create_auto_save_toml(
-        self,
-        input_toml: Path,
-        output_location: Path | None = None,
-        output_name: str = "output_toml",
-    ):
-        if not output_location:
-            output_location = Path("auto_save_store")
-        if not output_location.exists():
-            output_location.mkdir()
-        if output_location.is_file():
-            output_location = output_location.parent
-        output_location = output_location.joinpath(f"{output_name}.toml")
-        offset = 1
-        orig_name = output_location.stem
-        while output_location.exists():
-            output_location = output_location.with_stem(f"{orig_name}_{offset}")
-            offset += 1
-        shutil.copy(input_toml, output_location)
+        toml_args = None
+        if not self.queue_widget.elements:
+            # taken on the ui thread, a copy as if it went through a toml and back
+            toml_args = TomlFunctions.thaw(TomlFunctions.freeze(self.get_toml_args()))
+            if ConfigStore().get("save_temp_toml", False):
+                Thread(
+                    target=TomlFunctions.save_toml,
+                    args=(toml_args, Path("queue_store/temp.toml")),
+                    daemon=True,
+                ).start()
+        controller = TrainingController(
+            self.backend_urls() or [ConfigStore().get("backend_url", "http://127.0.0.1:8000")],
+            self.take_next_item,
+            self.queue_widget.peek_first,
+            toml_args,
+            self,
+        )
+        controller.stateChanged.connect(self.training_state_changed)
+        controller.itemStarted.connect(lambda _, name, url: print(f"Starting {name} on {url}"))
+        controller.itemFinished.connect(lambda queue_file, _: self.queue_widget.item_finished(queue_file))
+        controller.error.connect(self.show_error)
+        controller.warning.connect(self.show_warning)
+        controller.finished.connect(controller.deleteLater)
+        self.training_controller = controller
+        controller.start()
+
+    def training_state_changed(self, state: str) -> None:
+        state = TrainingStates(state)
+        self.begin_training_button.setEnabled(state != TrainingStates.STOPPING)
+        self.begin_training_button.setText(
+            {
+                TrainingStates.IDLE: "Start Training",
+                TrainingStates.RUNNING: "Stop Training",
+                TrainingStates.STOPPING: "Stopping...",
+            }[state]
+        )
+        if state == TrainingStates.IDLE:
+            self.training_controller = None
+            self.queue_widget.training_stopped()
+
+    def take_next_item(self) -> tuple[Path, str] | None:
+        """Hands the next queue item to the training controller, called on the gui thread."""
+        next_item = self.queue_widget.take_first()
+        if not next_item:
+            return None
+        item, is_selected = next_item
+        if is_selected:
+            self.save_toml(item.queue_file)
+            self.queue_widget.estimate(item)
+        return item.queue_file, item.name
@@ -1,12 +1,15 @@
 import subprocess
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMainWindow, QApplication
-from qt_material import QtStyleTools, apply_stylesheet
+from qt_material import QtStyleTools
 from ui_files.MainUI import Ui_MainWindow
 from main_ui_files.MainUI import MainWidget
 from pathlib import Path
-import json
+from modules.ConfigStore import ConfigStore
 from modules.LoraResizePopupUi import LoraResizePopup
+from modules.TagIndexPopup import TagIndexPopup
+from modules.ThemeCache import apply_cached_stylesheet
 import sys
 
 PLATFORM = "windows" if sys.platform == "win32" else "linux" if sys.platform == "linux" else ""
@@ -33,6 +36,8 @@ class MainWindow(QMainWindow, QtStyleTools):
         # Add TensorBoard action to Utils menu
         self.tensorboard_action = QAction("Toggle TensorBoard", self)  # Changed text to indicate toggle functionality
         self.widget.menuUtils.addAction(self.tensorboard_action)
+        self.tag_index_action = QAction("Tag Index", self)
+        self.widget.menuUtils.addAction(self.tag_index_action)
         
         self.setMinimumWidth(739)
         screen_size = QApplication.screens()[0].size()
@@ -61,14 +66,8 @@ class MainWindow(QMainWindow, QtStyleTools):
         self.compact_mode_action = QAction("Compact Mode (Material)", self)
         self.compact_mode_action.setCheckable(True)
 
-        config = Path("config.json")
-        if config.exists():
-            try:
-                config_dict = json.loads(config.read_text())
-                is_compact = config_dict.get("theme", {}).get("density_scale") == "-2"
-                self.compact_mode_action.setChecked(is_compact)
-            except Exception:
-                pass
+        theme = ConfigStore().get("theme") or {}
+        self.compact_mode_action.setChecked(theme.get("density_scale") == "-2")
 
         self.widget.menuTheme.addSeparator()
         self.widget.menuTheme.addAction(self.compact_mode_action)
@@ -94,6 +93,7 @@ class MainWindow(QMainWindow, QtStyleTools):
         )
         self.widget.set_train_ti_action.triggered.connect(self.main_widget.set_train_ti)
         self.tensorboard_action.triggered.connect(self.launch_tensorboard)
+        self.tag_index_action.triggered.connect(self.show_tag_index)
         self.compact_mode_action.triggered.connect(lambda: self.change_theme())
 
 
@@ -198,15 +198,14 @@ class MainWindow(QMainWindow, QtStyleTools):
     ) -> None:
         """Updates the theme. If index is -1, it re-applies the current theme 
         (used for toggling compact mode)."""
-        config = Path("config.json")
-        config_dict = json.loads(config.read_text()) if config.exists() else {}
-        
+        config = ConfigStore()
+
         if no_theme:
             theme_path = None
             self.app.setStyleSheet("")
         else:
             if index == -1:
-                current_cfg = config_dict.get("theme", {})
+                current_cfg = config.get("theme", {})
                 theme_path_str = current_cfg.get("location")
                 if not theme_path_str:
                     return
@@ -224,21 +223,26 @@ class MainWindow(QMainWindow, QtStyleTools):
             if is_compact:
                 extra['font_size'] = '15px'
 
-            apply_stylesheet(
+            apply_cached_stylesheet(
                 self.app,
                 theme=str(theme_path),
                 invert_secondary=is_light,
                 extra=extra
             )
 
-        config_dict["theme"] = {
+        config.set("theme", {
             "location": theme_path.as_posix() if theme_path else None,
             "is_light": is_light,
             "density_scale": "-2" if self.compact_mode_action.isChecked() else "0"
-        }
-        config.write_text(json.dumps(config_dict, indent=2))
+        })
 
     def run_resize(self):
         popup = LoraResizePopup(self)
         popup.setModal(True)
         popup.exec()
+
+    def show_tag_index(self) -> None:
+        # not modal, so the subsets can be edited while the counts are up
+        popup = TagIndexPopup(self.main_widget, self)
+        popup.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        popup.show()
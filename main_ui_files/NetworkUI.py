@@ -15,8 +15,8 @@ class NetworkWidget(BaseWidget):
         "max_timestep": 1000,
     }
 
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Network Args")
         self.widget = Ui_network_ui()
 
@@ -24,8 +24,7 @@ class NetworkWidget(BaseWidget):
         self.lycoris = False
         self.network_args: list[OptimizerItem] = []
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
@@ -310,6 +309,7 @@ class NetworkWidget(BaseWidget):
         self.enable_disable_module_dropout(self.widget.module_dropout_enable.isChecked() if toggle else False)
 
     def toggle_sdxl(self, toggle: bool) -> None:
+        self.ensure_built()
         self.widget.cache_te_outputs_enable.setEnabled(toggle)
         self.enable_disable_cache_te(self.widget.cache_te_outputs_enable.isChecked() if toggle else False)
 
@@ -4,15 +4,14 @@ from modules.BaseWidget import BaseWidget
 
 
 class NoiseOffsetWidget(BaseWidget):
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Noise Offset Args")
         self.widget = Ui_noise_offset_UI()
 
         self.name = "noise_args"
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
@@ -14,19 +14,19 @@ class OptimizerWidget(BaseWidget):
         "learning_rate": 1e-4,
         "max_grad_norm": 1.0,
         "loss_type": "l2",
+        "optimizer_args": {"weight_decay": "0.1"},
     }
     maskedLossChecked = Signal(bool)
 
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Optimizer Args")
         self.widget = Ui_optimizer_ui()
 
         self.name = "optimizer_args"
         self.opt_args = [OptimizerItem(arg_name="weight_decay", arg_value="0.1")]
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
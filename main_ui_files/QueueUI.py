@@ -1,20 +1,39 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PySide6 import QtCore
 from pathlib import Path
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QWidget, QVBoxLayout
+from modules import StepEstimator, TomlFunctions
+from modules.ConfigStore import ConfigStore
 from modules.QueueItem import QueueItem
+from modules.QueueModel import QueueItemDelegate, QueueModel
 from ui_files.QueueUIVertical import Ui_queue_ui
 
 
 class QueueWidget(QWidget):
     saveQueue = QtCore.Signal(Path)
     loadQueue = QtCore.Signal(Path)
+    # take_first runs on the training thread, rows are only removed on the gui thread
+    itemTaken = QtCore.Signal(object)
+    # (item, StepEstimate) from the estimate worker
+    estimated = QtCore.Signal(object, object)
+    # config keys the estimates depend on, run history is written from the training thread
+    configChanged = QtCore.Signal(str)
 
     def __init__(self, parent: QWidget = None) -> None:
         super().__init__(parent)
-        self.selected = None
-        self.elements: list[QueueItem] = []
+        self.selected: QueueItem | None = None
+        self.model = QueueModel(self)
+        self.lock = threading.Lock()
+        # items handed to the training thread with when they started
+        self.running: list[tuple[QueueItem, float]] = []
+        self.estimator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-estimate")
+        # the finish times count down while something runs
+        self.eta_timer = QtCore.QTimer(self)
+        self.eta_timer.setInterval(60_000)
         self.widget = Ui_queue_ui()
         self.content = QWidget()
 
@@ -23,72 +42,118 @@ class QueueWidget(QWidget):
         if not Path("queue_store").exists():
             Path("queue_store").mkdir()
 
+    @property
+    def elements(self) -> list[QueueItem]:
+        return self.model.items
+
     def setup_widget(self) -> None:
         self.setLayout(QVBoxLayout())
         self.layout().addWidget(self.content)
         self.widget.setupUi(self.content)
         self.widget.top_arrow.setIcon(QIcon(str(Path("icons/chevron-up.svg"))))
         self.widget.bottom_arrow.setIcon(QIcon(str(Path("icons/chevron-down.svg"))))
-        self.widget.queue_scroll_widget.layout().setAlignment(
-            QtCore.Qt.AlignmentFlag.AlignTop
-        )
+        self.widget.queue_list.setModel(self.model)
+        self.widget.queue_list.setItemDelegate(QueueItemDelegate(self.widget.queue_list))
 
     def setup_connections(self) -> None:
         self.widget.add_to_queue_button.clicked.connect(self.add_to_queue)
         self.widget.remove_from_queue_button.clicked.connect(self.remove_from_queue)
         self.widget.top_arrow.clicked.connect(lambda: self.change_position(up=True))
         self.widget.bottom_arrow.clicked.connect(lambda: self.change_position(up=False))
+        self.widget.queue_list.selectionModel().currentChanged.connect(self.current_changed)
+        self.itemTaken.connect(self.remove_taken, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.estimated.connect(self.set_estimate)
+        self.configChanged.connect(self.config_changed, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.eta_timer.timeout.connect(self.update_etas)
+        for key in ("step_history", "accelerate", "backend_urls"):
+            ConfigStore().subscribe(lambda key, _: self.configChanged.emit(key), key=key)
+        self.model.workers = max(1, len(ConfigStore().get("backend_urls", [])))
 
     def add_to_queue(self) -> None:
-        new_item = QueueItem()
-        new_item.QueueSelected.connect(self.update_selected)
-        new_item.setText(self.widget.queue_name.text() or "Unnamed")
-        self.elements.append(new_item)
-        self.selected = new_item
-        new_item.setChecked(True)
-        self.uncheck_elements(True)
-        self.widget.queue_scroll_widget.layout().addWidget(new_item)
+        new_item = QueueItem(self.widget.queue_name.text() or "Unnamed")
+        self.model.append(new_item)
+        # the ui state becomes the new item, the previous one keeps its saved file
+        self.select(new_item)
         self.saveQueue.emit(new_item.queue_file)
+        self.estimate(new_item)
 
     def remove_from_queue(self) -> None:
-        if not self.selected:
+        if not self.selected or self.selected.taken:
             return
-        file = self.selected.queue_file
-        if file.exists():
-            os.remove(file)
-        self.elements.remove(self.selected)
-        self.widget.queue_scroll_widget.layout().removeWidget(self.selected)
-        self.selected.deleteLater()
-        self.widget.queue_scroll_widget.layout().update()
+        item = self.selected
+        if item.queue_file.exists():
+            os.remove(item.queue_file)
+        # cleared first, otherwise the view moves the current row onto a neighbour and loads it
+        self.select(None)
+        self.model.remove(item)
+        self.update_etas()
         if self.elements:
-            self.selected = self.elements[0]
-            self.elements[0].setChecked(True)
+            self.select(self.elements[0])
             self.loadQueue.emit(self.elements[0].queue_file)
+
+    def take_first(self) -> tuple[QueueItem, bool] | None:
+        """Hands the first waiting item to the training thread.
+
+        Returns it and whether it was the selected item, whose file is stale
+        until the ui is saved into it.
+        """
+        with self.lock:
+            item = next((item for item in self.elements if not item.taken), None)
+            if not item:
+                return None
+            item.taken = True
+            is_selected = item is self.selected
+            if is_selected:
+                self.selected = None
+        if QtCore.QThread.currentThread() == self.thread():
+            self.remove_taken(item)
         else:
-            self.selected = False
-
-    def remove_first_from_queue(self) -> None:
-        elem = self.elements[0]
-        if elem == self.selected:
-            self.selected = False
-            self.uncheck_elements(True)
-        self.widget.queue_scroll_widget.layout().removeWidget(elem)
-        self.elements.remove(elem)
-        elem.deleteLater()
-        self.widget.queue_scroll_widget.layout().update()
+            self.itemTaken.emit(item)
+        return item, is_selected
+
+    def peek_first(self) -> Path | None:
+        with self.lock:
+            item = next((item for item in self.elements if not item.taken), None)
+        return item.queue_file if item else None
+
+    def remove_taken(self, item: QueueItem) -> None:
+        if item not in self.elements:
+            return
+        if not self.selected:
+            self.select(None)
+        self.model.remove(item)
+        self.running.append((item, time.monotonic()))
+        self.update_etas()
+        self.eta_timer.start()
+
+    def current_changed(self, current: QtCore.QModelIndex, _previous: QtCore.QModelIndex) -> None:
+        if not current.isValid():
+            return
+        item = self.elements[current.row()]
+        if item is not self.selected and not item.taken:
+            self.update_selected(item)
 
     def update_selected(self, elem: QueueItem) -> None:
-        self.selected = elem
-        self.uncheck_elements()
-        self.selected.setChecked(True)
+        previous = self.selected
+        self.select(elem)
+        # only the item that was selected can differ from its file
+        if previous and previous in self.elements:
+            self.saveQueue.emit(previous.queue_file)
+            self.estimate(previous)
         self.loadQueue.emit(elem.queue_file)
 
-    def uncheck_elements(self, skip_save: bool = False) -> None:
-        for elem in self.elements:
-            if elem.isChecked() and elem is not self.selected:
-                elem.setChecked(False)
-                if not skip_save:
-                    self.saveQueue.emit(elem.queue_file)
+    def select(self, item: QueueItem | None) -> None:
+        with self.lock:
+            self.selected = item
+        view = self.widget.queue_list
+        if item is None:
+            view.selectionModel().clear()
+            return
+        index = self.model.index_of(item)
+        view.selectionModel().setCurrentIndex(
+            index, QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect
+        )
+        view.scrollTo(index)
 
     def change_position(self, up: bool) -> None:
         if not self.selected:
@@ -98,14 +163,61 @@ class QueueWidget(QWidget):
             return
         if not up and index == len(self.elements) - 1:
             return
-        self.elements[index + (-1 if up else 1)], self.elements[index] = (
-            self.elements[index],
-            self.elements[index + (-1 if up else 1)],
-        )
-        self.update_layout()
+        self.model.swap_with_next(index - 1 if up else index)
+        self.widget.queue_list.scrollTo(self.model.index_of(self.selected))
+        self.update_etas()
+
+    def estimate(self, item: QueueItem) -> None:
+        """Works out the steps and time of item from its saved file, off the gui thread."""
+        self.estimator.submit(self.estimate_thread, item, item.queue_file)
+
+    def estimate_thread(self, item: QueueItem, queue_file: Path) -> None:
+        try:
+            estimate = StepEstimator.estimate_toml(TomlFunctions.thaw(TomlFunctions.read_toml(queue_file)))
+        except Exception as e:
+            print(f"Could not estimate {item.name}: {e}")
+            return
+        self.estimated.emit(item, estimate)
 
-    def update_layout(self) -> None:
-        for elem in self.elements:
-            self.widget.queue_scroll_widget.layout().removeWidget(elem)
-        for elem in self.elements:
-            self.widget.queue_scroll_widget.layout().addWidget(elem)
+    def set_estimate(self, item: QueueItem, estimate: StepEstimator.StepEstimate) -> None:
+        item.estimate = estimate
+        self.update_etas()
+
+    def item_finished(self, queue_file: Path | None) -> None:
+        # names can repeat, the queue file can't
+        for entry in self.running:
+            if entry[0].queue_file == queue_file:
+                self.running.remove(entry)
+                break
+        if not self.running:
+            self.eta_timer.stop()
+        self.update_etas()
+
+    def training_stopped(self) -> None:
+        self.running.clear()
+        self.eta_timer.stop()
+        self.update_etas()
+
+    def update_etas(self) -> None:
+        now = time.monotonic()
+        self.model.busy = [
+            max(0.0, item.estimate.seconds - (now - started))
+            for item, started in self.running
+            if item.estimate and item.estimate.seconds is not None
+        ]
+        self.model.update_etas()
+
+    def config_changed(self, key: str) -> None:
+        if key == "backend_urls":
+            self.model.workers = max(1, len(ConfigStore().get("backend_urls", [])))
+        elif key == "accelerate":
+            # the step count depends on the process count
+            for item in self.elements:
+                self.estimate(item)
+            return
+        elif key == "step_history":
+            history = ConfigStore().get("step_history", {})
+            for item in self.elements:
+                if item.estimate:
+                    StepEstimator.add_duration(item.estimate, history)
+        self.update_etas()
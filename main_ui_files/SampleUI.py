@@ -8,15 +8,14 @@ from pathlib import Path
 
 
 class SampleWidget(BaseWidget):
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Sample Args")
         self.widget = Ui_sample_ui()
 
         self.name = "sample_args"
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
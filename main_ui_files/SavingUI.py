@@ -13,15 +13,14 @@ class SavingWidget(BaseWidget):
         "save_model_as": "safetensors",
     }
 
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Saving Args")
         self.widget = Ui_saving_ui()
 
         self.name = "saving_args"
 
-        self.setup_widget()
-        self.setup_connections()
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
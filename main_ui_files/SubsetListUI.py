@@ -1,12 +1,38 @@
+from collections import deque
+import contextlib
+import copy
+import json
 from pathlib import Path
+from threading import Event, Thread
 import time
 from PySide6 import QtCore
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QFileDialog
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QFileDialog, QHeaderView
 from main_ui_files.SubsetUI import SubsetWidget
+from modules.DatasetScanner import DatasetScanner, SubsetStats
+from modules.SubsetDiscovery import subset_folders
+from modules.SubsetModel import SubsetTableModel
 from ui_files.SubsetListUI import Ui_subset_list_ui
 
+# found folders are sent to the gui this often, and added this many per event loop turn
+IMPORT_BATCH_SECONDS = 0.1
+IMPORT_BATCH = 64
+
 
 class SubsetListWidget(QWidget):
+    """Subsets as a table over their dataset_args, with one SubsetWidget for the selected row.
+
+    Rows that are not being edited only exist as dicts. The values the global
+    toggles (masked loss, cache latents, variable keep tokens) hold back from a
+    subset are kept in hidden_args, so they come back when the toggle does, the
+    same as with the disabled inputs of an editor.
+    """
+
+    # import id, [(display name, folder)] / import id, folders listed, folders to list / import id
+    foldersFound = Signal(int, list)
+    importProgressed = Signal(int, int, int)
+    importFinished = Signal(int)
+
     def __init__(self, parent: QWidget = None) -> None:
         super().__init__(parent)
         self.content = QWidget(self)
@@ -24,100 +50,440 @@ class SubsetListWidget(QWidget):
         self.variable_keep_tokens_checked = False
         self.args = {}
         self.dataset_args = {}
-        self.elements: list[SubsetWidget] = []
+        self.hidden_args: dict[str, dict] = {}
+        self.display_names: dict[str, str] = {}
+        # folder statistics by row, and the scan each row shows
+        self.stats: dict[str, SubsetStats | None] = {}
+        self.scan_keys: dict[str, tuple] = {}
+        self.model = SubsetTableModel(self.dataset_args, self.display_names, self.stats, self)
+        self.editor: SubsetWidget | None = None
+        self.editor_name: str | None = None
+        # (subset, held back keys) -> what the editor made of it, see normalize
+        self.normalized: dict[tuple, tuple[dict, dict]] = {}
+        # the running root folder import, batches of an older one are dropped
+        self.import_id = 0
+        self.import_cancelled: Event | None = None
+        self.import_walking = False
+        # folders listed and to list, from the last progress report
+        self.import_done = self.import_total = 0
+        self.found_folders: deque[tuple[str, str]] = deque()
+
+        table = self.widget.subset_table
+        table.setModel(self.model)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        table.horizontalHeader().resizeSection(1, 260)
+        table.verticalHeader().setDefaultSectionSize(table.fontMetrics().height() + 10)
+        self.widget.subset_splitter.setStretchFactor(1, 1)
+        table.selectionModel().currentRowChanged.connect(self.current_row_changed)
+
+        # typing a folder path edits the row on every key, scans wait for a pause
+        self.scan_timer = QtCore.QTimer(self)
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.setInterval(300)
+        self.scan_timer.timeout.connect(self.scan_subsets)
+        DatasetScanner().scanned.connect(self.subset_scanned)
 
         self.widget.add_subset_button.clicked.connect(
             lambda: self.add_empty_subset(self.widget.add_subset_name_input.text())
         )
+        self.widget.add_bulk_progress.setVisible(False)
         self.widget.add_bulk_button.clicked.connect(self.add_from_root_folder)
+        self.import_timer = QtCore.QTimer(self)
+        self.import_timer.setInterval(0)
+        self.import_timer.timeout.connect(self.add_found_folders)
+        self.foldersFound.connect(self.queue_found_folders)
+        self.importProgressed.connect(self.show_import_progress)
+        self.importFinished.connect(self.import_finished)
+
+    @property
+    def elements(self) -> list[str]:
+        return self.model.names
 
-    def add_empty_subset(self, display_name: str = "") -> SubsetWidget:
+    @staticmethod
+    def new_subset_args(name: str) -> dict:
+        # what a freshly built SubsetWidget holds
+        return {"num_repeats": 1, "caption_extension": ".txt", "name": name}
+
+    def held_back(self) -> dict[str, bool]:
+        return {
+            "conditioning_data_dir": not self.masked_loss_checked,
+            "random_crop": self.masked_loss_checked or self.cache_latents_checked,
+            "color_aug": self.cache_latents_checked,
+            "keep_tokens": self.variable_keep_tokens_checked,
+        }
+
+    def unique_name(self, display_name: str) -> str:
         if display_name in self.dataset_args:
-            name = f"{display_name}_{str(time.time_ns())}"
-        else:
-            name = display_name
-        subset = SubsetWidget(display_name=display_name, name=name)
-        subset.colap.extra_elem.clicked.connect(lambda: self.remove_subset(subset))
-        subset.edited.connect(self.update_args)
-
-        subset.enable_disable_masked_loss(self.masked_loss_checked)
-        subset.enable_disable_random_crop(
-            any([self.masked_loss_checked, self.cache_latents_checked])
-        )
-        subset.enable_disable_color_aug(self.cache_latents_checked)
-        subset.enable_disable_keep_tokens(self.variable_keep_tokens_checked)
-        subset.enable_disable_random_crop_padding_percent(False)
-        if not self.elements:
-            subset.colap.toggle_collapsed()
-            subset.colap.title_frame.setChecked(True)
-        self.widget.subset_scroll_area_content.layout().addWidget(subset)
-        self.elements.append(subset)
-        self.dataset_args[(name or subset.name)] = subset.dataset_args
-        return subset
-
-    def remove_subset(self, elem: SubsetWidget) -> None:
-        self.elements.pop(self.elements.index(elem))
-        if elem.name in self.dataset_args:
-            del self.dataset_args[elem.name]
-        index = self.widget.subset_scroll_area_content.layout().indexOf(elem)
-        val = self.widget.subset_scroll_area_content.layout().takeAt(index)
-        if val.widget() is not None:
-            val.widget().deleteLater()
+            return f"{display_name}_{str(time.time_ns())}"
+        return display_name
+
+    def add_empty_subset(self, display_name: str = "", select: bool = True) -> str:
+        name = self.unique_name(display_name)
+        self.dataset_args[name] = self.new_subset_args(name)
+        self.hidden_args[name] = {}
+        self.display_names[name] = display_name
+        self.model.append(name)
+        if select and len(self.model.names) == 1:
+            self.select(name)
+        return name
+
+    def remove_subset(self, name: str) -> None:
+        if name not in self.dataset_args:
+            return
+        row = self.model.names.index(name)
+        if name == self.editor_name:
+            self.editor_name = None
+        self.model.remove(name)
+        del self.dataset_args[name]
+        del self.hidden_args[name]
+        del self.display_names[name]
+        self.stats.pop(name, None)
+        self.scan_keys.pop(name, None)
+        if self.editor_name is None:
+            names = self.model.names
+            self.select(names[min(row, len(names) - 1)] if names else None)
+
+    def clear_subsets(self) -> None:
+        self.show_editor(None)
+        self.dataset_args.clear()
+        self.hidden_args.clear()
+        self.display_names.clear()
+        self.stats.clear()
+        self.scan_keys.clear()
+        self.model.reset([])
 
     def add_from_root_folder(self) -> None:
+        if self.import_cancelled:
+            # the button cancels while an import runs, what was found so far stays
+            self.stop_import()
+            return
         root_folder_path = QFileDialog.getExistingDirectory(
             self, "Root folder containing subset folders"
         )
-        if not root_folder_path or not Path(root_folder_path).is_dir():
+        if not root_folder_path:
+            return
+        self.clear_subsets()
+        self.import_id += 1
+        self.import_cancelled = Event()
+        self.import_walking = True
+        self.import_done = self.import_total = 0
+        self.widget.add_bulk_button.setText("Cancel Adding Subfolders")
+        self.widget.add_bulk_recursive_enable.setEnabled(False)
+        self.widget.add_bulk_progress.setRange(0, 0)
+        self.widget.add_bulk_progress.setVisible(True)
+        Thread(
+            target=self.find_folders,
+            args=(
+                self.import_id,
+                root_folder_path,
+                self.widget.add_bulk_recursive_enable.isChecked(),
+                self.import_cancelled,
+            ),
+            daemon=True,
+        ).start()
+
+    def find_folders(self, import_id: int, root: str, recursive: bool, cancelled: Event) -> None:
+        """Walks root off the gui thread, the folders come back through foldersFound."""
+        batch = []
+        sent = time.perf_counter()
+        shown = 0.0
+
+        def progress(done: int, total: int) -> None:
+            nonlocal shown
+            if done == total or time.perf_counter() - shown >= IMPORT_BATCH_SECONDS:
+                self.importProgressed.emit(import_id, done, total)
+                shown = time.perf_counter()
+
+        for found in subset_folders(root, recursive, progress, cancelled):
+            batch.append(found)
+            if time.perf_counter() - sent >= IMPORT_BATCH_SECONDS:
+                self.foldersFound.emit(import_id, batch)
+                batch = []
+                sent = time.perf_counter()
+        if batch:
+            self.foldersFound.emit(import_id, batch)
+        self.importFinished.emit(import_id)
+
+    def queue_found_folders(self, import_id: int, found: list[tuple[str, str]]) -> None:
+        if import_id != self.import_id or self.import_cancelled is None:
             return
-        root_folder_path = Path(root_folder_path)
-        while self.elements:
-            self.remove_subset(self.elements[0])
-        for elem in root_folder_path.iterdir():
-            if not elem.is_dir():
+        self.found_folders.extend(found)
+        self.import_timer.start()
+
+    def add_found_folders(self) -> None:
+        """Adds the next few found folders, a walk can outpace the table by far."""
+        for _ in range(min(IMPORT_BATCH, len(self.found_folders))):
+            display_name, folder = self.found_folders.popleft()
+            name = self.add_empty_subset(display_name, select=False)
+            self.set_image_dir(name, Path(folder))
+        if self.editor_name is None:
+            self.select_first()
+        self.show_import_progress(self.import_id, self.import_done, self.import_total)
+        if not self.found_folders:
+            self.import_timer.stop()
+            if not self.import_walking:
+                self.stop_import()
+
+    def show_import_progress(self, import_id: int, done: int, total: int) -> None:
+        if import_id != self.import_id or self.import_cancelled is None:
+            return
+        self.import_done, self.import_total = done, total
+        self.widget.add_bulk_progress.setRange(0, total)
+        self.widget.add_bulk_progress.setValue(done)
+        self.widget.add_bulk_progress.setFormat(f"{len(self.model.names)} subsets, %v of %m folders searched")
+
+    def import_finished(self, import_id: int) -> None:
+        if import_id != self.import_id:
+            return
+        self.import_walking = False
+        if not self.found_folders:
+            self.stop_import()
+
+    def stop_import(self) -> None:
+        """Ends the running import, the subsets added so far stay."""
+        if self.import_cancelled is None:
+            return
+        self.import_cancelled.set()
+        self.import_cancelled = None
+        self.import_walking = False
+        self.found_folders.clear()
+        self.import_timer.stop()
+        self.widget.add_bulk_button.setText("Add All Subfolders From Folder")
+        self.widget.add_bulk_recursive_enable.setEnabled(True)
+        self.widget.add_bulk_progress.setVisible(False)
+
+    def set_image_dir(self, name: str, folder: Path) -> None:
+        """Same as picking folder in the subset's image folder selector."""
+        args = self.dataset_args[name]
+        args.pop("image_dir", None)
+        args["image_dir"] = folder.as_posix()
+        with contextlib.suppress(ValueError):
+            repeats = int(folder.name.split("_")[0])
+            if repeats != args.get("num_repeats"):
+                args.pop("num_repeats", None)
+                args["num_repeats"] = repeats
+        self.model.refresh(name)
+        self.scan_timer.start()
+
+    def set_keep_tokens(self, name: str, keep_tokens: int) -> None:
+        """Same as typing keep_tokens into the subset's keep tokens input."""
+        if name == self.editor_name:
+            self.editor.widget.keep_tokens_input.setValue(keep_tokens)
+            return
+        # held back while variable keep tokens is on, it comes back with the toggle
+        args = self.hidden_args.setdefault(name, {}) if self.held_back()["keep_tokens"] else self.dataset_args[name]
+        args.pop("keep_tokens", None)
+        if keep_tokens:
+            args["keep_tokens"] = keep_tokens
+        self.model.refresh(name)
+
+    def select(self, name: str | None) -> None:
+        table = self.widget.subset_table
+        if name is None:
+            table.selectionModel().clear()
+            self.show_editor(None)
+            return
+        table.setCurrentIndex(self.model.index(self.model.names.index(name), 0))
+        # setCurrentIndex is a no-op when the row is current already
+        self.show_editor(name)
+
+    def select_first(self) -> None:
+        self.select(self.model.names[0] if self.model.names else None)
+
+    def current_row_changed(self, current: QtCore.QModelIndex, _: QtCore.QModelIndex) -> None:
+        name = self.model.names[current.row()] if current.isValid() else None
+        # rows are rebound while a load is in progress
+        if name is None or name in self.dataset_args:
+            self.show_editor(name)
+
+    def get_editor(self) -> SubsetWidget:
+        if self.editor:
+            return self.editor
+        self.editor = SubsetWidget()
+        self.editor.colap.extra_elem.clicked.connect(
+            lambda: self.remove_subset(self.editor_name)
+        )
+        self.editor.edited.connect(self.update_args)
+        self.editor.colap.toggle_collapsed()
+        self.editor.colap.title_frame.setChecked(True)
+        self.widget.subset_scroll_area_content.layout().addWidget(self.editor)
+        return self.editor
+
+    def show_editor(self, name: str | None) -> None:
+        if name == self.editor_name:
+            return
+        self.store_editor()
+        self.editor_name = None
+        if name is None:
+            if self.editor:
+                self.editor.setVisible(False)
+            return
+        editor = self.get_editor()
+        state = {**self.dataset_args[name], **self.hidden_args.get(name, {})}
+        editor.name = name
+        editor.dataset_args = {"name": name}
+        editor.colap.set_title(self.display_names.get(name, name))
+        # set before loading, the edits of the load already belong to this row
+        self.editor_name = name
+        with editor.updating():
+            editor.load_dataset_args(state)
+            if "random_crop_padding_percent" not in state:
+                # a new subset leaves it unset, loading would write its 0.05 default
+                padding = editor.widget.random_crop_padding_percent_input
+                padding.blockSignals(True)
+                padding.setValue(0.0)
+                padding.blockSignals(False)
+                editor.dataset_args.pop("random_crop_padding_percent", None)
+            editor.enable_disable_masked_loss(self.masked_loss_checked)
+            editor.enable_disable_random_crop(
+                any([self.masked_loss_checked, self.cache_latents_checked])
+            )
+            editor.enable_disable_color_aug(self.cache_latents_checked)
+            editor.enable_disable_keep_tokens(self.variable_keep_tokens_checked)
+        self.hidden_args[name] = {}
+        editor.setVisible(True)
+
+    def store_editor(self) -> None:
+        """Detaches the edited row from the editor, keeping what the toggles hold back."""
+        name = self.editor_name
+        if name is None or name not in self.dataset_args:
+            return
+        editor = self.editor
+        self.dataset_args[name] = copy.deepcopy(editor.dataset_args)
+        values = {
+            "conditioning_data_dir": editor.widget.masked_image_input.text(),
+            "random_crop": editor.widget.random_crop_enable.isChecked(),
+            "color_aug": editor.widget.color_augment_enable.isChecked(),
+            "keep_tokens": editor.widget.keep_tokens_input.value(),
+        }
+        self.hidden_args[name] = {
+            key: values[key] for key, held in self.held_back().items() if held and values[key]
+        }
+
+    def apply_held_back(self) -> None:
+        held_back = self.held_back()
+        for name, args in self.dataset_args.items():
+            if name == self.editor_name:
                 continue
-            subset = self.add_empty_subset(elem.name)
-            subset.set_folder_from_dialog(elem.name, subset.widget.image_folder_input, path=elem)
+            hidden = self.hidden_args.setdefault(name, {})
+            for key, held in held_back.items():
+                if held and key in args:
+                    hidden[key] = args.pop(key)
+                elif not held and key in hidden:
+                    args[key] = hidden.pop(key)
+        self.model.refresh()
+        self.scan_timer.start()
 
     def update_args(self, subset_args: dict, subset_name: str) -> None:
+        if subset_name not in self.dataset_args:
+            return
         self.dataset_args[subset_name] = subset_args
+        self.model.refresh(subset_name)
+        self.scan_timer.start()
+
+    def scan_subsets(self) -> None:
+        """Starts a scan for every row whose folders changed since its last one."""
+        scanner = DatasetScanner()
+        for name in self.model.names:
+            key = scanner.key(self.dataset_args.get(name, {}))
+            if key == self.scan_keys.get(name):
+                continue
+            if key is None:
+                self.stats.pop(name, None)
+                self.scan_keys.pop(name, None)
+            else:
+                self.scan_keys[name] = key
+                # the last result for these folders stands in until the scan confirms it
+                self.stats[name] = scanner.cached(key)
+                scanner.scan(key)
+            self.model.refresh(name)
+
+    def subset_scanned(self, key: tuple, stats: SubsetStats) -> None:
+        names = [name for name, scan_key in self.scan_keys.items() if scan_key == key]
+        for name in names:
+            self.stats[name] = stats
+        if names:
+            self.model.refresh(names[0] if len(names) == 1 else None)
 
     def enable_disable_masked_loss(self, checked: bool) -> None:
         self.masked_loss_checked = checked
-        for elem in self.elements:
-            elem.enable_disable_masked_loss(checked)
-            elem.enable_disable_random_crop(any([checked, self.cache_latents_checked]))
+        if self.editor_name is not None:
+            self.editor.enable_disable_masked_loss(checked)
+            self.editor.enable_disable_random_crop(any([checked, self.cache_latents_checked]))
+        self.apply_held_back()
 
     def enable_disable_cache_latents(self, checked: bool) -> None:
         self.cache_latents_checked = checked
-        for elem in self.elements:
-            elem.enable_disable_random_crop(any([checked, self.masked_loss_checked]))
-            elem.enable_disable_color_aug(checked)
+        if self.editor_name is not None:
+            self.editor.enable_disable_random_crop(any([checked, self.masked_loss_checked]))
+            self.editor.enable_disable_color_aug(checked)
+        self.apply_held_back()
 
     def enable_disable_variable_keep_tokens(self, checked: bool) -> None:
         self.variable_keep_tokens_checked = checked
-        for elem in self.elements:
-            elem.enable_disable_keep_tokens(checked)
+        if self.editor_name is not None:
+            self.editor.enable_disable_keep_tokens(checked)
+        self.apply_held_back()
 
     def load_args(self, _: dict) -> bool:
         return False
 
+    def normalize(self, name: str, subset: dict) -> tuple[dict, dict]:
+        """Returns the row args and held back values the editor makes of subset.
+
+        The result only depends on subset and the toggles, so switching back and
+        forth between queue items reuses it instead of loading the editor again.
+        """
+        key = (json.dumps(subset, sort_keys=True, default=str), *self.held_back().values())
+        if key not in self.normalized:
+            if len(self.normalized) > 512:
+                self.normalized.clear()
+            self.dataset_args[name] = {
+                "random_crop_padding_percent": 0.05,
+                **subset,
+                "name": name,
+            }
+            self.hidden_args[name] = {}
+            self.show_editor(name)
+            self.store_editor()
+            self.editor_name = None
+            self.normalized[key] = (
+                copy.deepcopy(self.dataset_args[name]),
+                copy.deepcopy(self.hidden_args[name]),
+            )
+        args, hidden = self.normalized[key]
+        args = copy.deepcopy(args)
+        args["name"] = name
+        return args, copy.deepcopy(hidden)
+
     def load_dataset_args(self, dataset_args: dict) -> bool:
-        while self.elements:
-            self.remove_subset(self.elements[0])
+        # a loaded toml replaces the subsets an import is still adding to
+        self.stop_import()
         if "subsets" not in dataset_args:
+            self.clear_subsets()
             return False
 
-        subsets = dataset_args["subsets"]
-        for subset in subsets:
+        row = max(self.widget.subset_table.currentIndex().row(), 0)
+        # the rows are replaced, nothing of the edited one needs storing
+        self.editor_name = None
+        self.dataset_args.clear()
+        self.hidden_args.clear()
+        self.display_names.clear()
+        self.stats.clear()
+        self.scan_keys.clear()
+        for subset in dataset_args["subsets"]:
             subset_name = (
                 subset["name"].split("_")[0]
                 if "name" in subset and subset["name"].split("_")[0]
                 else Path(subset["image_dir"]).name
             )
-            elem = self.add_empty_subset(subset_name)
-            elem.load_dataset_args(subset)
-        self.enable_disable_masked_loss(self.masked_loss_checked)
-        self.enable_disable_cache_latents(self.cache_latents_checked)
-        self.enable_disable_variable_keep_tokens(self.variable_keep_tokens_checked)
+            name = self.unique_name(subset_name)
+            self.display_names[name] = subset_name
+            self.dataset_args[name], self.hidden_args[name] = self.normalize(
+                name, {key: value for key, value in subset.items() if key != "name"}
+            )
+        names = list(self.dataset_args)
+        self.model.rebind(names)
+        self.select(names[min(row, len(names) - 1)] if names else None)
+        self.scan_subsets()
         return True
@@ -184,6 +184,9 @@ class SubsetWidget(BaseWidget):
         self, name: str, value: object, optional: bool = False
     ) -> None:
         super().edit_dataset_args(name, value, optional)
+        self.notify_changed()
+
+    def emit_changed(self) -> None:
         self.edited.emit(self.dataset_args, self.name)
 
     def set_folder_from_dialog(
@@ -362,6 +365,12 @@ class SubsetWidget(BaseWidget):
         )
 
     def load_dataset_args(self, dataset_args: dict) -> bool:
+        # every input below edits dataset_args, edited only goes out once at the end
+        with self.updating():
+            self.apply_dataset_args(dataset_args)
+            self.notify_changed()
+
+    def apply_dataset_args(self, dataset_args: dict) -> None:
         # update element inputs
         self.widget.image_folder_input.setText(dataset_args.get("image_dir", ""))
         self.widget.target_image_folder_input.setText(
@@ -513,5 +522,3 @@ class SubsetWidget(BaseWidget):
         self.edit_dataset_args(
             "protected_tags_file", self.extra_widget.protected_tags_input.text(), True
         )
-
-        self.edited.emit(self.dataset_args, self.name)
@@ -12,13 +12,13 @@ class TextualInversionWidget(BaseWidget):
         "init_word": "",
     }
 
-    def __init__(self, parent: QWidget = None) -> None:
-        super().__init__(parent)
+    def __init__(self, parent: QWidget = None, lazy: bool = False) -> None:
+        super().__init__(parent, lazy=lazy)
         self.colap.set_title("Textual Inversion Args")
         self.widget = Ui_textual_inversion_ui()
         self.name = "textual_inversion_args"
-        self.setup_widget()
-        self.setup_connections()
+        self.tokenize_request = None
+        self.build()
 
     def setup_widget(self) -> None:
         super().setup_widget()
@@ -41,13 +41,17 @@ class TextualInversionWidget(BaseWidget):
         self.tokenize_input()
 
     def tokenize_input(self):
+        # a reply for older text must not land after the one for the current text
+        if self.tokenize_request:
+            self.tokenize_request.cancel()
+            self.tokenize_request = None
         if not self.widget.vectors_per_token_enable.isChecked():
             input_text = self.widget.initial_word_input.text()
             if not input_text:
                 self.change_vectors_per_token(0)
                 return
             with contextlib.suppress(Exception):
-                NetworkManager().query(
+                self.tokenize_request = NetworkManager().query(
                     "/tokenize",
                     {"text": input_text},
                     lambda x: self.change_vectors_per_token(x["length"]),
@@ -0,0 +1,104 @@
+import gzip
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from modules.ConfigStore import ConfigStore
+
+CONNECT_TIMEOUT = 3.05
+# read timeouts by route, anything else gets DEFAULT_READ_TIMEOUT
+ROUTE_TIMEOUTS = {
+    # validation scans the dataset for tags, big ones take a while, but a hung backend must not block the queue
+    "/validate": 600.0,
+    "/train": 30.0,
+    "/is_training": 10.0,
+    # the backend sends a heartbeat well within this, silence means a dead stream
+    "/training_events": 30.0,
+    "/stop_training": 10.0,
+    "/stop_server": 5.0,
+    "/check_path": 10.0,
+    "/check_paths": 10.0,
+    # the backend only answers once the resize is done, the caller does not wait for it
+    "/resize": 0.05,
+}
+DEFAULT_READ_TIMEOUT = 30.0
+# only failed connects are retried, nothing has reached the backend at that point
+CONNECT_RETRIES = 1
+RETRY_BACKOFF = 0.2
+RETRY_JITTER = 0.2
+POOL_SIZE = 16
+GZIP_MIN_SIZE = 64 * 1024
+
+
+class BackendClient(object):
+    """One keep-alive requests session for every call to the backend.
+
+    Connections are pooled per host, so polling, validation and the queue
+    reuse sockets instead of opening one per request. Large json bodies are
+    gzipped when "backend_gzip" is set in config.json, the backend has to
+    accept Content-Encoding: gzip for that.
+    """
+
+    _instance = None
+    _session = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(BackendClient, cls).__new__(cls)
+        return cls._instance
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if BackendClient._session is None:
+                BackendClient._session = self.create_session()
+            return BackendClient._session
+
+    @staticmethod
+    def create_session() -> requests.Session:
+        retry = Retry(
+            total=CONNECT_RETRIES,
+            connect=CONNECT_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            redirect=0,
+            backoff_factor=RETRY_BACKOFF,
+            backoff_jitter=RETRY_JITTER,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def timeout(route: str) -> tuple[float, float | None]:
+        return CONNECT_TIMEOUT, ROUTE_TIMEOUTS.get(route, DEFAULT_READ_TIMEOUT)
+
+    def get(self, url: str, route: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout(route))
+        return self.session.get(f"{url}{route}", **kwargs)
+
+    def post(self, url: str, route: str, body: object = None, **kwargs) -> requests.Response:
+        """Posts body as json."""
+        kwargs.setdefault("timeout", self.timeout(route))
+        headers = {"Content-Type": "application/json", **kwargs.pop("headers", {})}
+        data = json.dumps(body).encode("utf-8")
+        if len(data) >= GZIP_MIN_SIZE and ConfigStore().get("backend_gzip", False):
+            data = gzip.compress(data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        return self.session.post(f"{url}{route}", data=data, headers=headers, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if BackendClient._session is not None:
+                BackendClient._session.close()
+                BackendClient._session = None
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import requests
+
+from modules.BackendClient import BackendClient
+
+HEALTH_TIMEOUT = 3.05
+# a backend that failed its check, or was busy with someone else's run, is skipped this long
+RETRY_DELAY = 15.0
+
+
+class Backend(object):
+    """One url of the pool, it keeps one validated config and one run so it takes one job at a time."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.running = False
+        self.reachable = True
+        self.retry_at = 0.0
+
+    def is_free(self) -> bool:
+        return not self.running and time.monotonic() >= self.retry_at
+
+    def check_health(self) -> bool:
+        """Reachable and not training."""
+        try:
+            response = BackendClient().get(self.url, "/is_training", timeout=HEALTH_TIMEOUT)
+            self.reachable = response.status_code == 200
+            idle = self.reachable and not response.json()["training"]
+        except (requests.RequestException, ValueError, KeyError):
+            self.reachable = False
+            idle = False
+        if not idle:
+            self.retry_at = time.monotonic() + RETRY_DELAY
+        return idle
+
+
+class BackendPool(object):
+    """Hands queue items to idle backends, one at a time each.
+
+    Urls come from the backend field, comma separated.
+    """
+
+    def __init__(self, urls: list[str]) -> None:
+        self.backends = [Backend(url) for url in urls]
+        self.condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    def busy_urls(self) -> list[str]:
+        with self.condition:
+            return [backend.url for backend in self.backends if backend.running]
+
+    def acquire(self, cancel: threading.Event) -> Backend | None:
+        """Blocks until a backend can take a job, None if cancelled or none is reachable."""
+        while not cancel.is_set():
+            with self.condition:
+                candidates = [backend for backend in self.backends if backend.is_free()]
+                if not candidates:
+                    if not any(backend.running or backend.reachable for backend in self.backends):
+                        print("No backend in the pool is reachable, stopping the queue.")
+                        return None
+                    self.condition.wait(1.0)
+                    continue
+            for backend in candidates:
+                if not backend.check_health():
+                    continue
+                with self.condition:
+                    if not backend.running:
+                        backend.running = True
+                        return backend
+        return None
+
+    def release(self, backend: Backend) -> None:
+        with self.condition:
+            backend.running = False
+            self.condition.notify_all()
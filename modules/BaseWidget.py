@@ -1,3 +1,6 @@
+import contextlib
+import copy
+
 from PySide6 import QtWidgets
 from modules.CollapsibleWidget import CollapsibleWidget
 from modules.DragDropLineEdit import DragDropLineEdit
@@ -11,16 +14,24 @@ class BaseWidget(QtWidgets.QWidget):
     DEFAULTS: dict[str, object] = {}
     DATASET_DEFAULTS: dict[str, object] = {}
 
-    def __init__(self, network_manager, parent: QtWidgets.QWidget = None) -> None:
+    def __init__(
+        self, network_manager, parent: QtWidgets.QWidget = None, lazy: bool = False
+    ) -> None:
         super().__init__(parent)
         self.colap = CollapsibleWidget(self)
         self.content = QtWidgets.QWidget()
         self.network_manager = network_manager
         self.widget = None
+        self.lazy = lazy
+        self.is_built = not lazy
 
         self.name = ""
-        self.args = dict(self.DEFAULTS)
-        self.dataset_args = dict(self.DATASET_DEFAULTS)
+        self.args = copy.deepcopy(self.DEFAULTS)
+        self.dataset_args = copy.deepcopy(self.DATASET_DEFAULTS)
+        self.update_depth = 0
+        self.change_pending = False
+        # how many change notifications actually went out, see notify_changed
+        self.emitted_changes = 0
 
     def _get_default(self, key: str, fallback=_SENTINEL):
         """Get default from DEFAULTS registry, with optional override fallback."""
@@ -34,7 +45,40 @@ class BaseWidget(QtWidgets.QWidget):
             return self.DATASET_DEFAULTS.get(key, fallback)
         return self.DATASET_DEFAULTS[key]
 
+    def build(self) -> None:
+        """Builds the section, or only its collapsible title when lazy.
+
+        A lazy section works against its args/DEFAULTS model until the user
+        first expands it, at which point ensure_built creates the real ui.
+        """
+        if not self.lazy:
+            self.build_content()
+            return
+        self.args = copy.deepcopy(self.DEFAULTS)
+        self.dataset_args = copy.deepcopy(self.DATASET_DEFAULTS)
+        BaseWidget.setup_widget(self)
+        self.colap.title_frame.clicked.connect(self.ensure_built)
+
+    def build_content(self) -> None:
+        self.setup_widget()
+        self.setup_connections()
+
+    def ensure_built(self) -> None:
+        if self.is_built:
+            return
+        self.is_built = True
+        args, dataset_args = self.args, self.dataset_args
+        self.args = copy.deepcopy(self.DEFAULTS)
+        self.dataset_args = copy.deepcopy(self.DATASET_DEFAULTS)
+        self.build_content()
+        # only replay the model when it moved away from what a fresh ui produces
+        if args != self.DEFAULTS or dataset_args != self.DATASET_DEFAULTS:
+            self.load_args({self.name: args})
+            self.load_dataset_args({self.name: dataset_args})
+
     def setup_widget(self) -> None:
+        if self.layout() is not None:
+            return
         self.setLayout(QtWidgets.QVBoxLayout())
         self.layout().addWidget(self.colap)
         self.layout().setContentsMargins(0, 0, 0, 0)
@@ -43,6 +87,35 @@ class BaseWidget(QtWidgets.QWidget):
     def setup_connections(self) -> None:
         raise NotImplementedError
 
+    def begin_update(self) -> None:
+        """Holds back change notifications until the matching end_update."""
+        self.update_depth += 1
+
+    def end_update(self) -> None:
+        self.update_depth -= 1
+        if self.update_depth == 0 and self.change_pending:
+            self.change_pending = False
+            self.notify_changed()
+
+    @contextlib.contextmanager
+    def updating(self):
+        self.begin_update()
+        try:
+            yield self
+        finally:
+            self.end_update()
+
+    def notify_changed(self) -> None:
+        """Sends emit_changed now, or once when the outermost update ends."""
+        if self.update_depth:
+            self.change_pending = True
+            return
+        self.emitted_changes += 1
+        self.emit_changed()
+
+    def emit_changed(self) -> None:
+        pass
+
     def edit_args(self, name: str, value: object, optional: bool = False) -> None:
         if name in self.args:
             del self.args[name]
@@ -100,3 +173,10 @@ class BaseWidget(QtWidgets.QWidget):
 
     def load_dataset_args(self, dataset_args: dict) -> bool:
         return self.name in dataset_args
+
+    def load_unbuilt_args(self, args: dict, dataset_args: dict) -> None:
+        """Loads straight into the args model of a section that isn't built yet."""
+        self.args = copy.deepcopy(args.get(self.name, self.DEFAULTS))
+        self.dataset_args = copy.deepcopy(
+            dataset_args.get(self.name, self.DATASET_DEFAULTS)
+        )
@@ -0,0 +1,225 @@
+import math
+
+import numpy as np
+
+from modules.DatasetManifest import DatasetManifest, is_image
+
+# Mirrors the bucketing of sd-scripts (model_util.make_bucket_resolutions and
+# train_util.BucketManager/DreamBoothDataset) so a dataset can be previewed
+# before training. Images are cropped into their bucket, never padded.
+
+# rows of the image x bucket error matrix handled at once
+CHUNK = 4096
+
+
+class BucketPreview(object):
+    def __init__(self) -> None:
+        # (width, height) -> [images, samples per epoch, batches, cropped pixels, resized pixels]
+        self.buckets: dict[tuple[int, int], list] = {}
+        self.images = 0
+        self.reg_images = 0
+        self.unreadable = 0
+        self.samples = 0
+        self.batches = 0
+        self.batch_size = 1
+        self.warnings: list[str] = []
+
+
+def make_bucket_resolutions(
+    max_reso: tuple[int, int], min_size: int = 256, max_size: int = 1024, divisible: int = 64
+) -> list[tuple[int, int]]:
+    max_width, max_height = max_reso
+    max_area = max_width * max_height
+
+    resos = set()
+    width = int(math.sqrt(max_area) // divisible) * divisible
+    resos.add((width, width))
+
+    width = min_size
+    while width <= max_size:
+        height = min(max_size, int((max_area // width) // divisible) * divisible)
+        if height >= min_size:
+            resos.add((width, height))
+            resos.add((height, width))
+        width += divisible
+    return sorted(resos)
+
+
+def round_to_steps(values: np.ndarray, steps: int) -> np.ndarray:
+    values = np.floor(values + 0.5).astype(np.int64)
+    return values - values % steps
+
+
+def select_buckets(
+    sizes: np.ndarray, resos: list[tuple[int, int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """BucketManager.select_bucket with predefined resolutions, for all (n, 2) sizes at once.
+
+    Returns the buckets and the sizes the images are resized to before cropping.
+    """
+    width = sizes[:, 0].astype(np.float64)
+    height = sizes[:, 1].astype(np.float64)
+    aspect = width / height
+    reso_array = np.array(resos, dtype=np.int64)
+    reso_aspects = reso_array[:, 0] / reso_array[:, 1]
+
+    index = np.empty(len(sizes), dtype=np.int64)
+    for start in range(0, len(sizes), CHUNK):
+        errors = np.abs(reso_aspects[None, :] - aspect[start : start + CHUNK, None])
+        index[start : start + CHUNK] = errors.argmin(axis=1)
+    buckets = reso_array[index]
+    # an image that already has a bucket's exact size keeps it
+    exact = np.isin(sizes[:, 0] * 1_000_000 + sizes[:, 1], reso_array[:, 0] * 1_000_000 + reso_array[:, 1])
+    buckets[exact] = sizes[exact]
+
+    bucket_aspect = buckets[:, 0] / buckets[:, 1]
+    scale = np.where(aspect > bucket_aspect, buckets[:, 1] / height, buckets[:, 0] / width)
+    resized = np.stack(
+        [np.floor(width * scale + 0.5), np.floor(height * scale + 0.5)], axis=1
+    ).astype(np.int64)
+    return buckets, resized
+
+
+def no_upscale_buckets(
+    sizes: np.ndarray, max_reso: tuple[int, int], steps: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """BucketManager.select_bucket with bucket_no_upscale, images only ever shrink."""
+    max_area = max_reso[0] * max_reso[1]
+    width = sizes[:, 0].astype(np.float64)
+    height = sizes[:, 1].astype(np.float64)
+    aspect = width / height
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resized_width = np.sqrt(max_area * aspect)
+        resized_height = max_area / resized_width
+        width_rounded = round_to_steps(resized_width, steps)
+        height_in_wr = round_to_steps(width_rounded / aspect, steps)
+        aspect_wr = width_rounded / height_in_wr
+        height_rounded = round_to_steps(resized_height, steps)
+        width_in_hr = round_to_steps(height_rounded * aspect, steps)
+        aspect_hr = width_in_hr / height_rounded
+        by_width = np.abs(aspect_wr - aspect) < np.abs(aspect_hr - aspect)
+        shrunk = np.where(
+            by_width[:, None],
+            np.stack([width_rounded, np.floor(width_rounded / aspect + 0.5)], axis=1),
+            np.stack([np.floor(height_rounded * aspect + 0.5), height_rounded], axis=1),
+        )
+    too_big = (sizes[:, 0] * sizes[:, 1]) > max_area
+    resized = np.where(too_big[:, None], shrunk, sizes).astype(np.int64)
+    buckets = resized - resized % steps
+    return buckets, resized
+
+
+def epoch_repeats(train_samples: int, reg_repeats: np.ndarray) -> np.ndarray:
+    """How often each regularization image is seen per epoch.
+
+    Same as DreamBoothDataset: reg images are added in order with their own
+    repeats until they match the training images, then one more repeat each
+    in turn. Images past that point in the first round are left out.
+    """
+    repeats = np.zeros_like(reg_repeats)
+    if not len(reg_repeats) or train_samples <= 0:
+        return repeats
+    totals = np.cumsum(reg_repeats)
+    if totals[-1] >= train_samples:
+        last = int(np.searchsorted(totals, train_samples))
+        repeats[: last + 1] = reg_repeats[: last + 1]
+        return repeats
+    remaining = train_samples - int(totals[-1])
+    count = len(reg_repeats)
+    repeats = reg_repeats + remaining // count
+    repeats[: remaining % count] += 1
+    return repeats
+
+
+def image_sizes(image_dir: str) -> list[tuple[int, int] | None]:
+    """Sizes of the images of a folder in the trainer's order, read through the manifest."""
+    manifest = DatasetManifest()
+    try:
+        records = manifest.refresh(image_dir)
+    except OSError:
+        return []
+    # the trainer sorts the paths of a folder, which matters for the reg image order
+    names = sorted(name for name in records if is_image(name))
+    return manifest.image_sizes(image_dir, records, names)
+
+
+def simulate(
+    subsets: list[dict],
+    resolution: int | list[int],
+    batch_size: int,
+    bucket_args: dict,
+) -> BucketPreview:
+    """Spreads the images of subsets over buckets the way the trainer will."""
+    preview = BucketPreview()
+    preview.batch_size = max(1, int(batch_size or 1))
+    max_reso = tuple(resolution) if isinstance(resolution, (list, tuple)) else (resolution, resolution)
+    if len(max_reso) == 1:
+        max_reso = (max_reso[0], max_reso[0])
+    enable_bucket = bucket_args.get("enable_bucket", False)
+    no_upscale = enable_bucket and bucket_args.get("bucket_no_upscale", False)
+    min_size = int(bucket_args.get("min_bucket_reso", 256))
+    max_size = int(bucket_args.get("max_bucket_reso", 1024))
+    steps = int(bucket_args.get("bucket_reso_steps", 64))
+    if enable_bucket and (min_size > min(max_reso) or max_size < max(max_reso)):
+        preview.warnings.append(
+            "the bucket resolution range has to contain the training resolution, training will fail"
+        )
+    if bucket_args.get("multires_training"):
+        preview.warnings.append("multi-res training is not simulated, its extra buckets are missing")
+
+    read, repeats, is_reg = [], [], []
+    for subset in subsets:
+        if subset.get("is_val") or not subset.get("image_dir"):
+            continue
+        sizes = image_sizes(subset["image_dir"])
+        read.extend(sizes)
+        repeats.extend([int(subset.get("num_repeats", 1))] * len(sizes))
+        is_reg.extend([bool(subset.get("is_reg"))] * len(sizes))
+
+    readable = np.array([size is not None for size in read], dtype=bool)
+    preview.unreadable = int((~readable).sum())
+    if not readable.any():
+        return preview
+    sizes = np.array([size for size in read if size is not None], dtype=np.int64)
+    repeats = np.array(repeats, dtype=np.int64)[readable]
+    is_reg = np.array(is_reg, dtype=bool)[readable]
+    # broken headers would divide by zero, the trainer can't load those either
+    valid = (sizes > 0).all(axis=1)
+    preview.unreadable += int((~valid).sum())
+    sizes, repeats, is_reg = sizes[valid], repeats[valid], is_reg[valid]
+    if not len(sizes):
+        return preview
+
+    train_samples = int(repeats[~is_reg].sum())
+    repeats[is_reg] = epoch_repeats(train_samples, repeats[is_reg])
+    preview.images = int((~is_reg).sum())
+    preview.reg_images = int((is_reg & (repeats > 0)).sum())
+
+    if no_upscale:
+        buckets, resized = no_upscale_buckets(sizes, max_reso, steps)
+    elif enable_bucket:
+        buckets, resized = select_buckets(sizes, make_bucket_resolutions(max_reso, min_size, max_size, steps))
+    else:
+        buckets, resized = select_buckets(sizes, [max_reso])
+
+    used = repeats > 0
+    buckets, resized, repeats = buckets[used], resized[used], repeats[used]
+    keys, inverse = np.unique(buckets, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    images = np.bincount(inverse, minlength=len(keys))
+    samples = np.bincount(inverse, weights=repeats, minlength=len(keys)).astype(np.int64)
+    resized_pixels = np.bincount(inverse, weights=resized[:, 0] * resized[:, 1], minlength=len(keys))
+    bucket_pixels = np.bincount(inverse, weights=buckets[:, 0] * buckets[:, 1], minlength=len(keys))
+    batches = -(-samples // preview.batch_size)
+    for index, (width, height) in enumerate(keys.tolist()):
+        preview.buckets[(width, height)] = [
+            int(images[index]),
+            int(samples[index]),
+            int(batches[index]),
+            float(resized_pixels[index] - bucket_pixels[index]),
+            float(resized_pixels[index]),
+        ]
+    preview.samples = int(samples.sum())
+    preview.batches = int(batches.sum())
+    return preview
@@ -0,0 +1,110 @@
+import atexit
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+
+CONFIG_FILE = Path("config.json")
+WRITE_DELAY = 0.5
+
+
+class ConfigStore(object):
+    """Process wide view of config.json.
+
+    The file is read once, reads are served from memory and writes are
+    coalesced into a single atomic rewrite of the whole file after
+    WRITE_DELAY seconds of quiet. Everything goes through one dict behind a
+    lock, so concurrent writers no longer overwrite each other's keys.
+    """
+
+    _instance = None
+    _lock = None
+    _data = None
+    _path = None
+    _timer = None
+    _dirty = False
+    _subscribers = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ConfigStore, cls).__new__(cls)
+            cls._lock = threading.RLock()
+            cls._path = CONFIG_FILE
+            cls._subscribers = []
+            cls._data = cls._read(cls._path)
+            atexit.register(cls._instance.flush)
+        return cls._instance
+
+    @staticmethod
+    def _read(path: Path) -> dict:
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            print(f"Could not parse {path.as_posix()}, starting from an empty config")
+            return {}
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return copy.deepcopy(self._data.get(key, default))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def set(self, key: str, value) -> None:
+        self.update({key: value})
+
+    def update(self, values: dict) -> None:
+        with self._lock:
+            changed = {
+                key: copy.deepcopy(value)
+                for key, value in values.items()
+                if key not in self._data or self._data[key] != value
+            }
+            if not changed:
+                return
+            self._data.update(changed)
+            ConfigStore._dirty = True
+            self._schedule_write()
+            subscribers = list(self._subscribers)
+        for key, value in changed.items():
+            for callback, only_key in subscribers:
+                if only_key is None or only_key == key:
+                    callback(key, copy.deepcopy(value))
+
+    def subscribe(self, callback, key: str | None = None) -> None:
+        """Calls callback(key, value) after every change, or only changes of key."""
+        with self._lock:
+            self._subscribers.append((callback, key))
+
+    def unsubscribe(self, callback) -> None:
+        with self._lock:
+            self._subscribers = [sub for sub in self._subscribers if sub[0] != callback]
+
+    def _schedule_write(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+        ConfigStore._timer = threading.Timer(WRITE_DELAY, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Writes the config to disk now, through a temp file and a rename."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                ConfigStore._timer = None
+            if not self._dirty:
+                return
+            ConfigStore._dirty = False
+            content = json.dumps(self._data, indent=2)
+            temp = self._path.with_name(f"{self._path.name}.tmp")
+            temp.write_text(content)
+            os.replace(temp, self._path)
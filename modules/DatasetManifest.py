@@ -0,0 +1,198 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from typing import NamedTuple
+
+from modules.ImageHeaders import image_size
+
+MANIFEST_FILE = Path("dataset_manifest.sqlite")
+# what the trainer picks up as images, compared lower case
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".avif", ".jxl"}
+# a big folder is stat'ed in chunks of this size on the stat pool
+STAT_CHUNK = 2048
+STAT_WORKERS = 8
+READ_WORKERS = 8
+# rows written per transaction, keeps other threads from waiting on the lock for long
+WRITE_BATCH = 5000
+
+
+class FileRecord(NamedTuple):
+    size: int
+    mtime: int
+    # image size from the header, (0, 0) when it could not be read, None until asked for
+    width: int | None
+    height: int | None
+    # blake2b of a caption file, None until asked for
+    digest: str | None
+
+
+def is_image(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _stat_entries(entries: list[os.DirEntry]) -> list[tuple[str, int, int]]:
+    stats = []
+    for entry in entries:
+        try:
+            info = entry.stat()
+        except OSError:
+            continue
+        stats.append((entry.name, info.st_size, info.st_mtime_ns))
+    return stats
+
+
+def _digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as file:
+            return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+class DatasetManifest(object):
+    """What is known about every file of the dataset folders, kept in MANIFEST_FILE.
+
+    refresh lists a folder and stats its files, only new or changed files lose
+    what was read from them before. Image sizes and caption digests are read
+    the first time someone asks and stay until the file changes, so a rescan of
+    a big library costs a stat per file. Safe to use from any thread, each one
+    gets its own connection.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DatasetManifest, cls).__new__(cls)
+            cls._instance.setup()
+        return cls._instance
+
+    def setup(self) -> None:
+        self.path = MANIFEST_FILE
+        self.local = threading.local()
+        self.stat_pool = ThreadPoolExecutor(max_workers=STAT_WORKERS, thread_name_prefix="manifest-stat")
+        self.read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="manifest-read")
+        with self.connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "folder TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL, mtime INTEGER NOT NULL, "
+                "width INTEGER, height INTEGER, digest TEXT, PRIMARY KEY (folder, name)) WITHOUT ROWID"
+            )
+            # results worked out from a whole folder, valid while its fingerprint matches
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS folder_cache ("
+                "kind TEXT NOT NULL, key TEXT NOT NULL, fingerprint TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (kind, key)) WITHOUT ROWID"
+            )
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            # readers never wait on a writer, and a crash loses at most the last write
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def stat_folder(self, folder: str) -> list[Future]:
+        """Stats every file in folder on the stat pool, raises OSError when it can't be listed.
+
+        The futures give lists of (name, size, mtime).
+        """
+        with os.scandir(folder) as entries:
+            files = [entry for entry in entries if entry.is_file()]
+        return [
+            self.stat_pool.submit(_stat_entries, files[i : i + STAT_CHUNK])
+            for i in range(0, len(files), STAT_CHUNK)
+        ]
+
+    def refresh(self, folder: str) -> dict[str, FileRecord]:
+        """Brings the rows of folder up to date with the disk and returns them by file name.
+
+        image_sizes and digests fill in the records they are given.
+        """
+        folder = os.path.abspath(folder)
+        chunks = self.stat_folder(folder)
+        # the rows load while the files are stat'ed
+        known = {
+            row[0]: FileRecord._make(row[1:])
+            for row in self.connection().execute(
+                "SELECT name, size, mtime, width, height, digest FROM files WHERE folder = ?", (folder,)
+            )
+        }
+        stats = [stat for chunk in chunks for stat in chunk.result()]
+        records = {}
+        changed = []
+        for name, size, mtime in stats:
+            record = known.pop(name, None)
+            if record is None or record.size != size or record.mtime != mtime:
+                record = FileRecord(size, mtime, None, None, None)
+                changed.append((folder, name, size, mtime))
+            records[name] = record
+        self.write(
+            "INSERT OR REPLACE INTO files (folder, name, size, mtime) VALUES (?, ?, ?, ?)", changed
+        )
+        self.write("DELETE FROM files WHERE folder = ? AND name = ?", [(folder, name) for name in known])
+        return records
+
+    def write(self, statement: str, rows: list[tuple]) -> None:
+        connection = self.connection()
+        for start in range(0, len(rows), WRITE_BATCH):
+            with connection:
+                connection.executemany(statement, rows[start : start + WRITE_BATCH])
+
+    def cached(self, kind: str, key: str, fingerprint: str) -> str | None:
+        row = self.connection().execute(
+            "SELECT data FROM folder_cache WHERE kind = ? AND key = ? AND fingerprint = ?",
+            (kind, key, fingerprint),
+        ).fetchone()
+        return row[0] if row else None
+
+    def store(self, kind: str, key: str, fingerprint: str, data: str) -> None:
+        self.write(
+            "INSERT OR REPLACE INTO folder_cache (kind, key, fingerprint, data) VALUES (?, ?, ?, ?)",
+            [(kind, key, fingerprint, data)],
+        )
+
+    def image_sizes(
+        self, folder: str, records: dict[str, FileRecord], names: list[str]
+    ) -> list[tuple[int, int] | None]:
+        """Sizes of the images names in folder, headers are only read for files without one."""
+        folder = os.path.abspath(folder)
+        missing = [name for name in names if records[name].width is None]
+        read = self.read_pool.map(
+            image_size, [os.path.join(folder, name) for name in missing], chunksize=256
+        )
+        rows = []
+        for name, size in zip(missing, read):
+            width, height = size or (0, 0)
+            records[name] = records[name]._replace(width=width, height=height)
+            rows.append((width, height, folder, name, records[name].size, records[name].mtime))
+        # the size and mtime guard keeps a file that changed meanwhile from getting a stale size
+        self.write(
+            "UPDATE files SET width = ?, height = ? WHERE folder = ? AND name = ? AND size = ? AND mtime = ?",
+            rows,
+        )
+        return [
+            (records[name].width, records[name].height) if records[name].width else None for name in names
+        ]
+
+    def digests(self, folder: str, records: dict[str, FileRecord], names: list[str]) -> list[str | None]:
+        """Content digests of the files names in folder, only new or changed files are read."""
+        folder = os.path.abspath(folder)
+        missing = [name for name in names if records[name].digest is None]
+        read = self.read_pool.map(_digest, [os.path.join(folder, name) for name in missing], chunksize=256)
+        rows = []
+        for name, digest in zip(missing, read):
+            if digest is None:
+                continue
+            records[name] = records[name]._replace(digest=digest)
+            rows.append((digest, folder, name, records[name].size, records[name].mtime))
+        self.write(
+            "UPDATE files SET digest = ? WHERE folder = ? AND name = ? AND size = ? AND mtime = ?", rows
+        )
+        return [records[name].digest for name in names]
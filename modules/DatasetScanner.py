@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+from PySide6 import QtCore
+from PySide6.QtCore import Signal
+
+from modules.DatasetManifest import DatasetManifest, is_image
+
+WORKERS = 4
+# a result is reused while the folders keep their mtime, but never longer than this
+CACHE_TTL = 30.0
+
+
+class SubsetStats(object):
+    def __init__(self) -> None:
+        self.images = 0
+        self.captions = 0
+        self.missing_captions = 0
+        self.masks = 0
+        self.bytes = 0
+        self.error: str | None = None
+        self.mask_error: str | None = None
+        self.duration = 0.0
+
+
+def list_files(folder: str) -> list[os.DirEntry]:
+    with os.scandir(folder) as entries:
+        return [entry for entry in entries if entry.is_file()]
+
+
+def scan_subset(image_dir: str, caption_extension: str, conditioning_dir: str | None = None) -> SubsetStats:
+    """Counts what the trainer will find in one subset, captions are matched by file stem."""
+    stats = SubsetStats()
+    start = time.perf_counter()
+    try:
+        records = DatasetManifest().refresh(image_dir)
+    except OSError as e:
+        stats.error = e.strerror or str(e)
+        return stats
+    names = set(records)
+    images = [name for name in records if is_image(name)]
+    stems = [os.path.splitext(name)[0] for name in images]
+    stats.images = len(images)
+    stats.captions = sum(1 for stem in stems if stem + caption_extension in names)
+    stats.missing_captions = stats.images - stats.captions
+    if conditioning_dir:
+        try:
+            mask_stems = {
+                os.path.splitext(entry.name)[0]
+                for entry in list_files(conditioning_dir)
+                if is_image(entry.name)
+            }
+            stats.masks = sum(1 for stem in stems if stem in mask_stems)
+        except OSError as e:
+            stats.mask_error = e.strerror or str(e)
+    stats.bytes = sum(records[name].size for name in images)
+    stats.duration = time.perf_counter() - start
+    return stats
+
+
+def folder_mtime(folder: str | None) -> int | None:
+    if not folder:
+        return None
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _Results(QtCore.QObject):
+    # (key, SubsetStats), sent from the workers to the gui thread
+    scanned = Signal(object, object)
+
+
+class DatasetScanner(object):
+    """Scans subset folders on a thread pool, results come back through scanned.
+
+    A key is (image_dir, caption_extension, conditioning_dir). The same key is
+    only scanned once at a time, and a finished scan is reused until one of
+    its folders changes or CACHE_TTL runs out.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DatasetScanner, cls).__new__(cls)
+            cls._instance.setup()
+        return cls._instance
+
+    def setup(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="dataset-scan")
+        self.results = _Results()
+        self.scanned = self.results.scanned
+        self.in_flight: set[tuple] = set()
+        # key -> (folder mtimes, finished at, stats)
+        self.cache: dict[tuple, tuple[tuple, float, SubsetStats]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(subset: dict) -> tuple[str, str, str | None] | None:
+        if not subset.get("image_dir"):
+            return None
+        return (
+            subset["image_dir"],
+            subset.get("caption_extension", ".caption"),
+            subset.get("conditioning_data_dir") or None,
+        )
+
+    def cached(self, key: tuple) -> SubsetStats | None:
+        with self.lock:
+            entry = self.cache.get(key)
+        if not entry or time.monotonic() - entry[1] > CACHE_TTL:
+            return None
+        return entry[2]
+
+    def scan(self, key: tuple) -> None:
+        """Queues key, scanned fires once it is done."""
+        with self.lock:
+            if key in self.in_flight:
+                return
+            self.in_flight.add(key)
+        self.executor.submit(self.run_scan, key)
+
+    def run_scan(self, key: tuple) -> None:
+        stats = self.lookup(key)
+        with self.lock:
+            self.in_flight.discard(key)
+        self.scanned.emit(key, stats)
+
+    def lookup(self, key: tuple) -> SubsetStats:
+        """The cached stats of key if its folders are unchanged, otherwise scans it on this thread."""
+        image_dir, caption_extension, conditioning_dir = key
+        mtimes = (folder_mtime(image_dir), folder_mtime(conditioning_dir))
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry and entry[0] == mtimes and time.monotonic() - entry[1] <= CACHE_TTL:
+            stats = entry[2]
+        else:
+            try:
+                stats = scan_subset(image_dir, caption_extension, conditioning_dir)
+            except Exception as e:
+                stats = SubsetStats()
+                stats.error = str(e)
+            # a missing folder is cached too, its mtime of None changes once it shows up
+            with self.lock:
+                self.cache[key] = (mtimes, time.monotonic(), stats)
+        return stats
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.cache.clear()
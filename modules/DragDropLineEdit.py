@@ -1,10 +1,8 @@
-import json
 from pathlib import Path
 import typing
-from threading import Thread
 
 from PySide6 import QtGui, QtCore, QtWidgets
-import requests
+from modules.PathValidator import PathValidator
 
 
 class DragDropLineEdit(QtWidgets.QLineEdit):
@@ -26,8 +24,11 @@ class DragDropLineEdit(QtWidgets.QLineEdit):
         self.setPlaceholderText(name)
         self.extensions = extensions
         self.setAcceptDrops(True)
-        self.validation_thread = None
         self.skip_validation_check = False
+        self.error_sheet = """
+            border-color: #dc3545
+        """
+        PathValidator().register(self)
 
     def dragEnterEvent(self, event: QtGui.QDragEnterEvent) -> None:
         if event.mimeData().hasUrls():
@@ -70,38 +71,10 @@ class DragDropLineEdit(QtWidgets.QLineEdit):
             QtCore.QTimer.singleShot(0, self.selectAll)
 
     def update_stylesheet(self) -> None:
-        return
+        """Highlights the field once the path has been checked, see PathValidator."""
         if self.skip_validation_check:
             return
-        if self.validation_thread and self.validation_thread.is_alive():
-            return
-        self.validation_thread = Thread(
-            target=self.update_stylesheet_thread, daemon=True
-        )
-        self.validation_thread.start()
+        PathValidator().request(self)
 
-    def update_stylesheet_thread(self) -> None:
-        config = Path("config.json")
-        config = (
-            json.loads(config.read_text())
-            if config.exists()
-            else {"backend_url": "http://127.0.0.1:8000"}
-        )
-        try:
-            response = requests.post(
-                f"{config.get('backend_url', 'http://127.0.0.1:8000')}/check_path",
-                json=True,
-                data=json.dumps(
-                    {
-                        "path": self.text(),
-                        "type": self.mode,
-                        "extensions": self.extensions,
-                    }
-                ),
-            )
-            valid = bool(response.json()["valid"])
-        except Exception:
-            valid = True
-        if valid:
-            return
-        return
+    def set_valid(self, valid: bool) -> None:
+        self.setStyleSheet("" if valid else self.error_sheet)
@@ -2,4 +2,10 @@ from enum import Enum
 
 class TrainingModes(Enum):
     LORA = "lora"
-    TI = "textual_inversion"
\ No newline at end of file
+    TI = "textual_inversion"
+
+class TrainingStates(Enum):
+    IDLE = "idle"
+    RUNNING = "running"
+    # stop was sent, waiting on the backend to end the run
+    STOPPING = "stopping"
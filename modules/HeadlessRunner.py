@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from modules.TrainingJobs import launch_item, prepare_item
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CONNECTION = 3
+
+
+def find_queue(queue: Path) -> list[Path]:
+    """A single toml, or every toml in a folder in file name order.
+
+    Queue files are named by when they were added, moving an item in the ui
+    does not rename its file, so this is not the order the ui shows.
+    """
+    if queue.is_file():
+        return [queue]
+    if queue.is_dir():
+        return sorted(file for file in queue.glob("*.toml") if file.name != "temp.toml")
+    return []
+
+
+def run_queue(queue: Path, url: str, keep_going: bool = False) -> int:
+    """Runs the queue against one backend without Qt and returns the process exit code.
+
+    The tomls are left in place, tag files and auto-save copies are written
+    just like from the ui.
+    """
+    files = find_queue(queue)
+    if not files:
+        print(f"No toml files found at {queue.as_posix()}")
+        return EXIT_USAGE
+    failed = []
+    for index, file in enumerate(files, 1):
+        print(f"[{index}/{len(files)}] {file.name} on {url}")
+        connection_errors = []
+        item = prepare_item(url, file, on_connection_error=connection_errors.append)
+        if connection_errors:
+            print(connection_errors[0])
+            return EXIT_CONNECTION
+        if item and launch_item(url, item, remove_toml=False):
+            continue
+        print(f"{file.name} failed")
+        failed.append(file.name)
+        if not keep_going:
+            return EXIT_FAILED
+    if failed:
+        print(f"{len(failed)} of {len(files)} items failed: {', '.join(failed)}")
+        return EXIT_FAILED
+    return EXIT_OK
@@ -0,0 +1,79 @@
+import struct
+from pathlib import Path
+
+# Image sizes straight from the file headers, no pixels are decoded. The size
+# is the stored one, EXIF orientation is ignored the same way the trainer does.
+
+# JPEG start of frame markers, C4 (DHT), C8 (JPG) and CC (DAC) only share the range
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# markers without a length field
+_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD9)}
+
+
+def image_size(path: str | Path) -> tuple[int, int] | None:
+    """(width, height) of a png, jpeg, webp or bmp file, None if unreadable or another format."""
+    try:
+        with open(path, "rb") as file:
+            head = file.read(32)
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head.startswith(b"\xff\xd8"):
+                file.seek(2)
+                return _jpeg_size(file)
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                return _webp_size(head)
+            if head.startswith(b"BM") and len(head) >= 26:
+                return _bmp_size(head)
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def _jpeg_size(file) -> tuple[int, int] | None:
+    while True:
+        byte = file.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = file.read(1)
+        # any number of 0xff fill bytes can come before a marker
+        while marker == b"\xff":
+            marker = file.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in _STANDALONE_MARKERS or marker == 0x00:
+            continue
+        if marker == 0xD9:
+            return None
+        length = struct.unpack(">H", file.read(2))[0]
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack(">xHH", file.read(5))
+            return width, height
+        file.seek(length - 2, 1)
+
+
+def _webp_size(head: bytes) -> tuple[int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        b0, b1, b2, b3 = head[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b"VP8X":
+        width = 1 + int.from_bytes(head[24:27], "little")
+        height = 1 + int.from_bytes(head[27:30], "little")
+        return width, height
+    return None
+
+
+def _bmp_size(head: bytes) -> tuple[int, int]:
+    if struct.unpack("<I", head[14:18])[0] == 12:
+        return struct.unpack("<HH", head[18:22])
+    width, height = struct.unpack("<ii", head[18:26])
+    # negative heights are top down bitmaps
+    return abs(width), abs(height)
@@ -1,11 +1,12 @@
-import json
 from pathlib import Path
 from PySide6 import QtWidgets
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QCheckBox, QFrame, QHBoxLayout, QLabel, QLineEdit, QPushButton
 import requests
 from ui_files.LoraResizePopupUI import Ui_lora_resize_ui
+from modules.BackendClient import BackendClient
 from modules.BaseDialog import BaseDialog
+from modules.ConfigStore import ConfigStore
 from modules.DragDropLineEdit import DragDropLineEdit
 from modules.ScrollOnSelect import ComboBox
 
@@ -350,20 +351,14 @@ class LoraResizePopup(BaseDialog):
         self.resize_helper(args)
 
     def resize_helper(self, args: str) -> bool:
-        config = Path("config.json")
-        config_dict = json.loads(config.read_text()) if config.exists() else {}
-        url = config_dict.get("backend_url", "http://127.0.0.1:8000")
+        url = ConfigStore().get("backend_url", "http://127.0.0.1:8000")
         try:
-            response = requests.post(
-                f"{url}/resize",
-                data=json.dumps(args),
-                timeout=0.05,
-            )
-        except ConnectionError as e:
-            print(e)
-            return False
+            response = BackendClient().post(url, "/resize", args)
         except requests.exceptions.Timeout:
             return True
+        except requests.ConnectionError as e:
+            print(e)
+            return False
         if response.status_code != 200:
             print(f"Failed to resize: {response.text}")
             return False
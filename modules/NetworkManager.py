@@ -1,9 +1,17 @@
-from PySide6.QtCore import QUrlQuery, QUrl, QTimer
+from PySide6.QtCore import QUrlQuery, QUrl, QTimer, QByteArray
 from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 import json
+import time
 
+from modules.ConfigStore import ConfigStore
 from functools import wraps
 
+# seconds a successful reply is reused for, routes not listed here are never cached
+ROUTE_CACHE_TTL = {
+    "/tokenize": 300.0,
+}
+CACHE_SIZE = 256
+
 # Wrap failed network reply with additional error message
 def default_error(message = ""):
     def print_error(reply: QNetworkReply):
@@ -13,53 +21,209 @@ def default_error(message = ""):
     return print_error
 
 
+class RequestHandle(object):
+    """What query/get_json/post_json return, cancel drops the callbacks.
+
+    The reply itself is only aborted once nobody else is waiting on it.
+    """
+
+    def __init__(self, key: tuple, on_success, on_failure) -> None:
+        self.key = key
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.done = False
+
+    def cancel(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        NetworkManager().unsubscribe(self)
+
+
 class NetworkManager(object):
+    """The non-blocking client for the backend, replies come back on the ui thread.
+
+    Identical requests that are still in flight share one reply, and replies of
+    the routes in ROUTE_CACHE_TTL are reused until they expire.
+    """
+
     _instance = None
     _url = None
     _network_manager = None
+    # key -> (reply, handles waiting on it)
+    _in_flight: dict[tuple, tuple[QNetworkReply, list[RequestHandle]]] = {}
+    # key -> (expiry, decoded reply)
+    _cache: dict[tuple, tuple[float, object]] = {}
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(NetworkManager, cls).__new__(cls)
             cls._network_manager = QNetworkAccessManager()
-            cls._url = "http://localhost:8000"
+            cls._url = ConfigStore().get("backend_url", "http://localhost:8000")
+            ConfigStore().subscribe(lambda _, url: cls._instance.set_backend_url(url), key="backend_url")
         return cls._instance
 
     def set_backend_url(self, url: str):
-        self._url = url
+        if url != NetworkManager._url:
+            # replies of the old backend say nothing about the new one
+            self.clear_cache()
+        NetworkManager._url = url
 
-    def query(self, route: str, data: dict, on_success, on_failure = None):
-        url = QUrl(self._url)
+    def build_url(self, route: str, data: dict | None = None, base_url: str | None = None) -> QUrl:
+        url = QUrl(base_url or self._url)
         url.setPath(route)
-        query = QUrlQuery()
-        for key, value in data.items():
-            query.addQueryItem(key, value)
-        url.setQuery(query)
-        request = QNetworkRequest(url)
-        reply = self._network_manager.get(request)
+        if data:
+            query = QUrlQuery()
+            for key, value in data.items():
+                query.addQueryItem(key, str(value))
+            url.setQuery(query)
+        return url
+
+    def query(self, route: str, data: dict, on_success, on_failure = None, cache_ttl: float | None = None) -> RequestHandle:
+        """GETs route with data as the query string."""
+        return self.send("GET", route, self.build_url(route, data), None, on_success, on_failure, cache_ttl)
+
+    def get_json(self, route: str, on_success, on_failure = None, cache_ttl: float | None = None, base_url: str | None = None) -> RequestHandle:
+        """GETs route, from base_url instead of the configured backend when given."""
+        return self.send("GET", route, self.build_url(route, base_url=base_url), None, on_success, on_failure, cache_ttl)
+
+    def post_json(self, route: str, body: object, on_success, on_failure = None, cache_ttl: float | None = None) -> RequestHandle:
+        """POSTs body as json, same as BackendClient.post but without blocking."""
+        data = json.dumps(body, sort_keys=True).encode("utf-8")
+        return self.send("POST", route, self.build_url(route), data, on_success, on_failure, cache_ttl)
+
+    def send(self, method: str, route: str, url: QUrl, data: bytes | None, on_success, on_failure, cache_ttl: float | None) -> RequestHandle:
+        key = (method, url.toString(), data)
         on_failure = on_failure or default_error("Query failed: " + route)
-        reply.finished.connect(lambda: self.handle_response(reply, on_success, on_failure))
+        handle = RequestHandle(key, on_success, on_failure)
+        ttl = ROUTE_CACHE_TTL.get(route, 0.0) if cache_ttl is None else cache_ttl
+
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            # still answered later, callers can count on the callback never running inline
+            QTimer.singleShot(0, lambda: self.deliver(handle, cached[1]))
+            return handle
+        self._cache.pop(key, None)
 
+        if key in self._in_flight:
+            self._in_flight[key][1].append(handle)
+            return handle
 
-    def handle_response(self, reply: QNetworkReply, on_success, on_failure):
-        if reply.error() == QNetworkReply.NoError:
-            response_data = json.loads(reply.readAll().data())
-            on_success(response_data)
+        request = QNetworkRequest(url)
+        if method == "POST":
+            request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
+            reply = self._network_manager.post(request, QByteArray(data))
         else:
-            on_failure(reply)
+            reply = self._network_manager.get(request)
+        self._in_flight[key] = (reply, [handle])
+        reply.finished.connect(lambda: self.handle_response(key, reply, ttl))
+        return handle
+
+    def unsubscribe(self, handle: RequestHandle) -> None:
+        entry = self._in_flight.get(handle.key)
+        if entry is None or handle not in entry[1]:
+            return
+        entry[1].remove(handle)
+        if not entry[1]:
+            del self._in_flight[handle.key]
+            entry[0].abort()
+
+    def cancel_all(self) -> None:
+        for _, handles in list(self._in_flight.values()):
+            for handle in list(handles):
+                handle.cancel()
+
+    def clear_cache(self) -> None:
+        NetworkManager._cache.clear()
+
+    @staticmethod
+    def deliver(handle: RequestHandle, response_data) -> None:
+        if handle.done:
+            return
+        handle.done = True
+        handle.on_success(response_data)
+
+    def handle_response(self, key: tuple, reply: QNetworkReply, ttl: float):
+        entry = self._in_flight.get(key)
+        # aborted, or a newer request for the same key took its place
+        handles = entry[1] if entry and entry[0] is reply else []
+        if handles:
+            del self._in_flight[key]
+        response_data, failed = None, reply.error() != QNetworkReply.NoError
+        if not failed and handles:
+            try:
+                response_data = json.loads(reply.readAll().data())
+            except ValueError:
+                failed = True
+        if not failed and handles and ttl > 0:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = (time.monotonic() + ttl, response_data)
+        for handle in handles:
+            if handle.done:
+                continue
+            handle.done = True
+            if failed:
+                handle.on_failure(reply)
+            else:
+                handle.on_success(response_data)
         reply.deleteLater()
 
 
     def debounce(timeout: float):
+        """Calls func once calls stopped for timeout ms, with the arguments of the last call."""
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                wrapper.timer.stop()
-                wrapper.timer.setInterval(timeout)
-                wrapper.timer.setSingleShot(True)
-                wrapper.timer.timeout.connect(lambda: func(*args, **kwargs))
+                if wrapper.timer is None:
+                    wrapper.timer = QTimer()
+                    wrapper.timer.setSingleShot(True)
+                    wrapper.timer.setInterval(timeout)
+                    wrapper.timer.timeout.connect(wrapper.fire)
+                wrapper.pending = (args, kwargs)
+                wrapper.timer.start()
+
+            def fire():
+                args, kwargs = wrapper.pending
+                wrapper.pending = None
+                func(*args, **kwargs)
+
+            wrapper.timer = None
+            wrapper.pending = None
+            wrapper.fire = fire
+            return wrapper
+        return decorator
+
+    def throttle(interval: float):
+        """Calls func at most once every interval ms.
+
+        The first call goes through right away, calls made while waiting are
+        collapsed into one trailing call with the latest arguments.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if wrapper.timer is None:
+                    wrapper.timer = QTimer()
+                    wrapper.timer.setSingleShot(True)
+                    wrapper.timer.setInterval(interval)
+                    wrapper.timer.timeout.connect(wrapper.fire)
+                if wrapper.timer.isActive():
+                    wrapper.pending = (args, kwargs)
+                    return
+                func(*args, **kwargs)
+                wrapper.timer.start()
+
+            def fire():
+                if wrapper.pending is None:
+                    return
+                args, kwargs = wrapper.pending
+                wrapper.pending = None
+                func(*args, **kwargs)
                 wrapper.timer.start()
-            wrapper.timer = QTimer()
 
+            wrapper.timer = None
+            wrapper.pending = None
+            wrapper.fire = fire
             return wrapper
-        return decorator
\ No newline at end of file
+        return decorator
@@ -0,0 +1,177 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import stat
+import time
+from urllib.parse import urlparse
+import weakref
+
+import requests
+from PySide6 import QtCore
+from PySide6.QtCore import Signal
+
+from modules.BackendClient import BackendClient
+from modules.ConfigStore import ConfigStore
+
+# seconds a result is trusted, a path picked right after it was created only stays red this long
+CACHE_TTL = 5.0
+# requests made within this many ms of each other go out as one batch
+BATCH_DELAY = 150
+CACHE_SIZE = 1024
+WORKERS = 2
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "0.0.0.0")
+
+
+def check_local(path: str, mode: str, extensions: tuple[str, ...]) -> bool:
+    try:
+        info = os.stat(path)
+    except (OSError, ValueError):
+        return False
+    if mode == "folder":
+        return stat.S_ISDIR(info.st_mode)
+    return stat.S_ISREG(info.st_mode) and (not extensions or Path(path).suffix in extensions)
+
+
+class _Results(QtCore.QObject):
+    # {key: valid or None}, sent from the workers to the gui thread
+    checked = Signal(object)
+
+
+class PathValidator(object):
+    """Checks the paths of DragDropLineEdits in batches, off the gui thread.
+
+    Requests are collected for BATCH_DELAY ms, answered from the cache when
+    possible and the rest checked together on a small worker pool: with
+    os.stat when the backend runs on this machine, otherwise with one
+    /check_paths request. Backends without that route get one /check_path per
+    path over the pooled session, and are remembered per url.
+    """
+
+    _instance = None
+    _batch_support: dict[str, bool] = {}
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PathValidator, cls).__new__(cls)
+            cls._instance.setup()
+        return cls._instance
+
+    def setup(self) -> None:
+        # key -> (expiry, valid)
+        self.cache: dict[tuple, tuple[float, bool]] = {}
+        self.pending: weakref.WeakSet = weakref.WeakSet()
+        # key -> edits waiting on it, a key is only checked once at a time
+        self.waiting: dict[tuple, weakref.WeakSet] = {}
+        self.edits: weakref.WeakSet = weakref.WeakSet()
+        self.executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="path-check")
+        self.results = _Results()
+        self.results.checked.connect(self.apply_results)
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(BATCH_DELAY)
+        self.timer.timeout.connect(self.flush)
+        ConfigStore().subscribe(lambda *_: self.invalidate(), key="backend_url")
+
+    @staticmethod
+    def key(edit) -> tuple[str, str, tuple[str, ...]]:
+        return edit.text(), edit.mode, tuple(edit.extensions or ())
+
+    def register(self, edit) -> None:
+        self.edits.add(edit)
+
+    def request(self, edit) -> None:
+        """Queues edit to be checked and highlighted with the next batch."""
+        self.pending.add(edit)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def validate_all(self) -> None:
+        for edit in list(self.edits):
+            try:
+                if edit.dirty and edit.text() and not edit.skip_validation_check:
+                    self.request(edit)
+            except RuntimeError:
+                # the qt side is gone, the wrapper just has not been collected yet
+                continue
+
+    def invalidate(self, path: str | None = None) -> None:
+        if path is None:
+            self.cache.clear()
+            return
+        for key in [key for key in self.cache if key[0] == path]:
+            del self.cache[key]
+
+    def flush(self) -> None:
+        edits = list(self.pending)
+        self.pending.clear()
+        now = time.monotonic()
+        keys = []
+        for edit in edits:
+            try:
+                key = self.key(edit)
+                if not key[0]:
+                    edit.set_valid(edit.allow_empty)
+                    continue
+            except RuntimeError:
+                continue
+            cached = self.cache.get(key)
+            if cached and cached[0] > now:
+                edit.set_valid(cached[1])
+                continue
+            if key not in self.waiting:
+                self.waiting[key] = weakref.WeakSet()
+                keys.append(key)
+            self.waiting[key].add(edit)
+        if not keys:
+            return
+        url = ConfigStore().get("backend_url", "http://127.0.0.1:8000")
+        self.executor.submit(self.check, url, keys)
+
+    def check(self, url: str, keys: list[tuple]) -> None:
+        try:
+            if urlparse(url).hostname in LOCAL_HOSTS:
+                results = {key: check_local(*key) for key in keys}
+            else:
+                results = self.check_remote(url, keys)
+        except Exception as e:
+            print(f"Path check failed: {e}")
+            results = {key: None for key in keys}
+        self.results.checked.emit(results)
+
+    def check_remote(self, url: str, keys: list[tuple]) -> dict[tuple, bool | None]:
+        body = [{"path": path, "type": mode, "extensions": list(ext)} for path, mode, ext in keys]
+        if self._batch_support.get(url, True):
+            try:
+                response = BackendClient().post(url, "/check_paths", {"paths": body})
+                if response.status_code == 200:
+                    PathValidator._batch_support[url] = True
+                    return {key: bool(valid) for key, valid in zip(keys, response.json()["valid"])}
+                if response.status_code in (404, 405):
+                    PathValidator._batch_support[url] = False
+            except requests.ConnectionError:
+                # no backend, no highlight
+                return {key: None for key in keys}
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                pass
+        results = {}
+        for key, entry in zip(keys, body):
+            try:
+                results[key] = bool(BackendClient().post(url, "/check_path", entry).json()["valid"])
+            except (requests.RequestException, ValueError, KeyError):
+                results[key] = None
+        return results
+
+    def apply_results(self, results: dict[tuple, bool | None]) -> None:
+        expiry = time.monotonic() + CACHE_TTL
+        if len(self.cache) > CACHE_SIZE:
+            self.cache.clear()
+        for key, valid in results.items():
+            if valid is not None:
+                self.cache[key] = (expiry, valid)
+            for edit in list(self.waiting.pop(key, ())):
+                try:
+                    # the text moved on since, its own request is on the way
+                    if self.key(edit) == key:
+                        edit.set_valid(True if valid is None else valid)
+                except RuntimeError:
+                    continue
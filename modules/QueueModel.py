@@ -0,0 +1,130 @@
+import heapq
+
+from PySide6 import QtCore, QtWidgets
+
+from modules.QueueItem import QueueItem
+from modules.StepEstimator import format_duration
+
+
+class QueueModel(QtCore.QAbstractListModel):
+    """Queue rows for the QListView, the view only asks for the rows it shows."""
+
+    def __init__(self, parent: QtCore.QObject = None) -> None:
+        super(QueueModel, self).__init__(parent)
+        self.items: list[QueueItem] = []
+        # backends working through the queue and the seconds left on what they run now
+        self.workers = 1
+        self.busy: list[float] = []
+        # item -> (seconds until it should be done, whether items without an estimate come first)
+        self.finish_times: dict[QueueItem, tuple[float, bool]] = {}
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.items):
+            return None
+        item = self.items[index.row()]
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return f"{item.name}\n{self.eta_text(item)}"
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return f"{item.name}\n{self.eta_details(item)}"
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+            return QtCore.Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def append(self, item: QueueItem) -> None:
+        row = len(self.items)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.items.append(item)
+        self.endInsertRows()
+
+    def remove(self, item: QueueItem) -> None:
+        row = self.items.index(item)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.items[row]
+        self.endRemoveRows()
+
+    def swap_with_next(self, row: int) -> None:
+        """Swaps row and row + 1 as a single row move, the view does not re-layout the rest."""
+        self.beginMoveRows(QtCore.QModelIndex(), row + 1, row + 1, QtCore.QModelIndex(), row)
+        self.items[row], self.items[row + 1] = self.items[row + 1], self.items[row]
+        self.endMoveRows()
+
+    def index_of(self, item: QueueItem) -> QtCore.QModelIndex:
+        return self.index(self.items.index(item), 0)
+
+    def update_etas(self) -> None:
+        """Works out when each item should be done, items start in order on the first free backend."""
+        free = sorted(self.busy)[: self.workers]
+        free += [0.0] * (self.workers - len(free))
+        heapq.heapify(free)
+        unknown = False
+        self.finish_times = {}
+        for item in self.items:
+            if not item.estimate or item.estimate.seconds is None:
+                unknown = True
+                continue
+            finish = heapq.heappop(free) + item.estimate.seconds
+            heapq.heappush(free, finish)
+            self.finish_times[item] = (finish, unknown)
+        if self.items:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.items) - 1, 0),
+                [QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.ToolTipRole],
+            )
+
+    def eta_text(self, item: QueueItem) -> str:
+        estimate = item.estimate
+        if not estimate:
+            return "Estimating..."
+        if not estimate.samples:
+            return "No images found"
+        if estimate.seconds is None:
+            return f"{estimate.steps:,} steps"
+        # the queue is narrow, the step count is in the tooltip
+        text = format_duration(estimate.seconds)
+        if item in self.finish_times:
+            finish, unknown = self.finish_times[item]
+            text += f", total {'>' if unknown else ''}{format_duration(finish)}"
+        return text
+
+    def eta_details(self, item: QueueItem) -> str:
+        estimate = item.estimate
+        if not estimate:
+            return "Estimating..."
+        lines = [
+            f"{estimate.samples:,} samples, at least {estimate.batches_per_epoch:,} batches per epoch",
+            f"{estimate.steps:,} steps"
+            + (f" over {estimate.epochs} epoch{'s' if estimate.epochs != 1 else ''}" if estimate.epochs else "")
+            + (f" on {estimate.num_processes} processes" if estimate.num_processes > 1 else ""),
+        ]
+        if estimate.seconds is None:
+            lines.append("No finished run of this model type to time it from yet")
+        else:
+            lines.append(f"About {format_duration(estimate.seconds)} of training")
+        if item in self.finish_times:
+            finish, unknown = self.finish_times[item]
+            lines.append(f"Done in about {format_duration(finish)} from now")
+            if unknown:
+                lines.append("Items above without a time are not counted in")
+        if estimate.missing_folders:
+            lines.append(f"{estimate.missing_folders} subset folders could not be read")
+        return "\n".join(lines)
+
+
+class QueueItemDelegate(QtWidgets.QStyledItemDelegate):
+    """Fixed height, middle elided rows, so sizing never touches the other rows.
+
+    Each row is two lines, the name and its estimate.
+    """
+
+    PADDING = 8
+
+    def initStyleOption(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> None:
+        super(QueueItemDelegate, self).initStyleOption(option, index)
+        option.textElideMode = QtCore.Qt.TextElideMode.ElideMiddle
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        return QtCore.QSize(option.rect.width(), option.fontMetrics.height() * 2 + self.PADDING * 2)
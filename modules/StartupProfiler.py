@@ -0,0 +1,132 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+ENV_VAR = "LORA_PROFILE_STARTUP"
+DEFAULT_REPORT = "startup_profile.json"
+
+# taken at import time so that module loading before main() can be reported too
+_ORIGIN = time.perf_counter()
+
+
+class StartupProfiler(object):
+    """Opt-in timing of the startup phases, written out as a chrome trace.
+
+    The report is plain json that chrome://tracing and perfetto can open, the
+    "phases" list carries the same data in a form that is easy to diff
+    between releases.
+    """
+
+    _instance = None
+    _enabled = False
+    _report_path = None
+    _events = None
+    _paint_filter = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StartupProfiler, cls).__new__(cls)
+            cls._events = []
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, report_path: Path | str | None = None) -> None:
+        StartupProfiler._enabled = True
+        StartupProfiler._report_path = Path(report_path or DEFAULT_REPORT)
+        self.record("imports", _ORIGIN, time.perf_counter())
+
+    def enable_from_env(self) -> bool:
+        value = os.environ.get(ENV_VAR, "")
+        if not value or value == "0":
+            return False
+        self.enable(None if value == "1" else value)
+        return True
+
+    def record(self, name: str, start: float, end: float) -> None:
+        if not self._enabled:
+            return
+        self._events.append(
+            {
+                "name": name,
+                "start": start - _ORIGIN,
+                "duration": end - start,
+                "thread": threading.get_ident(),
+            }
+        )
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        if not self._enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def watch_first_paint(self, widget) -> None:
+        """Closes the profile on the first paint of widget and writes the report."""
+        if not self._enabled:
+            return
+        StartupProfiler._paint_filter = first_paint_filter(self.finish)
+        widget.installEventFilter(self._paint_filter)
+
+    def finish(self) -> None:
+        self.record("first paint", _ORIGIN, time.perf_counter())
+        self.write_report()
+
+    def write_report(self) -> None:
+        if not self._enabled:
+            return
+        pid = os.getpid()
+        report = {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": event["name"],
+                    "ph": "X",
+                    "ts": round(event["start"] * 1e6, 1),
+                    "dur": round(event["duration"] * 1e6, 1),
+                    "pid": pid,
+                    "tid": event["thread"],
+                }
+                for event in self._events
+            ],
+            "phases": [
+                {
+                    "name": event["name"],
+                    "start_ms": round(event["start"] * 1000, 3),
+                    "duration_ms": round(event["duration"] * 1000, 3),
+                }
+                for event in self._events
+            ],
+        }
+        self._report_path.write_text(json.dumps(report, indent=2))
+        print(f"Startup profile written to {self._report_path.as_posix()}")
+
+
+def first_paint_filter(on_first_paint):
+    # Qt is imported here so that the headless runner can use the profiler module without it
+    from PySide6 import QtCore
+
+    class FirstPaintFilter(QtCore.QObject):
+        def __init__(self) -> None:
+            super(FirstPaintFilter, self).__init__()
+            self.done = False
+
+        def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+            if not self.done and event.type() == QtCore.QEvent.Type.Paint:
+                self.done = True
+                watched.removeEventFilter(self)
+                # let the paint itself finish before closing the profile
+                QtCore.QTimer.singleShot(0, on_first_paint)
+            return False
+
+    return FirstPaintFilter()
@@ -0,0 +1,158 @@
+import math
+
+from modules.ConfigStore import ConfigStore
+from modules.DatasetScanner import DatasetScanner
+
+# Optimizer steps worked out like sd-scripts does before training starts, and
+# a run time from the runs that finished on this machine. A run is timed as
+# seconds = startup + steps * batch_size * megapixels * rate, fitted per model
+# family, so a finished 512px run still says something about a 1024px one.
+
+HISTORY_KEY = "step_history"
+HISTORY_SIZE = 30
+# what sd-scripts trains for when neither max_train_epochs nor max_train_steps is set
+DEFAULT_MAX_TRAIN_STEPS = 1600
+
+
+class StepEstimate(object):
+    def __init__(self) -> None:
+        self.steps: int | None = None
+        self.samples = 0
+        self.batches_per_epoch = 0
+        self.epochs: int | None = None
+        self.family = "sd"
+        self.batch_size = 1
+        self.megapixels = 1.0
+        self.num_processes = 1
+        self.missing_folders = 0
+        # filled in by add_duration, None until a run of this family finished
+        self.seconds: float | None = None
+
+    @property
+    def work(self) -> float:
+        """Steps weighted by how many pixels each of them pushes through one process."""
+        return (self.steps or 0) * self.batch_size * self.megapixels
+
+
+def model_family(toml_args: dict) -> str:
+    if toml_args.get("flux_args", {}).get("args"):
+        return "flux"
+    if toml_args.get("anima_args", {}).get("args"):
+        return "anima"
+    if toml_args.get("general_args", {}).get("args", {}).get("sdxl"):
+        return "sdxl"
+    return "sd"
+
+
+def num_processes(accelerate: dict | None = None) -> int:
+    if accelerate is None:
+        accelerate = ConfigStore().get("accelerate", {})
+    if not accelerate.get("enabled", False):
+        return 1
+    return max(1, int(accelerate.get("num_processes", 2)))
+
+
+def count_steps(toml_args: dict, image_counts: list[int], processes: int = 1) -> StepEstimate:
+    """Steps for a saved toml, image_counts holds the image count of each of its subsets."""
+    estimate = StepEstimate()
+    general = toml_args.get("general_args", {})
+    args = general.get("args", {})
+    dataset_args = general.get("dataset_args", {})
+    estimate.family = model_family(toml_args)
+    estimate.batch_size = max(1, int(dataset_args.get("batch_size", 1)))
+    estimate.num_processes = processes
+    resolution = dataset_args.get("resolution", 1024)
+    if isinstance(resolution, (list, tuple)):
+        estimate.megapixels = resolution[0] * resolution[-1] / 1_000_000
+    else:
+        estimate.megapixels = resolution * resolution / 1_000_000
+
+    train_samples = 0
+    has_reg = False
+    for subset, images in zip(toml_args.get("subsets", []), image_counts):
+        if subset.get("is_val"):
+            continue
+        if subset.get("is_reg"):
+            has_reg = has_reg or images > 0
+            continue
+        train_samples += images * int(subset.get("num_repeats", 1))
+    # regularization images are repeated until they match the training images
+    estimate.samples = train_samples * 2 if has_reg and train_samples else train_samples
+    # bucketing can add a partial batch per bucket, so this is the least it can be
+    estimate.batches_per_epoch = math.ceil(estimate.samples / estimate.batch_size)
+
+    gradient_accumulation = max(1, int(args.get("gradient_accumulation_steps", 1)))
+    steps_per_epoch = math.ceil(estimate.batches_per_epoch / processes / gradient_accumulation)
+    if args.get("max_train_epochs"):
+        estimate.epochs = int(args["max_train_epochs"])
+        estimate.steps = estimate.epochs * steps_per_epoch
+    else:
+        estimate.steps = int(args.get("max_train_steps", DEFAULT_MAX_TRAIN_STEPS))
+        if steps_per_epoch:
+            estimate.epochs = math.ceil(estimate.steps / steps_per_epoch)
+    return estimate
+
+
+def estimate_toml(toml_args: dict, accelerate: dict | None = None) -> StepEstimate:
+    """Counts the images of every subset, so call it off the gui thread."""
+    scanner = DatasetScanner()
+    counts = []
+    missing = 0
+    for subset in toml_args.get("subsets", []):
+        key = DatasetScanner.key(subset)
+        stats = scanner.lookup(key) if key else None
+        if not stats or stats.error:
+            missing += 1
+        counts.append(stats.images if stats else 0)
+    estimate = count_steps(toml_args, counts, num_processes(accelerate))
+    estimate.missing_folders = missing
+    return add_duration(estimate)
+
+
+def fit(history: list[dict]) -> tuple[float, float] | None:
+    """Least squares (startup seconds, seconds per unit of work) over finished runs."""
+    points = [(entry["work"], entry["seconds"]) for entry in history if entry["work"] > 0]
+    if not points:
+        return None
+    mean_work = sum(work for work, _ in points) / len(points)
+    mean_seconds = sum(seconds for _, seconds in points) / len(points)
+    spread = sum((work - mean_work) ** 2 for work, _ in points)
+    if spread > 0:
+        rate = sum((work - mean_work) * (seconds - mean_seconds) for work, seconds in points) / spread
+        startup = mean_seconds - rate * mean_work
+        # too few or too noisy runs, a run can't take negative time to start
+        if rate > 0 and 0 <= startup <= min(seconds for _, seconds in points):
+            return startup, rate
+    return 0.0, sum(seconds for _, seconds in points) / sum(work for work, _ in points)
+
+
+def add_duration(estimate: StepEstimate, history: dict | None = None) -> StepEstimate:
+    if history is None:
+        history = ConfigStore().get(HISTORY_KEY, {})
+    fitted = fit(history.get(estimate.family, []))
+    if fitted is None or estimate.steps is None:
+        estimate.seconds = None
+    else:
+        estimate.seconds = fitted[0] + fitted[1] * estimate.work
+    return estimate
+
+
+def record_run(estimate: StepEstimate, seconds: float) -> None:
+    """Adds a run that finished cleanly to the history its family is timed from."""
+    if not estimate.work or seconds <= 0:
+        return
+    config = ConfigStore()
+    history = config.get(HISTORY_KEY, {})
+    runs = history.setdefault(estimate.family, [])
+    runs.append({"work": estimate.work, "seconds": seconds})
+    del runs[:-HISTORY_SIZE]
+    config.set(HISTORY_KEY, history)
+
+
+def format_duration(seconds: float) -> str:
+    minutes = round(seconds / 60)
+    if minutes < 1:
+        return "<1m"
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02}m"
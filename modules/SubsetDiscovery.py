@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Iterator
+
+from modules.DatasetManifest import is_image
+
+
+def subset_folders(
+    root: str, recursive: bool = False, progress=None, cancelled: threading.Event | None = None
+) -> Iterator[tuple[str, str]]:
+    """Finds the subset folders under root, yields (name relative to root, folder).
+
+    Without recursive every folder in root is a subset, like adding them one by
+    one. With it the tree is walked and a folder is a subset when it holds
+    images itself, its own subfolders are left alone since those are masks or
+    conditioning images more often than not. Every folder is listed once, in
+    name order, and hidden ones are skipped. progress is called with (folders
+    listed, folders found to list so far), the walk stops once cancelled is set.
+    """
+    # depth first, so nested concepts come out next to each other
+    stack = [(root, "", False)]
+    listed = 0
+    while stack:
+        if cancelled and cancelled.is_set():
+            return
+        folder, relative, is_link = stack.pop()
+        has_images = False
+        folders = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        folders.append((entry.name, entry.path, entry.is_symlink()))
+                    elif not has_images and is_image(entry.name):
+                        has_images = True
+        except OSError:
+            pass
+        listed += 1
+        folders.sort()
+        if not recursive:
+            for name, path, _ in folders:
+                yield name, path
+            if progress:
+                progress(listed, listed)
+            return
+        if relative and has_images:
+            yield relative, folder
+            folders = []
+        elif is_link:
+            # links are not followed any further, they can loop back up the tree
+            folders = []
+        stack.extend(
+            (path, f"{relative}/{name}" if relative else name, link) for name, path, link in reversed(folders)
+        )
+        if progress:
+            progress(listed, listed + len(stack))
@@ -0,0 +1,126 @@
+from PySide6 import QtCore
+
+
+class SubsetTableModel(QtCore.QAbstractTableModel):
+    """Read only table over the subset dataset_args dicts, one row per subset."""
+
+    COLUMNS = ["Name", "Image Folder", "Repeats", "Images", "Captions", "Masks", "Size", "Flags"]
+    FLAGS = [
+        ("is_reg", "reg"),
+        ("is_val", "val"),
+        ("conditioning_data_dir", "masked"),
+        ("flip_aug", "flip"),
+        ("shuffle_caption", "shuffle"),
+        ("color_aug", "color aug"),
+        ("random_crop", "random crop"),
+    ]
+
+    def __init__(
+        self, dataset_args: dict, display_names: dict, stats: dict, parent: QtCore.QObject = None
+    ) -> None:
+        super(SubsetTableModel, self).__init__(parent)
+        self.dataset_args = dataset_args
+        self.display_names = display_names
+        # name -> SubsetStats, None while the scan is running, missing without an image folder
+        self.stats = stats
+        self.names: list[str] = []
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.names):
+            return None
+        if role not in (QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.ToolTipRole):
+            return None
+        name = self.names[index.row()]
+        args = self.dataset_args.get(name, {})
+        column = index.column()
+        if column == 0:
+            return self.display_names.get(name, name)
+        if column == 1:
+            return args.get("image_dir", "")
+        if column == 2:
+            return args.get("num_repeats", 1)
+        if 3 <= column <= 6:
+            return self.stats_text(name, column)
+        return ", ".join(label for key, label in self.FLAGS if args.get(key))
+
+    def stats_text(self, name: str, column: int) -> str:
+        if name not in self.stats:
+            return ""
+        stats = self.stats[name]
+        if stats is None:
+            return "..."
+        if stats.error:
+            return stats.error if column == 3 else ""
+        if column == 3:
+            return f"{stats.images:,}"
+        if column == 4:
+            if stats.missing_captions:
+                return f"{stats.captions:,} ({stats.missing_captions:,} missing)"
+            return f"{stats.captions:,}"
+        if column == 5:
+            if not self.dataset_args.get(name, {}).get("conditioning_data_dir"):
+                return ""
+            return stats.mask_error or f"{stats.masks:,}"
+        return self.format_size(stats.bytes)
+
+    @staticmethod
+    def format_size(size: int) -> str:
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
+
+    def reset(self, names: list[str]) -> None:
+        self.beginResetModel()
+        self.names = list(names)
+        self.endResetModel()
+
+    def append(self, name: str) -> None:
+        row = len(self.names)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.names.append(name)
+        self.endInsertRows()
+
+    def remove(self, name: str) -> None:
+        row = self.names.index(name)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.names[row]
+        self.endRemoveRows()
+
+    def rebind(self, names: list[str]) -> None:
+        """Points the rows at names, only the rows past the shorter list are inserted or removed."""
+        old, new = len(self.names), len(names)
+        if new < old:
+            self.beginRemoveRows(QtCore.QModelIndex(), new, old - 1)
+            del self.names[new:]
+            self.endRemoveRows()
+        elif new > old:
+            self.beginInsertRows(QtCore.QModelIndex(), old, new - 1)
+            self.names.extend(names[old:])
+            self.endInsertRows()
+        self.names[:] = names
+        self.refresh()
+
+    def refresh(self, name: str | None = None) -> None:
+        """Repaints the row of name, or every row."""
+        if not self.names:
+            return
+        if name is None:
+            first, last = 0, len(self.names) - 1
+        elif name in self.names:
+            first = last = self.names.index(name)
+        else:
+            return
+        self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.COLUMNS) - 1))
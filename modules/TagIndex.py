@@ -0,0 +1,201 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+
+from modules.DatasetManifest import DatasetManifest, is_image
+
+# Tag counts of the captions of every subset, counted locally instead of by the
+# backend. Folders are counted on a process pool in chunks, the chunk results
+# are merged as they come in, and the counts of each folder are kept in the
+# manifest database until one of its captions changes.
+
+SEPARATOR = ","
+# leading positions looked at for the keep_tokens suggestion
+MAX_KEEP = 8
+# a leading tag is suggested for keep_tokens when this share of captions starts with it
+KEEP_SHARE = 0.9
+# tags in this share of captions are suggested as protected
+PROTECT_SHARE = 0.5
+CHUNK = 2000
+# below this many captions to read the process pool costs more than it saves
+PROCESS_MIN_FILES = 4000
+PROCESSES = min(4, os.cpu_count() or 1)
+CACHE_KIND = "tags"
+
+
+class TagCounts(object):
+    def __init__(self) -> None:
+        self.captions = 0
+        # tag -> captions it is in
+        self.tags: Counter = Counter()
+        # position -> tag -> captions with that tag at that position
+        self.leading: list[Counter] = [Counter() for _ in range(MAX_KEEP)]
+
+    def add(self, other: "TagCounts") -> None:
+        self.captions += other.captions
+        self.tags.update(other.tags)
+        for mine, theirs in zip(self.leading, other.leading):
+            mine.update(theirs)
+
+    def to_json(self) -> str:
+        return json.dumps({"captions": self.captions, "tags": self.tags, "leading": self.leading})
+
+    @classmethod
+    def from_json(cls, text: str) -> "TagCounts":
+        data = json.loads(text)
+        counts = cls()
+        counts.captions = data["captions"]
+        counts.tags = Counter(data["tags"])
+        counts.leading = [Counter(position) for position in data["leading"]]
+        return counts
+
+
+def split_tags(caption: str) -> list[str]:
+    return [tag for tag in (tag.strip() for tag in caption.split(SEPARATOR)) if tag]
+
+
+def count_files(paths: list[str]) -> TagCounts:
+    """Counts a list of caption files, runs in the worker processes."""
+    counts = TagCounts()
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as file:
+                tags = split_tags(file.read())
+        except OSError:
+            continue
+        counts.captions += 1
+        counts.tags.update(set(tags))
+        for position, tag in enumerate(tags[:MAX_KEEP]):
+            counts.leading[position][tag] += 1
+    return counts
+
+
+def subset_key(subset: dict) -> tuple[str, str]:
+    """What a subset's counts are kept under, the same folder can be captioned twice."""
+    return subset.get("image_dir"), subset.get("caption_extension", ".caption")
+
+
+def caption_files(folder: str, caption_extension: str) -> tuple[list[str], str]:
+    """The caption files the trainer reads for folder, and a fingerprint of their state."""
+    records = DatasetManifest().refresh(folder)
+    stems = {os.path.splitext(name)[0] for name in records if is_image(name)}
+    names = sorted(stem + caption_extension for stem in stems if stem + caption_extension in records)
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for name in names:
+        fingerprint.update(f"{name}\0{records[name].size}\0{records[name].mtime}\n".encode())
+    return [os.path.join(folder, name) for name in names], fingerprint.hexdigest()
+
+
+class TagIndex(object):
+    """Counts the tags of subsets, see index."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TagIndex, cls).__new__(cls)
+            cls._instance.setup()
+        return cls._instance
+
+    def setup(self) -> None:
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        with self.pool_lock:
+            if self.pool is None:
+                # spawned, forking a process with qt and worker threads in it is not safe
+                self.pool = ProcessPoolExecutor(
+                    max_workers=PROCESSES, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self.pool
+
+    def index(
+        self, subsets: list[dict], progress=None, cancelled: threading.Event | None = None
+    ) -> tuple[TagCounts, dict[tuple[str, str], TagCounts]] | None:
+        """Counts the tags of subsets, returns the total and the counts by subset_key.
+
+        Validation subsets and missing folders are left out. progress is called
+        with (captions counted, captions to count) as chunks finish, from the
+        calling thread. Returns None when cancelled is set before it is done.
+        """
+        manifest = DatasetManifest()
+        by_subset: dict[tuple[str, str], TagCounts] = {}
+        # (folder, caption extension) -> (fingerprint, caption files) still to count
+        pending: dict[tuple[str, str], tuple[str, list[str]]] = {}
+        seen = set()
+        for subset in subsets:
+            key = subset_key(subset)
+            if not key[0] or subset.get("is_val") or key in seen:
+                continue
+            seen.add(key)
+            try:
+                paths, fingerprint = caption_files(*key)
+            except OSError:
+                continue
+            cached = manifest.cached(CACHE_KIND, "\0".join(key), fingerprint)
+            if cached is not None:
+                by_subset[key] = TagCounts.from_json(cached)
+            else:
+                pending[key] = (fingerprint, paths)
+
+        total_files = sum(len(paths) for _, paths in pending.values())
+        done_files = 0
+        if progress:
+            progress(done_files, total_files)
+        # every chunk of every folder is queued at once, a folder is stored when its last chunk is in
+        chunks = [
+            (key, paths[i : i + CHUNK])
+            for key, (_, paths) in pending.items()
+            for i in range(0, len(paths), CHUNK)
+        ]
+        left = Counter(key for key, _ in chunks)
+        counts = {key: TagCounts() for key in pending}
+        if total_files >= PROCESS_MIN_FILES:
+            pool = self.get_pool()
+            futures = {pool.submit(count_files, paths): (key, len(paths)) for key, paths in chunks}
+            results = ((*futures[future], future.result()) for future in as_completed(futures))
+        else:
+            futures = {}
+            results = ((key, len(paths), count_files(paths)) for key, paths in chunks)
+        for key, size, result in results:
+            if cancelled and cancelled.is_set():
+                for future in futures:
+                    future.cancel()
+                return None
+            counts[key].add(result)
+            done_files += size
+            left[key] -= 1
+            if not left[key]:
+                manifest.store(CACHE_KIND, "\0".join(key), pending[key][0], counts[key].to_json())
+            if progress:
+                progress(done_files, total_files)
+        by_subset.update(counts)
+
+        total = TagCounts()
+        for subset_counts in by_subset.values():
+            total.add(subset_counts)
+        return total, by_subset
+
+
+def suggest_keep_tokens(counts: TagCounts, share: float = KEEP_SHARE) -> list[str]:
+    """The leading tags nearly every caption starts with, their count is the keep_tokens to use."""
+    kept = []
+    for position in counts.leading:
+        if not position or not counts.captions:
+            break
+        tag, found = position.most_common(1)[0]
+        if found < share * counts.captions:
+            break
+        kept.append(tag)
+    return kept
+
+
+def suggest_protected_tags(counts: TagCounts, share: float = PROTECT_SHARE) -> list[str]:
+    """Tags in at least share of the captions, most common first, and the leading ones."""
+    common = [tag for tag, found in counts.tags.most_common() if found >= share * counts.captions]
+    return list(dict.fromkeys(suggest_keep_tokens(counts) + common))
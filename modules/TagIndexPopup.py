@@ -0,0 +1,185 @@
+from pathlib import Path
+from threading import Event, Thread
+from PySide6 import QtWidgets
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+from modules import TrainingJobs
+from modules.BaseDialog import BaseDialog
+from modules.TagIndex import TagCounts, TagIndex, subset_key, suggest_keep_tokens, suggest_protected_tags
+
+# the table only shows the most common tags, the tag file has all of them
+MAX_ROWS = 1000
+
+
+class TagIndexPopup(BaseDialog):
+    """Tag counts of the subsets in the ui, with keep_tokens and protected tag suggestions."""
+
+    indexed = Signal(object)
+    progressed = Signal(int, int)
+
+    def __init__(self, main_widget, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.main_widget = main_widget
+        self.cancelled = Event()
+        self.total: TagCounts | None = None
+        self.by_subset: dict[tuple[str, str], TagCounts] = {}
+        self.setup_widget()
+        self.setup_connections()
+        self.run_index()
+
+    def setup_widget(self) -> None:
+        self.setWindowTitle("Tag Index")
+        self.resize(560, 640)
+        self.setLayout(QVBoxLayout())
+        self.summary = QLabel("Counting tags...", self)
+        self.summary.setWordWrap(True)
+        self.progress_bar = QProgressBar(self)
+        self.tag_table = QTableWidget(0, 3, self)
+        self.tag_table.setHorizontalHeaderLabels(["Tag", "Captions", "Share"])
+        self.subset_table = QTableWidget(0, 3, self)
+        self.subset_table.setHorizontalHeaderLabels(["Subset", "Keep Tokens", "Leading Tags"])
+        self.subset_table.setToolTip(
+            "Keep tokens covers the leading tags that at least 90% of the subset's captions start with"
+        )
+        for table in (self.tag_table, self.subset_table):
+            table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        self.refresh_button = QPushButton("Refresh", self)
+        self.keep_tokens_button = QPushButton("Apply Keep Tokens", self)
+        self.protected_button = QPushButton("Save Protected Tags...", self)
+        self.protected_button.setToolTip(
+            "Saves the tags in at least half of the captions and the leading ones,\n"
+            "and uses the file as the global protected tags file"
+        )
+        self.tag_file_button = QPushButton("Write Tag File", self)
+        self.tag_file_button.setToolTip("Writes the tag occurrence file where the saving args put it")
+        buttons = QHBoxLayout()
+        for button in (self.refresh_button, self.keep_tokens_button, self.protected_button, self.tag_file_button):
+            buttons.addWidget(button)
+
+        self.layout().addWidget(self.summary)
+        self.layout().addWidget(self.progress_bar)
+        self.layout().addWidget(self.tag_table, 3)
+        self.layout().addWidget(self.subset_table, 1)
+        self.layout().addLayout(buttons)
+
+    def setup_connections(self) -> None:
+        self.indexed.connect(self.show_index)
+        self.progressed.connect(self.show_progress)
+        self.refresh_button.clicked.connect(self.run_index)
+        self.keep_tokens_button.clicked.connect(self.apply_keep_tokens)
+        self.protected_button.clicked.connect(self.save_protected_tags)
+        self.tag_file_button.clicked.connect(self.write_tag_file)
+
+    def subsets(self) -> dict[str, dict]:
+        subset_widget = self.main_widget.subset_widget
+        # the edited row only reaches dataset_args once it is stored
+        subset_widget.store_editor()
+        return {name: dict(args) for name, args in subset_widget.dataset_args.items()}
+
+    def run_index(self) -> None:
+        self.set_busy(True)
+        Thread(target=self.index_thread, args=(list(self.subsets().values()),), daemon=True).start()
+
+    def index_thread(self, subsets: list[dict]) -> None:
+        try:
+            result = TagIndex().index(subsets, self.progressed.emit, self.cancelled)
+        except Exception as e:
+            result = e
+        if not self.cancelled.is_set():
+            self.indexed.emit(result)
+
+    def set_busy(self, busy: bool) -> None:
+        self.progress_bar.setVisible(busy)
+        self.progress_bar.setRange(0, 0)
+        for button in (self.refresh_button, self.keep_tokens_button, self.protected_button, self.tag_file_button):
+            button.setEnabled(not busy)
+
+    def show_progress(self, done: int, total: int) -> None:
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.summary.setText(f"Counting tags... {done:,} of {total:,} captions read")
+
+    def show_index(self, result) -> None:
+        self.set_busy(False)
+        if isinstance(result, Exception):
+            self.summary.setText(f"Counting tags failed: {result}")
+            return
+        self.total, self.by_subset = result
+        total = self.total
+        rows = total.tags.most_common(MAX_ROWS)
+        self.tag_table.setSortingEnabled(False)
+        self.tag_table.setRowCount(len(rows))
+        for row, (tag, found) in enumerate(rows):
+            # numbers stay numbers so the columns sort by value
+            for column, value in enumerate([tag, found, f"{found / total.captions:.1%}"]):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                self.tag_table.setItem(row, column, item)
+        self.tag_table.setSortingEnabled(True)
+        self.tag_table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+
+        subsets = [(name, args) for name, args in self.subsets().items() if subset_key(args) in self.by_subset]
+        self.subset_table.setRowCount(len(subsets))
+        for row, (name, args) in enumerate(subsets):
+            kept = suggest_keep_tokens(self.by_subset[subset_key(args)])
+            display_name = self.main_widget.subset_widget.display_names.get(name, name)
+            for column, value in enumerate([display_name, len(kept), ", ".join(kept)]):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                self.subset_table.setItem(row, column, item)
+        self.summary.setText(
+            f"{total.captions:,} captions with {len(total.tags):,} different tags"
+            + (f", the {MAX_ROWS:,} most common are shown." if len(total.tags) > MAX_ROWS else ".")
+        )
+
+    def apply_keep_tokens(self) -> None:
+        if self.total is None:
+            return
+        subset_widget = self.main_widget.subset_widget
+        for name, args in self.subsets().items():
+            counts = self.by_subset.get(subset_key(args))
+            if counts is not None:
+                subset_widget.set_keep_tokens(name, len(suggest_keep_tokens(counts)))
+
+    def save_protected_tags(self) -> None:
+        if self.total is None:
+            return
+        file_name, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Protected Tags File", "protected_tags.txt", "Text Files (*.txt)"
+        )
+        if not file_name:
+            return
+        tags = suggest_protected_tags(self.total)
+        Path(file_name).write_text("".join(f"{tag}\n" for tag in tags), encoding="utf-8")
+        self.main_widget.args_widget.general_widget.set_global_protected_tags_file(Path(file_name).as_posix())
+        self.summary.setText(f"{len(tags)} protected tags saved to {Path(file_name).as_posix()}")
+
+    def write_tag_file(self) -> None:
+        if self.total is None:
+            return
+        saving_args = self.main_widget.args_widget.get_args()["args"].get("saving_args", {})
+        folder = saving_args.get("tag_file_location", None)
+        location = TrainingJobs.create_tag_file(
+            dict(self.total.tags.most_common()),
+            Path(folder) if folder else None,
+            saving_args.get("output_name", "output_tags"),
+        )
+        if location:
+            self.summary.setText(f"Tag file written to {location.as_posix()}")
+
+    def done(self, result: int) -> None:
+        # the counts of folders that finished are kept, the rest is dropped
+        self.cancelled.set()
+        super().done(result)
@@ -0,0 +1,116 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+from importlib import metadata
+from pathlib import Path
+
+from PySide6.QtCore import QDir
+from PySide6.QtGui import QColor, QGuiApplication, QPalette
+from PySide6.QtWidgets import QApplication
+import qt_material
+from qt_material import add_fonts, apply_stylesheet, get_theme
+
+CACHE_DIR = Path("theme_cache")
+
+
+def apply_cached_stylesheet(
+    app: QApplication, theme: str, invert_secondary: bool = False, extra: dict | None = None
+) -> None:
+    """Drop-in for qt_material.apply_stylesheet that reuses rendered output.
+
+    The rendered qss and the themed icon set are stored per theme file,
+    invert_secondary and extra (density_scale, font_size), and rebuilt
+    whenever the theme xml or qt_material itself changes.
+    """
+    extra = dict(extra or {})
+    if not Path(theme).is_file():
+        # bundled qt_material theme names, nothing on disk to key on
+        apply_stylesheet(app, theme=theme, invert_secondary=invert_secondary, extra=extra)
+        return
+    entry = CACHE_DIR.joinpath(entry_key(theme, invert_secondary, extra))
+    signature = source_signature(theme)
+    meta = {}
+    with contextlib.suppress(OSError, ValueError):
+        meta = json.loads(entry.joinpath("meta.json").read_text())
+    if meta.get("signature") == signature and entry.joinpath("stylesheet.qss").exists():
+        load_entry(app, entry, theme, invert_secondary)
+        return
+    build_entry(app, entry, theme, invert_secondary, extra, signature)
+
+
+def entry_key(theme: str, invert_secondary: bool, extra: dict) -> str:
+    key = json.dumps(
+        [Path(theme).resolve().as_posix(), invert_secondary, sorted(extra.items())],
+        default=str,
+    )
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def source_signature(theme: str) -> list:
+    stat = Path(theme).stat()
+    template = Path(qt_material.TEMPLATE_FILE).stat()
+    return [
+        stat.st_mtime_ns,
+        stat.st_size,
+        template.st_mtime_ns,
+        metadata.version("qt-material"),
+        platform.system(),
+    ]
+
+
+def build_entry(
+    app: QApplication,
+    entry: Path,
+    theme: str,
+    invert_secondary: bool,
+    extra: dict,
+    signature: list,
+) -> None:
+    shutil.rmtree(entry, ignore_errors=True)
+    entry.mkdir(parents=True)
+    icons = entry.joinpath("icons").resolve()
+    apply_stylesheet(
+        app,
+        theme=theme,
+        invert_secondary=invert_secondary,
+        extra=extra,
+        parent=str(icons),
+        save_as=str(entry.joinpath("stylesheet.qss")),
+    )
+    set_icon_path(icons)
+    if not entry.joinpath("stylesheet.qss").exists():
+        return
+    # meta goes last, an entry without it is treated as missing
+    temp = entry.joinpath("meta.json.tmp")
+    temp.write_text(json.dumps({"theme": theme, "signature": signature}))
+    os.replace(temp, entry.joinpath("meta.json"))
+
+
+def load_entry(app: QApplication, entry: Path, theme: str, invert_secondary: bool) -> None:
+    """Repeats the side effects of apply_stylesheet without re-rendering."""
+    with contextlib.suppress(Exception):
+        app.setStyle("Fusion")
+    try:
+        add_fonts()
+    except Exception as e:
+        logging.warning(e)
+    # get_theme is cheap and also exports the QTMATERIAL_* environment
+    colors = get_theme(theme, invert_secondary)
+    palette = QGuiApplication.palette()
+    primary = colors["primaryColor"]
+    palette.setColor(
+        QPalette.ColorRole.Text,
+        QColor(*[int(primary[i : i + 2], 16) for i in range(1, 6, 2)] + [92]),
+    )
+    QGuiApplication.setPalette(palette)
+    set_icon_path(entry.joinpath("icons").resolve())
+    app.setStyleSheet(entry.joinpath("stylesheet.qss").read_text())
+
+
+def set_icon_path(icons: Path) -> None:
+    # replace rather than add, otherwise icons of the previous theme win the lookup
+    QDir.setSearchPaths("icon", [str(icons)])
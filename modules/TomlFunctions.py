@@ -1,43 +1,230 @@
-from PySide6.QtWidgets import QFileDialog
+from collections import OrderedDict
+import json
+import math
+import os
 from pathlib import Path
+import re
+import threading
+from types import MappingProxyType
 import toml
-import json
+
+from modules.ConfigStore import ConfigStore
+
+try:
+    import tomllib
+except ImportError:  # python < 3.11
+    tomllib = None
+
+# Qt is only imported for the file dialogs, the headless runner reads tomls through here as well.
+
+CACHE_SIZE = 32
+_BARE_KEY = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def parse_toml(text: str) -> dict:
+    if tomllib:
+        try:
+            return tomllib.loads(text)
+        except tomllib.TOMLDecodeError:
+            # older hand written files can lean on leniencies of the toml package
+            pass
+    return toml.loads(text)
+
+
+def dumps_toml(args: dict) -> str:
+    try:
+        return TomlWriter().dumps(args)
+    except TypeError:
+        return toml.dumps(args)
+
+
+_loads = parse_toml
+_dumps = dumps_toml
+
+
+def set_backend(loads=None, dumps=None) -> None:
+    """Swaps the functions used to parse and write toml text, None keeps the current one."""
+    global _loads, _dumps
+    _loads = loads or _loads
+    _dumps = dumps or _dumps
+    clear_cache()
+
+
+class TomlWriter(object):
+    """Writes the plain tables, arrays of tables and scalars our configs are made of.
+
+    Raises TypeError on anything else so dumps_toml can hand it to the toml package.
+    """
+
+    def dumps(self, args: dict) -> str:
+        lines = []
+        self.write_table(lines, args, [])
+        return "\n".join(lines).lstrip("\n") + "\n"
+
+    def write_table(
+        self, lines: list[str], table: dict, path: list[str], array: bool = False
+    ) -> None:
+        values, tables = [], []
+        for key, value in table.items():
+            if value is None:
+                continue
+            if isinstance(value, dict) or (
+                isinstance(value, list) and value and all(isinstance(x, dict) for x in value)
+            ):
+                tables.append((key, value))
+            else:
+                values.append((key, value))
+        # a table that only holds tables needs no header of its own
+        if path and (array or values or not tables):
+            lines.append("")
+            lines.append(f"[[{'.'.join(path)}]]" if array else f"[{'.'.join(path)}]")
+        for key, value in values:
+            lines.append(f"{self.key(key)} = {self.value(value)}")
+        for key, value in tables:
+            sub_path = path + [self.key(key)]
+            if isinstance(value, dict):
+                self.write_table(lines, value, sub_path)
+                continue
+            for elem in value:
+                self.write_table(lines, elem, sub_path, array=True)
+
+    @staticmethod
+    def key(key: str) -> str:
+        if not isinstance(key, str):
+            raise TypeError(f"toml keys are strings, got {type(key).__name__}")
+        return key if _BARE_KEY.match(key) else json.dumps(key, ensure_ascii=False)
+
+    def value(self, value: object) -> str:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float):
+            if math.isnan(value):
+                return "nan"
+            if math.isinf(value):
+                return "inf" if value > 0 else "-inf"
+            return repr(value)
+        if isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False).replace("\x7f", "\\u007f")
+        if isinstance(value, (list, tuple)):
+            return f"[{', '.join(self.value(x) for x in value)}]"
+        if isinstance(value, dict):
+            items = [f"{self.key(k)} = {self.value(v)}" for k, v in value.items() if v is not None]
+            return f"{{ {', '.join(items)} }}" if items else "{}"
+        raise TypeError(f"can't write {type(value).__name__} to toml")
+
+
+def freeze(value: object) -> object:
+    """Read only copy, dicts become mappingproxies and lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items() if v is not None})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(x) for x in value)
+    return value
+
+
+def thaw(value: object) -> object:
+    """Plain dict/list copy of a snapshot that callers are free to change."""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(x) for x in value]
+    return value
+
+
+def read_text(file_path: Path) -> str:
+    try:
+        return file_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        # written with the platform encoding before tomls were always saved as utf-8
+        return file_path.read_text()
+
+
+class _TomlCache(object):
+    """Parsed tomls by path, an entry is used as long as size and mtime still match."""
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[str, tuple[int, int, MappingProxyType]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, file_path: Path) -> MappingProxyType:
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                self.entries.move_to_end(key)
+                return entry[2]
+        snapshot = freeze(_loads(read_text(Path(key))))
+        with self.lock:
+            self.entries[key] = (stat.st_size, stat.st_mtime_ns, snapshot)
+            self.entries.move_to_end(key)
+            while len(self.entries) > CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return snapshot
+
+    def discard(self, file_path: Path) -> None:
+        with self.lock:
+            self.entries.pop(os.path.abspath(file_path), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+_cache = _TomlCache()
+
+
+def read_toml(file_path: Path) -> MappingProxyType:
+    """Read only snapshot of a toml file, only parsed again once the file changed."""
+    return _cache.get(file_path)
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def write_toml(args: dict, file_path: Path) -> None:
+    file_path.write_text(_dumps(args), encoding="utf-8")
+    # a rewrite can keep size and mtime on coarse clocks, never trust the old entry
+    _cache.discard(file_path)
 
 
 def save_toml(args: dict, file_path: Path | None = None) -> None:
     if file_path:
-        file_path.write_text(toml.dumps(args))
+        write_toml(args, file_path)
         return
-    config = Path("config.json")
-    config_dict = json.loads(config.read_text()) if config.exists() else {}
+    from PySide6.QtWidgets import QFileDialog
+
+    config = ConfigStore()
 
     file = QFileDialog().getSaveFileName(
         caption="Select config file save location",
         filter="Config File (*.toml)",
-        dir=config_dict["toml_default"] if "toml_default" in config_dict else "",
+        dir=config.get("toml_default", ""),
     )[0]
     if not file:
         return
     file = Path(file)
-    config_dict["toml_default"] = file.parent.as_posix()
-    config.write_text(json.dumps(config_dict, indent=2))
-    file.write_text(toml.dumps(args))
+    config.set("toml_default", file.parent.as_posix())
+    write_toml(args, file)
 
 
 def load_toml(file_path: Path | None = None) -> dict:
     if file_path and file_path.exists():
-        return toml.loads(file_path.read_text())
-    config = Path("config.json")
-    config_dict = json.loads(config.read_text()) if config.exists() else {}
+        return thaw(read_toml(file_path))
+    from PySide6.QtWidgets import QFileDialog
+
+    config = ConfigStore()
 
     file, _ = QFileDialog().getOpenFileName(
         caption="Select config file",
         filter="Config File (*.toml)",
-        dir=config_dict["toml_default"] if "toml_default" in config_dict else "",
+        dir=config.get("toml_default", ""),
     )
     if not file:
         return
     file = Path(file)
-    config_dict["toml_default"] = file.parent.as_posix()
-    config.write_text(json.dumps(config_dict, indent=2))
-    return toml.loads(file.read_text())
+    config.set("toml_default", file.parent.as_posix())
+    return thaw(read_toml(file))
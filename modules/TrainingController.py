@@ -0,0 +1,243 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Event, Lock, Thread
+import time
+
+from PySide6 import QtCore
+from PySide6.QtCore import Signal
+
+from modules import StepEstimator, TrainingJobs
+from modules.BackendPool import Backend, BackendPool
+from modules.ConfigStore import ConfigStore
+from modules.Enums import TrainingStates
+from modules.NetworkManager import NetworkManager
+
+
+class TrainingController(QtCore.QThread):
+    """Runs the queue, or the ui state when the queue is empty, off the gui thread.
+
+    Nothing in here touches a widget, progress goes out through the signals.
+    take_next hands over the next queue item as (toml, name) and runs on the
+    gui thread through call_on_gui, since it may have to save the ui into the
+    item first. peek_next is called from the worker threads. stop only sends
+    /stop_training and returns, the run ends once the backend reports it.
+    """
+
+    stateChanged = Signal(str)
+    # queue toml (None for the ui state), name, url / queue toml, succeeded
+    itemStarted = Signal(object, str, str)
+    itemFinished = Signal(object, bool)
+    error = Signal(str, str)
+    warning = Signal(str, str)
+    # runs the callable it carries on the gui thread, see call_on_gui
+    guiCall = Signal(object)
+
+    def __init__(
+        self,
+        urls: list[str],
+        take_next,
+        peek_next,
+        toml_args: dict | None = None,
+        parent: QtCore.QObject = None,
+    ) -> None:
+        super().__init__(parent)
+        self.take_next = take_next
+        self.peek_next = peek_next
+        self.toml_args = toml_args
+        self.backend_pool = BackendPool(urls)
+        self.cancelled = Event()
+        self.state = TrainingStates.IDLE
+        # runs going on and runs started so far, a run that shared the time with another is not timed
+        self.runs_lock = Lock()
+        self.active_runs = 0
+        self.started_runs = 0
+        self.guiCall.connect(
+            lambda func: func(), QtCore.Qt.ConnectionType.BlockingQueuedConnection
+        )
+
+    def set_state(self, state: TrainingStates) -> None:
+        self.state = state
+        self.stateChanged.emit(state.value)
+
+    def start(self) -> None:
+        self.set_state(TrainingStates.RUNNING)
+        super().start()
+
+    def stop(self) -> None:
+        """Asks the backends to end their runs, the queue stops once they did."""
+        if self.state != TrainingStates.RUNNING:
+            return
+        self.cancelled.set()
+        self.set_state(TrainingStates.STOPPING)
+        urls = self.backend_pool.busy_urls() or [self.backend_pool.backends[0].url]
+        for url in urls:
+            NetworkManager().get_json(
+                "/stop_training",
+                lambda _: None,
+                lambda reply, url=url: print(f"Stop request to {url} failed: {reply.errorString()}"),
+                base_url=url,
+            )
+
+    def cancel(self) -> None:
+        """Lets the running items finish, but starts no other."""
+        self.cancelled.set()
+
+    def call_on_gui(self, func):
+        """Runs func on the gui thread and returns what it returned."""
+        if QtCore.QThread.currentThread() == self.thread():
+            return func()
+        result = []
+        self.guiCall.emit(lambda: result.append(func()))
+        return result[0] if result else None
+
+    def run(self) -> None:
+        try:
+            url = self.backend_pool.backends[0].url
+            if self.toml_args is not None:
+                self.run_args(url)
+            elif len(self.backend_pool) > 1:
+                self.dispatch_queue()
+            else:
+                self.run_queue(url)
+        finally:
+            self.state = TrainingStates.IDLE
+            self.stateChanged.emit(TrainingStates.IDLE.value)
+
+    def run_args(self, url: str) -> None:
+        item = TrainingJobs.prepare_args(
+            url,
+            self.toml_args,
+            on_connection_error=lambda text: self.error.emit("Connection Error", text),
+        )
+        if item:
+            self.launch_item(url, "Training", item)
+
+    def run_queue(self, url: str) -> None:
+        # the next item is parsed and validated on this thread while the current one trains
+        pipeline = ConfigStore().get("pipeline_queue", True)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ahead = None
+
+            def prepare_ahead() -> None:
+                nonlocal ahead
+                ahead = executor.submit(self.prepare_next_item, url)
+
+            while not self.cancelled.is_set():
+                next_item = self.call_on_gui(self.take_next)
+                if not next_item:
+                    return
+                queue_file, name = next_item
+                item = self.take_prepared(ahead, queue_file) or self.prepare_item(url, queue_file)
+                ahead = None
+                # only once /train is in, a /validate before it would swap the config that trains
+                if not item or not self.launch_item(url, name, item, prepare_ahead if pipeline else None):
+                    return
+
+    def dispatch_queue(self) -> None:
+        """Runs queue items side by side, each on the next backend of the pool that is free."""
+        jobs = []
+        while not self.cancelled.is_set():
+            backend = self.backend_pool.acquire(self.cancelled)
+            if not backend:
+                break
+            next_item = self.call_on_gui(self.take_next)
+            if not next_item:
+                self.backend_pool.release(backend)
+                break
+            job = Thread(target=self.run_job, args=(backend, *next_item))
+            job.start()
+            jobs.append(job)
+        for job in jobs:
+            job.join()
+
+    def run_job(self, backend: Backend, queue_file: Path, name: str) -> None:
+        succeeded = False
+        try:
+            item = self.prepare_item(backend.url, queue_file)
+            succeeded = bool(item) and self.launch_item(backend.url, name, item)
+        finally:
+            self.backend_pool.release(backend)
+            # like the single backend queue, a failed item stops what has not started yet
+            if not succeeded:
+                print(f"Item {queue_file.name} failed on {backend.url}")
+                self.cancelled.set()
+
+    def prepare_next_item(self, url: str) -> dict | None:
+        queue_file = self.peek_next()
+        if not queue_file or not queue_file.exists():
+            return None
+        return self.prepare_item(url, queue_file, ahead=True)
+
+    @staticmethod
+    def take_prepared(ahead: Future | None, train_toml: Path) -> dict | None:
+        """Returns the item validated ahead of time if it still matches train_toml on disk."""
+        if not ahead or ahead.exception():
+            return None
+        item = ahead.result()
+        if not item or item["toml"] != train_toml or not train_toml.exists():
+            return None
+        # the checked item is re-saved from the ui before it runs, any edit invalidates it
+        if train_toml.read_bytes() != item["source"]:
+            return None
+        return item
+
+    def prepare_item(self, url: str, train_toml: Path, ahead: bool = False) -> dict | None:
+        if ahead:
+            # connection problems are retried when the item comes up
+            return TrainingJobs.prepare_item(
+                url,
+                train_toml,
+                on_validation_error=lambda text: self.warning.emit(
+                    "Queued Item Failed Validation",
+                    f"The next item in the queue will not start:\n\n{text}",
+                ),
+            )
+        return TrainingJobs.prepare_item(
+            url,
+            train_toml,
+            on_connection_error=lambda text: self.error.emit("Connection Error", text),
+        )
+
+    def launch_item(self, url: str, name: str, item: dict, on_started=None) -> bool:
+        """Runs item on url, on_started is called once the backend took the /train request."""
+        queue_file = item["toml"]
+        self.itemStarted.emit(queue_file, name, url)
+        with self.runs_lock:
+            self.active_runs += 1
+            self.started_runs += 1
+            alone = self.active_runs == 1
+            run_number = self.started_runs
+        succeeded = False
+        estimate = None
+        started = time.monotonic()
+        try:
+            watcher = TrainingJobs.start_item(url, item)
+            if watcher and on_started:
+                on_started()
+            if watcher:
+                # only once /train is in, the estimate may rescan every subset folder
+                estimate = self.estimate_item(name, item)
+            succeeded = bool(watcher) and watcher.wait()
+        finally:
+            with self.runs_lock:
+                self.active_runs -= 1
+                alone = alone and self.started_runs == run_number
+            self.itemFinished.emit(queue_file, succeeded)
+        # stopped runs end early, and runs sharing the machines with others take longer
+        if succeeded and estimate and alone and not self.cancelled.is_set():
+            StepEstimator.record_run(estimate, time.monotonic() - started)
+        return succeeded
+
+    @staticmethod
+    def estimate_item(name: str, item: dict) -> StepEstimator.StepEstimate | None:
+        try:
+            return StepEstimator.estimate_toml(item["toml_args"])
+        except Exception as e:
+            print(f"Could not estimate {name}: {e}")
+            return None
+
+    def wait_finished(self, app: QtCore.QCoreApplication) -> None:
+        """Waits for the run to end while still serving call_on_gui, for after the event loop quit."""
+        while self.isRunning():
+            app.processEvents()
+            self.wait(100)
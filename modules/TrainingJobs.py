@@ -0,0 +1,227 @@
+import os
+import shutil
+from pathlib import Path
+
+import requests
+
+from modules import TomlFunctions
+from modules.BackendClient import BackendClient
+from modules.ConfigStore import ConfigStore
+from modules.Enums import TrainingModes
+from modules.TagIndex import TagIndex, subset_key
+from modules.TrainingStatus import TrainingStatusWatcher
+
+# The backend side of a queue item, kept free of Qt so the headless runner can share it.
+
+
+def split_toml(loaded_args: dict) -> tuple[dict, dict, TrainingModes]:
+    """Splits a saved toml into the args, dataset args and train mode the backend expects."""
+    args = {}
+    dataset_args = {}
+    if "subsets" in loaded_args:
+        dataset_args["subsets"] = loaded_args["subsets"]
+        del loaded_args["subsets"]
+
+    train_mode = TrainingModes.LORA
+    if "train_mode" in loaded_args:
+        train_mode = TrainingModes(loaded_args["train_mode"]["train_mode"])
+
+    for arg, val in loaded_args.items():
+        if "args" in val:
+            args[arg] = val["args"]
+        if "dataset_args" in val:
+            dataset_args[arg] = val["dataset_args"]
+    return args, dataset_args, train_mode
+
+
+def prepare_item(
+    url: str,
+    train_toml: Path,
+    on_connection_error=None,
+    on_validation_error=None,
+) -> dict | None:
+    """Parses and validates a queued toml and builds its /train params, nothing is written."""
+    source = train_toml.read_bytes()
+    item = prepare_args(
+        url,
+        TomlFunctions.thaw(TomlFunctions.read_toml(train_toml)),
+        on_connection_error,
+        on_validation_error,
+    )
+    if item:
+        item["toml"] = train_toml
+        item["source"] = source
+    return item
+
+
+def prepare_args(
+    url: str,
+    toml_args: dict,
+    on_connection_error=None,
+    on_validation_error=None,
+) -> dict | None:
+    """Validates args shaped like a saved toml and builds the /train params, nothing is written."""
+    args, dataset_args, train_mode = split_toml(dict(toml_args))
+    config = ConfigStore()
+
+    # Include accelerate settings in validation request for proper warmup step calculation
+    final_args = {
+        "args": args,
+        "dataset": dataset_args,
+        "accelerate": config.get("accelerate", {}),
+    }
+    try:
+        response = BackendClient().post(url, "/validate", final_args)
+    except requests.RequestException as e:
+        print(e)
+        if on_connection_error:
+            on_connection_error(
+                f"The backend at {url} did not answer the validation request in time."
+                if isinstance(e, requests.ReadTimeout)
+                else f"Failed to connect to the backend at {url}.\n\n"
+                "Please ensure the backend is running and the URL is correct."
+            )
+        return None
+    if response.status_code != 200:
+        print(f"Item Failed: {response.text}")
+        if on_validation_error:
+            on_validation_error(response.text)
+        return None
+    validation = response.json()
+    tags = {}
+    if args.get("saving_args", {}).get("tag_occurrence", None):
+        # counted now, the item is prepared while the one before it trains
+        tags = local_tags(toml_args) or validation.get("tags", {})
+    is_sdxl = str(args.get("general_args").get("sdxl", False))
+    is_flux = str(bool(args.get("flux_args")))
+    is_anima = str(bool(args.get("anima_args")))
+
+    # Build train params including accelerate settings
+    train_params = {
+        "train_mode": train_mode.value,
+        "sdxl": is_sdxl,
+        "flux": is_flux,
+        "anima": is_anima,
+    }
+
+    # Add accelerate settings if enabled
+    accel = config.get("accelerate", {})
+    if accel.get("enabled", False):
+        train_params["accelerate_enabled"] = "True"
+        train_params["accelerate_num_processes"] = str(accel.get("num_processes", 2))
+        train_params["accelerate_main_process_port"] = str(accel.get("main_process_port", 29500))
+    return {
+        "toml": None,
+        "source": None,
+        "toml_args": toml_args,
+        "args": args,
+        "validation": validation,
+        "tags": tags,
+        "params": train_params,
+    }
+
+
+def launch_item(url: str, item: dict, remove_toml: bool = True) -> bool:
+    """Starts the run with start_item and waits for it to end."""
+    watcher = start_item(url, item, remove_toml)
+    return bool(watcher) and watcher.wait()
+
+
+def start_item(url: str, item: dict, remove_toml: bool = True) -> TrainingStatusWatcher | None:
+    """Writes the tag file and auto-save copy and starts the run, returns what waits for its end.
+
+    The backend trains the config it validated last, so nothing else may be
+    validated on url until this returned. Items prepared from args in memory
+    have no toml, their auto-save copy is written from toml_args.
+    """
+    args = item["args"]
+    train_toml = item["toml"]
+    if args.get("saving_args", {}).get("tag_occurrence", None):
+        folder = args["saving_args"].get("tag_file_location", None)
+        create_tag_file(
+            item["tags"],
+            Path(folder) if folder else None,
+            args["saving_args"].get("output_name", "output_tags"),
+        )
+    if args.get("saving_args", {}).get("save_toml", None):
+        folder = args["saving_args"].get("save_toml_location", None)
+        create_auto_save_toml(
+            train_toml or item["toml_args"],
+            Path(folder) if folder else None,
+            args["saving_args"].get("output_name", "output_args"),
+        )
+    if remove_toml and train_toml:
+        os.remove(train_toml)
+    try:
+        response = BackendClient().get(url, "/train", params=item["params"])
+    except requests.RequestException as e:
+        print(f"Failed to start training: {e}")
+        return None
+    # a refused start leaves the backend idle, which the watcher would take for a finished run
+    if response.status_code != 200:
+        print(f"Failed to start training: {response.text}")
+        return None
+    return TrainingStatusWatcher(url)
+
+
+def local_tags(toml_args: dict) -> dict:
+    """Tag counts of the subsets from this machine, empty unless every subset folder is here.
+
+    The index skips folders it can't list, those may only exist on the
+    backend's machine and leaving them out would undercount.
+    """
+    subsets = [
+        subset for subset in toml_args.get("subsets", []) if subset.get("image_dir") and not subset.get("is_val")
+    ]
+    try:
+        indexed = TagIndex().index(subsets)
+    except Exception as e:
+        print(f"Counting tags locally failed: {e}")
+        return {}
+    if not indexed or set(indexed[1]) != {subset_key(subset) for subset in subsets}:
+        return {}
+    return dict(indexed[0].tags.most_common())
+
+
+def create_tag_file(
+    tags: dict,
+    output_location: Path | None = None,
+    output_name: str = "output_tags",
+) -> Path | None:
+    if not tags:
+        return None
+    if not output_location:
+        output_location = Path("auto_save_store")
+    if not output_location.exists():
+        output_location.mkdir()
+    if output_location.is_file():
+        output_location = output_location.parent
+    output_location = output_location.joinpath(f"{output_name}.txt")
+    with output_location.open("w", encoding="utf-8") as f:
+        f.write("Below is a list of keywords used during the training of this model:\n")
+        for k, v in tags.items():
+            f.write(f"[{v}] {k}\n")
+    return output_location
+
+
+def create_auto_save_toml(
+    input_toml: Path | dict,
+    output_location: Path | None = None,
+    output_name: str = "output_toml",
+):
+    if not output_location:
+        output_location = Path("auto_save_store")
+    if not output_location.exists():
+        output_location.mkdir()
+    if output_location.is_file():
+        output_location = output_location.parent
+    output_location = output_location.joinpath(f"{output_name}.toml")
+    offset = 1
+    orig_name = output_location.stem
+    while output_location.exists():
+        output_location = output_location.with_stem(f"{orig_name}_{offset}")
+        offset += 1
+    if isinstance(input_toml, dict):
+        TomlFunctions.save_toml(input_toml, output_location)
+        return
+    shutil.copy(input_toml, output_location)
@@ -0,0 +1,116 @@
+import json
+import time
+
+import requests
+
+from modules.BackendClient import BackendClient
+
+EVENTS_ROUTE = "/training_events"
+STATUS_ROUTE = "/is_training"
+MIN_INTERVAL = 0.25
+MAX_INTERVAL = 2.0
+BACKOFF = 1.5
+MAX_FAILURES = 3
+# an idle report this soon after /train may predate the run, matches the old fixed wait
+STARTUP_GRACE = 5.0
+
+
+class TrainingStatusWatcher(object):
+    """Waits for the backend to report the end of the current training run.
+
+    Subscribes to the server-sent event stream at EVENTS_ROUTE when the backend
+    provides one. Backends without it are remembered per url and watched by
+    polling STATUS_ROUTE instead, starting at MIN_INTERVAL and backing off to
+    MAX_INTERVAL, so short jobs are picked up almost as soon as they end.
+    Create it right after the /train request, before the first report.
+    """
+
+    _event_support: dict[str, bool] = {}
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.started = time.monotonic()
+        self.seen_training = False
+
+    def wait(self) -> bool:
+        """Returns True once training finished cleanly, False on error or lost connection."""
+        if self._event_support.get(self.url, True):
+            finished = self.wait_events()
+            if finished is not None:
+                return finished
+        return self.wait_polling()
+
+    def wait_events(self) -> bool | None:
+        """Follows the event stream, returns None when it has to fall back to polling."""
+        try:
+            response = BackendClient().get(
+                self.url,
+                EVENTS_ROUTE,
+                stream=True,
+                headers={"Accept": "text/event-stream"},
+            )
+        except requests.RequestException:
+            return None
+        with response:
+            if response.status_code != 200 or "text/event-stream" not in response.headers.get(
+                "Content-Type", ""
+            ):
+                TrainingStatusWatcher._event_support[self.url] = False
+                return None
+            TrainingStatusWatcher._event_support[self.url] = True
+            try:
+                for status in self.iter_events(response):
+                    finished = self.check_status(status)
+                    if finished is not None:
+                        return finished
+            except (requests.RequestException, ValueError):
+                pass
+        # the stream dropped before the run ended, polling confirms the final state
+        return None
+
+    @staticmethod
+    def iter_events(response: requests.Response):
+        data = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line is None:
+                continue
+            if not line:
+                if data:
+                    yield json.loads("\n".join(data))
+                    data = []
+                continue
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+
+    def wait_polling(self) -> bool:
+        interval = MIN_INTERVAL
+        failures = 0
+        while True:
+            time.sleep(interval)
+            interval = min(interval * BACKOFF, MAX_INTERVAL)
+            try:
+                response = BackendClient().get(self.url, STATUS_ROUTE)
+                # a restarting backend can answer with a partial or html body
+                status = response.json() if response.status_code == 200 else None
+            except (requests.RequestException, ValueError):
+                status = None
+            if not isinstance(status, dict):
+                failures += 1
+                if failures > MAX_FAILURES:
+                    print("Connection Failed, assuming training has stopped.")
+                    return False
+                continue
+            failures = 0
+            finished = self.check_status(status)
+            if finished is not None:
+                return finished
+
+    def check_status(self, status: dict) -> bool | None:
+        if status.get("errored"):
+            return False
+        if status.get("training"):
+            self.seen_training = True
+            return None
+        if self.seen_training or time.monotonic() - self.started >= STARTUP_GRACE:
+            return True
+        return None
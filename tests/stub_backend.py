@@ -0,0 +1,106 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class StubBackend(object):
+    """Just enough of the training backend to run queue items against.
+
+    Like the real one it trains the config it validated last. Every request
+    is logged as (route, name of the validated config). A run reports
+    training for run_polls polls and is done on the next, the event stream
+    is not offered so the watcher polls.
+    """
+
+    def __init__(
+        self,
+        train_delay: float = 0.2,
+        train_status: int = 200,
+        run_polls: int = 1,
+        broken_polls: int = 0,
+        validate_delay: float = 0.0,
+        tags: dict | None = None,
+    ) -> None:
+        self.log: list[tuple[str, str | None]] = []
+        self.validated: str | None = None
+        self.run_polls = run_polls
+        self.polls_left = 0
+        # polls answered with a body that is not json, like a backend that is restarting
+        self.broken_polls = broken_polls
+        self.validate_delay = validate_delay
+        # what /validate reports as the tag counts of the dataset
+        self.tags = tags or {}
+        # /train takes a moment, like the real backend, so a racing /validate shows up
+        self.train_delay = train_delay
+        self.train_status = train_status
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "StubBackend":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def trained(self) -> list[str | None]:
+        return [name for route, name in self.log if route == "/train"]
+
+    def handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_) -> None:
+                pass
+
+            def reply(self, status: int, body: object = None) -> None:
+                data = json.dumps(body or {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(backend.validate_delay)
+                with backend.lock:
+                    backend.validated = body["args"].get("general_args", {}).get("name", "unnamed")
+                    backend.log.append(("/validate", backend.validated))
+                self.reply(200, {"tags": backend.tags})
+
+            def do_GET(self) -> None:
+                route = urlparse(self.path).path
+                if route == "/train":
+                    time.sleep(backend.train_delay)
+                    with backend.lock:
+                        backend.log.append((route, backend.validated))
+                        if backend.train_status == 200:
+                            backend.polls_left = backend.run_polls
+                    self.reply(backend.train_status)
+                elif route == "/is_training":
+                    with backend.lock:
+                        broken = backend.broken_polls > 0
+                        backend.broken_polls -= 1
+                    if broken:
+                        data = b'{"training": tr'
+                        self.send_response(200)
+                        self.send_header("Content-Length", str(len(data)))
+                        self.end_headers()
+                        self.wfile.write(data)
+                        return
+                    with backend.lock:
+                        training = backend.polls_left > 0
+                        backend.polls_left = max(0, backend.polls_left - 1)
+                    self.reply(200, {"training": training, "errored": False})
+                elif route == "/stop_training":
+                    self.reply(200)
+                else:
+                    self.reply(404)
+
+        return Handler
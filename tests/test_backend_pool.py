@@ -0,0 +1,24 @@
+import threading
+
+from modules.BackendPool import BackendPool
+from tests.stub_backend import StubBackend
+
+
+def test_backend_takes_one_job_at_a_time():
+    with StubBackend() as backend:
+        pool = BackendPool([backend.url])
+        cancel = threading.Event()
+        first = pool.acquire(cancel)
+        assert first is not None
+        threading.Timer(0.5, cancel.set).start()
+        assert pool.acquire(cancel) is None
+        pool.release(first)
+        assert pool.acquire(threading.Event()) is first
+
+
+def test_jobs_spread_over_backends():
+    with StubBackend() as one, StubBackend() as two:
+        pool = BackendPool([one.url, two.url])
+        taken = [pool.acquire(threading.Event()) for _ in range(2)]
+        assert sorted(backend.url for backend in taken) == sorted([one.url, two.url])
+        assert sorted(pool.busy_urls()) == sorted([one.url, two.url])
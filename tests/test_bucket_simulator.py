@@ -0,0 +1,64 @@
+import numpy as np
+from PIL import Image
+
+from modules.BucketSimulator import epoch_repeats, simulate
+
+BUCKETS = {"enable_bucket": True, "min_bucket_reso": 256, "max_bucket_reso": 1024, "bucket_reso_steps": 64}
+
+
+def write_images(folder, sizes: list[tuple[int, int]]) -> str:
+    folder.mkdir()
+    for i, size in enumerate(sizes):
+        Image.new("RGB", size).save(folder / f"{i}.png")
+    return str(folder)
+
+
+def test_epoch_repeats():
+    assert epoch_repeats(2, np.array([1, 1, 1])).tolist() == [1, 1, 0]
+    assert epoch_repeats(10, np.array([1, 1, 1])).tolist() == [4, 3, 3]
+    assert epoch_repeats(3, np.array([2, 2])).tolist() == [2, 2]
+    assert epoch_repeats(0, np.array([1, 1])).tolist() == [0, 0]
+    assert epoch_repeats(5, np.array([], dtype=np.int64)).tolist() == []
+
+
+def test_simulate_buckets(tmp_path):
+    image_dir = write_images(tmp_path / "train", [(512, 512), (512, 512), (768, 512), (1024, 1024)])
+    preview = simulate([{"image_dir": image_dir, "num_repeats": 3}], 512, 4, BUCKETS)
+    assert preview.images == 4 and preview.reg_images == 0
+    assert {bucket: value[:3] for bucket, value in preview.buckets.items()} == {
+        (512, 512): [3, 9, 3],
+        (640, 384): [1, 3, 1],
+    }
+    assert preview.samples == 12 and preview.batches == 4
+    assert preview.warnings == []
+
+
+def test_simulate_without_buckets_or_upscaling(tmp_path):
+    image_dir = write_images(tmp_path / "train", [(256, 384), (1024, 1024)])
+    subsets = [{"image_dir": image_dir}]
+    assert set(simulate(subsets, [512, 512], 1, {}).buckets) == {(512, 512)}
+    no_upscale = simulate(subsets, 512, 1, {**BUCKETS, "bucket_no_upscale": True})
+    assert set(no_upscale.buckets) == {(256, 384), (512, 512)}
+
+
+def test_simulate_reg_images_and_unreadable(tmp_path):
+    train = write_images(tmp_path / "train", [(512, 512)] * 2)
+    reg = write_images(tmp_path / "reg", [(512, 512)] * 3)
+    (tmp_path / "train" / "broken.png").write_bytes(b"not a png")
+    subsets = [
+        {"image_dir": train, "num_repeats": 1},
+        {"image_dir": reg, "num_repeats": 1, "is_reg": True},
+        {"image_dir": reg, "is_val": True},
+    ]
+    preview = simulate(subsets, 512, 1, {})
+    # two training samples, so only the first two reg images are used
+    assert preview.images == 2 and preview.reg_images == 2
+    assert preview.unreadable == 1
+    assert preview.samples == 4
+
+
+def test_simulate_warnings(tmp_path):
+    image_dir = write_images(tmp_path / "train", [(512, 512)])
+    args = {**BUCKETS, "max_bucket_reso": 768, "multires_training": True}
+    preview = simulate([{"image_dir": image_dir}], 1024, 1, args)
+    assert len(preview.warnings) == 2
@@ -0,0 +1,52 @@
+import os
+
+from PIL import Image
+
+from modules import DatasetManifest as dataset_manifest
+from modules.DatasetManifest import DatasetManifest
+
+
+def test_refresh_keeps_what_was_read_until_a_file_changes(tmp_path, monkeypatch):
+    Image.new("RGB", (64, 32)).save(tmp_path / "a.png")
+    Image.new("RGB", (16, 16)).save(tmp_path / "b.png")
+    (tmp_path / "a.txt").write_text("ohwx")
+    manifest = DatasetManifest()
+    records = manifest.refresh(str(tmp_path))
+    assert set(records) == {"a.png", "b.png", "a.txt"}
+    assert manifest.image_sizes(str(tmp_path), records, ["a.png", "b.png"]) == [(64, 32), (16, 16)]
+    digest = manifest.digests(str(tmp_path), records, ["a.txt"])[0]
+
+    calls = []
+
+    def image_size(path):
+        calls.append(os.path.basename(path))
+        return 1, 1
+
+    monkeypatch.setattr(dataset_manifest, "image_size", image_size)
+    Image.new("RGB", (20, 10)).save(tmp_path / "b.png")
+    os.utime(tmp_path / "b.png", ns=(1, 1))
+    records = manifest.refresh(str(tmp_path))
+    assert records["a.png"].width == 64 and records["b.png"].width is None
+    assert manifest.image_sizes(str(tmp_path), records, ["a.png", "b.png"]) == [(64, 32), (1, 1)]
+    assert calls == ["b.png"]
+    assert manifest.digests(str(tmp_path), records, ["a.txt"]) == [digest]
+
+
+def test_removed_files_and_unreadable_images(tmp_path):
+    (tmp_path / "broken.png").write_bytes(b"not a png")
+    (tmp_path / "gone.txt").write_text("")
+    manifest = DatasetManifest()
+    manifest.refresh(str(tmp_path))
+    (tmp_path / "gone.txt").unlink()
+    records = manifest.refresh(str(tmp_path))
+    assert set(records) == {"broken.png"}
+    assert manifest.image_sizes(str(tmp_path), records, ["broken.png"]) == [None]
+    # the failed read is remembered as (0, 0)
+    assert manifest.refresh(str(tmp_path))["broken.png"].width == 0
+
+
+def test_folder_cache_follows_the_fingerprint():
+    manifest = DatasetManifest()
+    manifest.store("tags", "folder", "one", "data")
+    assert manifest.cached("tags", "folder", "one") == "data"
+    assert manifest.cached("tags", "folder", "two") is None
@@ -0,0 +1,37 @@
+import pytest
+from PIL import Image
+
+from modules.ImageHeaders import image_size
+
+
+@pytest.mark.parametrize(
+    "name, options",
+    [
+        ("a.png", {}),
+        ("a.jpg", {}),
+        ("progressive.jpg", {"progressive": True}),
+        ("a.webp", {}),
+        ("lossless.webp", {"lossless": True}),
+        ("a.bmp", {}),
+    ],
+)
+def test_sizes_match_pillow(tmp_path, name, options):
+    path = tmp_path / name
+    Image.new("RGB", (123, 45), "red").save(path, **options)
+    assert image_size(path) == (123, 45)
+
+
+def test_webp_with_alpha_uses_the_extended_header(tmp_path):
+    path = tmp_path / "alpha.webp"
+    Image.new("RGBA", (300, 17), (0, 0, 0, 0)).save(path, exif=b"Exif\x00\x00")
+    assert image_size(path) == (300, 17)
+
+
+def test_unreadable_files(tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF")
+    other = tmp_path / "a.gif"
+    Image.new("RGB", (8, 8)).save(other)
+    assert image_size(broken) is None
+    assert image_size(other) is None
+    assert image_size(tmp_path / "missing.png") is None
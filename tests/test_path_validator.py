@@ -0,0 +1,24 @@
+from modules.PathValidator import PathValidator, check_local
+
+
+def test_check_local(tmp_path):
+    model = tmp_path / "model.safetensors"
+    model.write_bytes(b"")
+    assert check_local(str(tmp_path), "folder", ())
+    assert not check_local(str(model), "folder", ())
+    assert check_local(str(model), "file", (".safetensors", ".ckpt"))
+    assert check_local(str(model), "file", ())
+    assert not check_local(str(model), "file", (".ckpt",))
+    assert not check_local(str(tmp_path), "file", ())
+    assert not check_local(str(tmp_path / "missing"), "folder", ())
+    assert not check_local("bad\0path", "folder", ())
+
+
+def test_local_backend_results_are_cached(qt_app, tmp_path):
+    validator = PathValidator()
+    keys = [(str(tmp_path), "folder", ()), (str(tmp_path / "missing"), "folder", ())]
+    validator.check("http://127.0.0.1:8000", keys)
+    assert validator.cache[keys[0]][1] is True
+    assert validator.cache[keys[1]][1] is False
+    validator.invalidate(str(tmp_path))
+    assert keys[0] not in validator.cache and keys[1] in validator.cache
@@ -0,0 +1,66 @@
+import pytest
+
+from modules.StepEstimator import DEFAULT_MAX_TRAIN_STEPS, add_duration, count_steps, fit, format_duration
+
+
+def toml_args(args: dict | None = None, batch_size: int = 1, subsets: list | None = None) -> dict:
+    return {
+        "general_args": {"args": args or {}, "dataset_args": {"batch_size": batch_size, "resolution": [1024, 512]}},
+        "subsets": subsets if subsets is not None else [{"num_repeats": 2}],
+    }
+
+
+def test_epochs_give_the_steps():
+    estimate = count_steps(toml_args({"max_train_epochs": 3}, batch_size=4), [10])
+    assert estimate.samples == 20 and estimate.batches_per_epoch == 5
+    assert estimate.epochs == 3 and estimate.steps == 15
+    assert estimate.megapixels == pytest.approx(0.524288)
+
+
+def test_steps_give_the_epochs():
+    estimate = count_steps(toml_args({"max_train_steps": 12}), [5])
+    assert estimate.steps == 12 and estimate.epochs == 2
+    assert count_steps(toml_args(), [5]).steps == DEFAULT_MAX_TRAIN_STEPS
+
+
+def test_reg_images_double_the_samples_and_val_is_left_out():
+    subsets = [{"num_repeats": 2}, {"is_reg": True}, {"is_val": True, "num_repeats": 5}]
+    assert count_steps(toml_args(subsets=subsets), [10, 3, 100]).samples == 40
+    # an empty reg folder adds nothing
+    assert count_steps(toml_args(subsets=subsets), [10, 0, 100]).samples == 20
+
+
+def test_gradient_accumulation_and_processes_divide_the_steps():
+    args = {"max_train_epochs": 2, "gradient_accumulation_steps": 2}
+    estimate = count_steps(toml_args(args), [10], processes=2)
+    assert estimate.batches_per_epoch == 20
+    assert estimate.steps == 10 and estimate.num_processes == 2
+
+
+def test_model_family():
+    assert count_steps(toml_args({"sdxl": True}), [1]).family == "sdxl"
+    assert count_steps({**toml_args(), "flux_args": {"args": {"t5xxl": "t5"}}}, [1]).family == "flux"
+
+
+def test_fit():
+    assert fit([]) is None
+    exact = [{"work": work, "seconds": 30 + 2 * work} for work in (10, 20, 40)]
+    assert fit(exact) == pytest.approx((30, 2))
+    # a single run can't be split into startup and rate
+    assert fit([{"work": 10, "seconds": 50}]) == (0.0, 5.0)
+    # runs that would need a negative startup fall back to the average rate
+    noisy = [{"work": 10, "seconds": 10}, {"work": 20, "seconds": 40}]
+    assert fit(noisy) == pytest.approx((0.0, 50 / 30))
+
+
+def test_add_duration():
+    estimate = count_steps(toml_args({"max_train_steps": 100}), [1])
+    history = {"sd": [{"work": work, "seconds": 30 + 2 * work} for work in (10, 20, 40)]}
+    assert add_duration(estimate, history).seconds == pytest.approx(30 + 2 * estimate.work)
+    assert add_duration(estimate, {"sdxl": history["sd"]}).seconds is None
+
+
+def test_format_duration():
+    assert format_duration(20) == "<1m"
+    assert format_duration(59 * 60) == "59m"
+    assert format_duration(3 * 3600 + 5 * 60) == "3h 05m"
@@ -0,0 +1,80 @@
+import os
+import threading
+
+import pytest
+
+from modules.SubsetDiscovery import subset_folders
+
+
+def make_tree(root, folders: list[str]) -> None:
+    """Folders ending in a slash are left empty, the rest get an image."""
+    for folder in folders:
+        path = root / folder
+        path.mkdir(parents=True, exist_ok=True)
+        if not folder.endswith("/"):
+            (path / "0.png").write_bytes(b"")
+
+
+def names(found) -> list[str]:
+    return [name for name, _ in found]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    make_tree(
+        tmp_path,
+        ["b_concept", "a_concept", "a_concept/masks", "group/", "group/5_one", "group/2_two", ".cache", "group/.hidden"],
+    )
+    (tmp_path / "notes.txt").write_text("")
+    return tmp_path
+
+
+def test_flat_lists_every_folder(tree):
+    found = list(subset_folders(str(tree)))
+    assert names(found) == ["a_concept", "b_concept", "group"]
+    assert found[0][1] == os.path.join(str(tree), "a_concept")
+
+
+def test_recursive_finds_folders_with_images(tree):
+    # masks next to the images of a subset are not a subset of their own
+    assert names(subset_folders(str(tree), recursive=True)) == [
+        "a_concept",
+        "b_concept",
+        "group/2_two",
+        "group/5_one",
+    ]
+
+
+def test_images_in_the_root_do_not_stop_the_walk(tree):
+    (tree / "0.png").write_bytes(b"")
+    assert "group/5_one" in names(subset_folders(str(tree), recursive=True))
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_links_are_added_but_not_followed(tmp_path):
+    make_tree(tmp_path, ["data/5_one", "data/loop/"])
+    try:
+        os.symlink(tmp_path / "data", tmp_path / "data" / "loop" / "back", target_is_directory=True)
+        os.symlink(tmp_path / "data" / "5_one", tmp_path / "data" / "linked", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks are not allowed here")
+    assert names(subset_folders(str(tmp_path / "data"), recursive=True)) == ["5_one", "linked"]
+
+
+def test_progress_and_cancel(tree):
+    progress = []
+    found = list(subset_folders(str(tree), recursive=True, progress=lambda *args: progress.append(args)))
+    # the root, a_concept, b_concept, group and its two subsets
+    assert progress[-1] == (6, 6)
+    assert len(found) == 4
+
+    cancelled = threading.Event()
+    found = []
+    for name, _ in subset_folders(str(tree), recursive=True, cancelled=cancelled):
+        found.append(name)
+        cancelled.set()
+    assert found == ["a_concept"]
+
+
+def test_missing_root_finds_nothing(tmp_path):
+    assert list(subset_folders(str(tmp_path / "missing"), recursive=True)) == []
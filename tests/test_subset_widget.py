@@ -0,0 +1,38 @@
+from main_ui_files.SubsetUI import SubsetWidget
+
+SUBSET = {
+    "image_dir": "/data/5_ohwx",
+    "num_repeats": 5,
+    "keep_tokens": 1,
+    "caption_extension": ".caption",
+    "shuffle_caption": True,
+    "flip_aug": True,
+    "color_aug": True,
+    "random_crop": True,
+    "is_reg": True,
+}
+
+
+def test_loading_a_subset_sends_one_change(qt_app):
+    widget = SubsetWidget(name="subset")
+    edits = []
+    widget.edited.connect(lambda args, name: edits.append((dict(args), name)))
+    widget.load_dataset_args(SUBSET)
+    assert len(edits) == 1 and widget.emitted_changes == 1
+    assert edits[0][1] == "subset"
+    assert {key: edits[0][0][key] for key in SUBSET} == SUBSET
+
+
+def test_every_input_sends_a_change_outside_an_update(qt_app):
+    widget = SubsetWidget(name="subset")
+    widget.apply_dataset_args(SUBSET)
+    # what every load cost before the batching, one emission per input that moved
+    assert widget.emitted_changes > 10
+
+    widget.emitted_changes = 0
+    with widget.updating():
+        with widget.updating():
+            widget.edit_dataset_args("num_repeats", 2)
+        widget.edit_dataset_args("num_repeats", 3)
+        assert widget.emitted_changes == 0
+    assert widget.emitted_changes == 1
@@ -0,0 +1,83 @@
+from modules import TagIndex as tag_index
+from modules.TagIndex import TagIndex, count_files, split_tags, suggest_keep_tokens, suggest_protected_tags
+
+
+def write_dataset(folder, captions: list[str], extension: str = ".txt") -> None:
+    folder.mkdir(exist_ok=True)
+    for i, caption in enumerate(captions):
+        (folder / f"{i}.png").write_bytes(b"")
+        (folder / f"{i}{extension}").write_text(caption, encoding="utf-8")
+
+
+def test_split_tags_drops_blanks():
+    assert split_tags(" a,b , ,c,\n") == ["a", "b", "c"]
+
+
+def test_count_files_counts_a_tag_once_per_caption(tmp_path):
+    paths = []
+    for i, caption in enumerate(["ohwx, red, red", "ohwx, blue", "blue, ohwx"]):
+        path = tmp_path / f"{i}.txt"
+        path.write_text(caption)
+        paths.append(str(path))
+    counts = count_files(paths + [str(tmp_path / "missing.txt")])
+    assert counts.captions == 3
+    assert counts.tags == {"ohwx": 3, "red": 1, "blue": 2}
+    assert counts.leading[0] == {"ohwx": 2, "blue": 1}
+
+
+def test_suggestions(tmp_path):
+    write_dataset(tmp_path / "a", [f"ohwx, 1girl, tag{i}" for i in range(19)] + ["1girl, ohwx"])
+    total, by_subset = TagIndex().index([{"image_dir": str(tmp_path / "a"), "caption_extension": ".txt"}])
+    counts = by_subset[(str(tmp_path / "a"), ".txt")]
+    # 19 of 20 captions start with ohwx, 1girl
+    assert suggest_keep_tokens(counts) == ["ohwx", "1girl"]
+    assert suggest_keep_tokens(counts, share=1.0) == []
+    assert suggest_protected_tags(total) == ["ohwx", "1girl"]
+
+
+def test_same_folder_with_two_caption_extensions(tmp_path):
+    folder = tmp_path / "a"
+    write_dataset(folder, ["ohwx, red"] * 3, ".txt")
+    write_dataset(folder, ["blue"] * 3, ".caption")
+    subsets = [
+        {"image_dir": str(folder), "caption_extension": ".txt"},
+        {"image_dir": str(folder), "caption_extension": ".caption"},
+        {"image_dir": str(folder), "caption_extension": ".txt", "is_val": True},
+        {"image_dir": str(tmp_path / "missing"), "caption_extension": ".txt"},
+    ]
+    total, by_subset = TagIndex().index(subsets)
+    assert total.captions == 6
+    assert total.tags == {"ohwx": 3, "red": 3, "blue": 3}
+    assert set(by_subset) == {(str(folder), ".txt"), (str(folder), ".caption")}
+
+
+def test_unchanged_folders_come_from_the_cache(tmp_path, monkeypatch):
+    folder = tmp_path / "a"
+    write_dataset(folder, ["ohwx, red"] * 3)
+    subsets = [{"image_dir": str(folder), "caption_extension": ".txt"}]
+    first, _ = TagIndex().index(subsets)
+
+    def fail(_):
+        raise AssertionError("read again")
+
+    monkeypatch.setattr(tag_index, "count_files", fail)
+    cached, _ = TagIndex().index(subsets)
+    assert cached.tags == first.tags
+    monkeypatch.undo()
+
+    (folder / "0.txt").write_text("ohwx, green, and more")
+    changed, _ = TagIndex().index(subsets)
+    assert changed.tags == {"ohwx": 3, "red": 2, "green": 1, "and more": 1}
+
+
+def test_process_pool_and_chunks_give_the_same_counts(tmp_path, monkeypatch):
+    captions = [f"ohwx, tag{i % 7}" for i in range(50)]
+    write_dataset(tmp_path / "a", captions)
+    subsets = [{"image_dir": str(tmp_path / "a"), "caption_extension": ".txt"}]
+    monkeypatch.setattr(tag_index, "PROCESS_MIN_FILES", 1)
+    monkeypatch.setattr(tag_index, "CHUNK", 8)
+    progress = []
+    total, _ = TagIndex().index(subsets, lambda done, count: progress.append((done, count)))
+    assert total.captions == 50
+    assert total.tags["ohwx"] == 50 and total.tags["tag0"] == 8
+    assert progress[0] == (0, 50) and progress[-1] == (50, 50)
@@ -0,0 +1,83 @@
+from types import MappingProxyType
+
+import pytest
+import toml
+
+from modules import TomlFunctions
+from modules.TomlFunctions import TomlWriter, dumps_toml, parse_toml
+
+CONFIG = {
+    "general_args": {
+        "args": {
+            "pretrained_model_name_or_path": "C:\\models\\sd_xl_base_1.0.safetensors",
+            "sdxl": True,
+            "seed": 23,
+            "max_train_epochs": 10,
+            "clip_skip": 2,
+        },
+        "dataset_args": {"resolution": [1024, 768], "batch_size": 2},
+    },
+    "optimizer_args": {
+        "args": {
+            "optimizer_type": "AdamW8bit",
+            "learning_rate": 0.0001,
+            "lr_scheduler": "cosine",
+            "optimizer_args": ["weight_decay=0.1", "betas=0.9,0.99"],
+        }
+    },
+    "network_args": {"args": {"network_dim": 16, "network_alpha": 8.0, "network_args": {"conv_dim": 8}}},
+    "saving_args": {"args": {"output_name": "名前 \"quoted\"\ttab", "tag_occurrence": False}},
+    "subsets": [
+        {"image_dir": "/data/5_ohwx", "num_repeats": 5, "keep_tokens": 1, "caption_extension": ".txt"},
+        {"image_dir": "/data/1_reg", "num_repeats": 1, "is_reg": True, "flip_aug": False},
+    ],
+    "train_mode": {"train_mode": "lora"},
+}
+
+
+def test_writer_round_trips_a_config():
+    text = TomlWriter().dumps(CONFIG)
+    assert parse_toml(text) == CONFIG
+    # the toml package reads it too, older installs parse with it
+    assert toml.loads(text) == CONFIG
+
+
+def test_writer_leaves_out_none_and_quotes_odd_keys():
+    text = TomlWriter().dumps({"table": {"a": None, "b": 1, "odd key": "x", "empty": []}})
+    assert parse_toml(text) == {"table": {"b": 1, "odd key": "x", "empty": []}}
+
+
+def test_writer_edge_values():
+    values = {"values": {"inf": float("inf"), "small": 1e-8, "control": "a\x7fb\x00c", "big": 2**40}}
+    assert parse_toml(TomlWriter().dumps(values)) == values
+
+
+def test_unsupported_values_fall_back_to_the_toml_package():
+    with pytest.raises(TypeError):
+        TomlWriter().dumps({"table": {"set": {1, 2}}})
+    assert "set" in dumps_toml({"table": {"set": {1, 2}}})
+
+
+def test_read_toml_caches_until_the_file_changes(tmp_path):
+    path = tmp_path / "config.toml"
+    TomlFunctions.save_toml(CONFIG, path)
+    first = TomlFunctions.read_toml(path)
+    assert isinstance(first, MappingProxyType)
+    assert TomlFunctions.read_toml(path) is first
+    assert TomlFunctions.thaw(first) == CONFIG
+
+    changed = TomlFunctions.thaw(first)
+    changed["general_args"]["args"]["seed"] = 24
+    TomlFunctions.save_toml(changed, path)
+    assert TomlFunctions.read_toml(path) is not first
+    assert TomlFunctions.load_toml(path)["general_args"]["args"]["seed"] == 24
+
+
+def test_snapshots_are_read_only():
+    frozen = TomlFunctions.freeze(CONFIG)
+    with pytest.raises(TypeError):
+        frozen["train_mode"] = {}
+    assert isinstance(frozen["subsets"], tuple)
+    thawed = TomlFunctions.thaw(frozen)
+    thawed["subsets"].append({})
+    assert len(frozen["subsets"]) == 2
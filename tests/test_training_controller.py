@@ -0,0 +1,74 @@
+from modules import StepEstimator, TomlFunctions
+from modules.ConfigStore import ConfigStore
+from modules.TrainingController import TrainingController
+from tests.stub_backend import StubBackend
+
+
+def queue_files(folder, count: int) -> list:
+    files = []
+    for i in range(count):
+        path = folder / f"{i}.toml"
+        TomlFunctions.save_toml({"general_args": {"args": {"name": f"item{i}"}}, "subsets": []}, path)
+        files.append(path)
+    return files
+
+
+def run_queue(url: str, files: list) -> TrainingController:
+    queue = list(files)
+
+    def take_next():
+        if not queue:
+            return None
+        path = queue.pop(0)
+        return path, path.stem
+
+    controller = TrainingController([url], take_next, lambda: queue[0] if queue else None)
+    controller.run_queue(url)
+    return controller
+
+
+def test_run_queue_trains_each_item_once_in_order(qt_app, tmp_path):
+    with StubBackend() as backend:
+        run_queue(backend.url, queue_files(tmp_path, 3))
+    assert backend.trained() == ["item0", "item1", "item2"]
+    # the next item is only validated once the current one started
+    assert backend.log.index(("/validate", "item1")) > backend.log.index(("/train", "item0"))
+
+
+def test_run_queue_stops_when_train_is_rejected(qt_app, tmp_path):
+    with StubBackend(train_status=500) as backend:
+        run_queue(backend.url, queue_files(tmp_path, 2))
+    assert backend.trained() == ["item0"]
+    assert ("/validate", "item1") not in backend.log
+
+
+def test_items_are_estimated_after_train_is_sent(qt_app, tmp_path, monkeypatch):
+    with StubBackend() as backend:
+        trained_before = []
+        estimate_toml = StepEstimator.estimate_toml
+
+        def estimate(toml_args):
+            trained_before.append(len(backend.trained()))
+            return estimate_toml(toml_args)
+
+        monkeypatch.setattr(StepEstimator, "estimate_toml", estimate)
+        run_queue(backend.url, queue_files(tmp_path, 2))
+    assert trained_before == [1, 2]
+
+
+def test_only_runs_without_company_are_timed(qt_app, tmp_path):
+    config = ConfigStore()
+    config.set(StepEstimator.HISTORY_KEY, {})
+    files = queue_files(tmp_path, 2)
+    queue = list(files)
+    with StubBackend(run_polls=3) as one, StubBackend(run_polls=3) as two:
+        controller = TrainingController(
+            [one.url, two.url], lambda: (queue[0], queue.pop(0).stem) if queue else None, lambda: None
+        )
+        controller.dispatch_queue()
+        assert one.trained() and two.trained()
+    assert config.get(StepEstimator.HISTORY_KEY) == {}
+
+    with StubBackend() as backend:
+        run_queue(backend.url, queue_files(tmp_path, 1))
+    assert len(config.get(StepEstimator.HISTORY_KEY)["sd"]) == 1
@@ -0,0 +1,59 @@
+from modules import TagIndex as tag_index
+from modules import TrainingJobs
+from tests.stub_backend import StubBackend
+
+BACKEND_TAGS = {"counted": 3, "remotely": 1}
+
+
+def write_captions(folder, captions: list[str]) -> str:
+    folder.mkdir()
+    for i, caption in enumerate(captions):
+        (folder / f"{i}.png").write_bytes(b"")
+        (folder / f"{i}.txt").write_text(caption)
+    return str(folder)
+
+
+def toml_args(tmp_path, subsets: list[dict]) -> dict:
+    return {
+        "general_args": {"args": {"name": "item"}},
+        "saving_args": {
+            "args": {"tag_occurrence": True, "tag_file_location": str(tmp_path / "tags"), "output_name": "out"}
+        },
+        "subsets": subsets,
+    }
+
+
+def test_tags_are_counted_locally_when_every_folder_is_here(tmp_path):
+    local = write_captions(tmp_path / "local", ["ohwx, red", "ohwx"])
+    subsets = [
+        {"image_dir": local, "caption_extension": ".txt"},
+        {"image_dir": str(tmp_path / "missing"), "is_val": True},
+    ]
+    with StubBackend(tags=BACKEND_TAGS) as backend:
+        item = TrainingJobs.prepare_args(backend.url, toml_args(tmp_path, subsets))
+    assert item["tags"] == {"ohwx": 2, "red": 1}
+
+
+def test_backend_tags_are_used_when_a_folder_is_not_here(tmp_path):
+    local = write_captions(tmp_path / "local", ["ohwx, red", "ohwx"])
+    subsets = [
+        {"image_dir": local, "caption_extension": ".txt"},
+        {"image_dir": str(tmp_path / "on_the_backend"), "caption_extension": ".txt"},
+    ]
+    assert TrainingJobs.local_tags({"subsets": subsets}) == {}
+    with StubBackend(tags=BACKEND_TAGS) as backend:
+        item = TrainingJobs.prepare_args(backend.url, toml_args(tmp_path, subsets))
+    assert item["tags"] == BACKEND_TAGS
+
+
+def test_start_item_only_writes_the_counted_tags(tmp_path, monkeypatch):
+    local = write_captions(tmp_path / "local", ["ohwx"])
+    with StubBackend() as backend:
+        item = TrainingJobs.prepare_args(backend.url, toml_args(tmp_path, [{"image_dir": local, "caption_extension": ".txt"}]))
+
+        def fail(*_):
+            raise AssertionError("tags counted at launch")
+
+        monkeypatch.setattr(tag_index.TagIndex, "index", fail)
+        assert TrainingJobs.launch_item(backend.url, item)
+    assert (tmp_path / "tags" / "out.txt").read_text().endswith("[1] ohwx\n")
@@ -0,0 +1,25 @@
+from modules import BackendClient, TrainingJobs
+from modules.TrainingStatus import TrainingStatusWatcher
+from tests.stub_backend import StubBackend
+
+
+def test_polling_survives_bodies_that_are_not_json():
+    with StubBackend(run_polls=2, broken_polls=2) as backend:
+        backend.polls_left = backend.run_polls
+        assert TrainingStatusWatcher(backend.url).wait_polling()
+
+
+def test_polling_gives_up_on_a_backend_that_stays_broken():
+    with StubBackend(broken_polls=10) as backend:
+        assert not TrainingStatusWatcher(backend.url).wait_polling()
+
+
+def test_hung_validation_times_out(monkeypatch):
+    monkeypatch.setitem(BackendClient.ROUTE_TIMEOUTS, "/validate", 0.3)
+    errors = []
+    with StubBackend(validate_delay=2.0) as backend:
+        item = TrainingJobs.prepare_args(
+            backend.url, {"general_args": {"args": {"name": "item0"}}}, on_connection_error=errors.append
+        )
+    assert item is None
+    assert len(errors) == 1 and "in time" in errors[0]
@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'BucketUI.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.10.1
+## Created by: Qt User Interface Compiler version 6.10.3
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -15,8 +15,10 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QCheckBox, QFormLayout, QGroupBox,
-    QLabel, QSizePolicy, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QCheckBox, QFormLayout,
+    QGroupBox, QHeaderView, QLabel, QPushButton,
+    QSizePolicy, QTableWidget, QTableWidgetItem, QVBoxLayout,
+    QWidget)
 
 from modules.ScrollOnSelect import SpinBox
 
@@ -96,6 +98,45 @@ class Ui_bucket_ui(object):
 
         self.verticalLayout.addWidget(self.bucket_group)
 
+        self.preview_group = QGroupBox(bucket_ui)
+        self.preview_group.setObjectName(u"preview_group")
+        self.preview_layout = QVBoxLayout(self.preview_group)
+        self.preview_layout.setObjectName(u"preview_layout")
+        self.preview_button = QPushButton(self.preview_group)
+        self.preview_button.setObjectName(u"preview_button")
+
+        self.preview_layout.addWidget(self.preview_button)
+
+        self.preview_summary = QLabel(self.preview_group)
+        self.preview_summary.setObjectName(u"preview_summary")
+        self.preview_summary.setWordWrap(True)
+
+        self.preview_layout.addWidget(self.preview_summary)
+
+        self.preview_table = QTableWidget(self.preview_group)
+        if (self.preview_table.columnCount() < 5):
+            self.preview_table.setColumnCount(5)
+        __qtablewidgetitem = QTableWidgetItem()
+        self.preview_table.setHorizontalHeaderItem(0, __qtablewidgetitem)
+        __qtablewidgetitem1 = QTableWidgetItem()
+        self.preview_table.setHorizontalHeaderItem(1, __qtablewidgetitem1)
+        __qtablewidgetitem2 = QTableWidgetItem()
+        self.preview_table.setHorizontalHeaderItem(2, __qtablewidgetitem2)
+        __qtablewidgetitem3 = QTableWidgetItem()
+        self.preview_table.setHorizontalHeaderItem(3, __qtablewidgetitem3)
+        __qtablewidgetitem4 = QTableWidgetItem()
+        self.preview_table.setHorizontalHeaderItem(4, __qtablewidgetitem4)
+        self.preview_table.setObjectName(u"preview_table")
+        self.preview_table.setMinimumSize(QSize(0, 200))
+        self.preview_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.preview_table.setSortingEnabled(True)
+        self.preview_table.verticalHeader().setVisible(False)
+
+        self.preview_layout.addWidget(self.preview_table)
+
+
+        self.verticalLayout.addWidget(self.preview_group)
+
 
         self.retranslateUi(bucket_ui)
 
@@ -109,8 +150,9 @@ class Ui_bucket_ui(object):
         self.bucket_no_upscale.setToolTip(QCoreApplication.translate("bucket_ui", u"<html><head/><body><p>Don't Upscale Images doesn't upscale the images provided in the dataset, Additionally, it generates unique buckets to fit the images. This may result in a lot of buckets with only 1 image in them</p></body></html>", None))
 #endif // QT_CONFIG(tooltip)
         self.bucket_no_upscale.setText(QCoreApplication.translate("bucket_ui", u"Don't Upscale Images", None))
-
+#if QT_CONFIG(tooltip)
         self.multires_training.setToolTip(QCoreApplication.translate("bucket_ui", u"<html><head/><body><p>Generate smaller buckets down to minimum bucket resolution when buckets are enabled.</p></body></html>", None))
+#endif // QT_CONFIG(tooltip)
         self.multires_training.setText(QCoreApplication.translate("bucket_ui", u"Multi-Res Training", None))
 #if QT_CONFIG(tooltip)
         self.min_label.setToolTip(QCoreApplication.translate("bucket_ui", u"<html><head/><body><p>Minimum Bucket Resolution is the smallest edge of a bucket, this is paired with the Maximum Bucket Resolution to produce the bucket list.</p></body></html>", None))
@@ -133,5 +175,21 @@ class Ui_bucket_ui(object):
 #if QT_CONFIG(tooltip)
         self.steps_input.setToolTip(QCoreApplication.translate("bucket_ui", u"<html><head/><body><p>Bucket Resolution Steps is the amount of pixels between each bucket there is. You don't want this value too large, or too small, as too large would result in images having valuable data being cut off, and too small would cause overlapping and would cause the trainer to crash.</p></body></html>", None))
 #endif // QT_CONFIG(tooltip)
+        self.preview_group.setTitle(QCoreApplication.translate("bucket_ui", u"Preview", None))
+#if QT_CONFIG(tooltip)
+        self.preview_button.setToolTip(QCoreApplication.translate("bucket_ui", u"<html><head/><body><p>Reads the image sizes of every subset and shows how the images will be spread over the buckets, how much of them gets cropped and how many batches an epoch has at the current batch size.</p></body></html>", None))
+#endif // QT_CONFIG(tooltip)
+        self.preview_button.setText(QCoreApplication.translate("bucket_ui", u"Preview Buckets", None))
+        self.preview_summary.setText("")
+        ___qtablewidgetitem = self.preview_table.horizontalHeaderItem(0)
+        ___qtablewidgetitem.setText(QCoreApplication.translate("bucket_ui", u"Bucket", None))
+        ___qtablewidgetitem1 = self.preview_table.horizontalHeaderItem(1)
+        ___qtablewidgetitem1.setText(QCoreApplication.translate("bucket_ui", u"Images", None))
+        ___qtablewidgetitem2 = self.preview_table.horizontalHeaderItem(2)
+        ___qtablewidgetitem2.setText(QCoreApplication.translate("bucket_ui", u"Per Epoch", None))
+        ___qtablewidgetitem3 = self.preview_table.horizontalHeaderItem(3)
+        ___qtablewidgetitem3.setText(QCoreApplication.translate("bucket_ui", u"Batches", None))
+        ___qtablewidgetitem4 = self.preview_table.horizontalHeaderItem(4)
+        ___qtablewidgetitem4.setText(QCoreApplication.translate("bucket_ui", u"Cropped", None))
     # retranslateUi
 
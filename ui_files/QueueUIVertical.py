@@ -15,8 +15,9 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QFrame, QGridLayout, QPushButton,
-    QScrollArea, QSizePolicy, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QFrame, QGridLayout,
+    QListView, QPushButton, QSizePolicy, QVBoxLayout,
+    QWidget)
 
 from modules.LineEditHighlight import LineEditWithHighlight
 
@@ -52,23 +53,19 @@ class Ui_queue_ui(object):
         self.verticalLayout = QVBoxLayout(self.frame)
         self.verticalLayout.setObjectName(u"verticalLayout")
         self.verticalLayout.setContentsMargins(0, 0, 0, 0)
-        self.queue_scroll_area = QScrollArea(self.frame)
-        self.queue_scroll_area.setObjectName(u"queue_scroll_area")
+        self.queue_list = QListView(self.frame)
+        self.queue_list.setObjectName(u"queue_list")
         sizePolicy2 = QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         sizePolicy2.setHorizontalStretch(0)
         sizePolicy2.setVerticalStretch(1)
-        sizePolicy2.setHeightForWidth(self.queue_scroll_area.sizePolicy().hasHeightForWidth())
-        self.queue_scroll_area.setSizePolicy(sizePolicy2)
-        self.queue_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.queue_scroll_area.setWidgetResizable(True)
-        self.queue_scroll_widget = QWidget()
-        self.queue_scroll_widget.setObjectName(u"queue_scroll_widget")
-        self.queue_scroll_widget.setGeometry(QRect(0, 0, 146, 373))
-        self.verticalLayout_2 = QVBoxLayout(self.queue_scroll_widget)
-        self.verticalLayout_2.setObjectName(u"verticalLayout_2")
-        self.queue_scroll_area.setWidget(self.queue_scroll_widget)
-
-        self.verticalLayout.addWidget(self.queue_scroll_area)
+        sizePolicy2.setHeightForWidth(self.queue_list.sizePolicy().hasHeightForWidth())
+        self.queue_list.setSizePolicy(sizePolicy2)
+        self.queue_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.queue_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.queue_list.setUniformItemSizes(True)
+
+        self.verticalLayout.addWidget(self.queue_list)
 
 
         self.gridLayout.addWidget(self.frame, 1, 0, 1, 1)
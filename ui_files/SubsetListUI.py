@@ -3,7 +3,7 @@
 ################################################################################
 ## Form generated from reading UI file 'SubsetListUI.ui'
 ##
-## Created by: Qt User Interface Compiler version 6.7.1
+## Created by: Qt User Interface Compiler version 6.10.3
 ##
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
@@ -15,8 +15,10 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QHBoxLayout, QPushButton, QScrollArea,
-    QSizePolicy, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QCheckBox, QHBoxLayout,
+    QHeaderView, QProgressBar, QPushButton, QScrollArea,
+    QSizePolicy, QSplitter, QTableView, QVBoxLayout,
+    QWidget)
 
 from modules.LineEditHighlight import LineEditWithHighlight
 
@@ -33,10 +35,27 @@ class Ui_subset_list_ui(object):
         subset_list_ui.setMinimumSize(QSize(600, 300))
         self.verticalLayout_2 = QVBoxLayout(subset_list_ui)
         self.verticalLayout_2.setObjectName(u"verticalLayout_2")
+        self.add_bulk_layout = QHBoxLayout()
+        self.add_bulk_layout.setObjectName(u"add_bulk_layout")
         self.add_bulk_button = QPushButton(subset_list_ui)
         self.add_bulk_button.setObjectName(u"add_bulk_button")
 
-        self.verticalLayout_2.addWidget(self.add_bulk_button)
+        self.add_bulk_layout.addWidget(self.add_bulk_button)
+
+        self.add_bulk_recursive_enable = QCheckBox(subset_list_ui)
+        self.add_bulk_recursive_enable.setObjectName(u"add_bulk_recursive_enable")
+
+        self.add_bulk_layout.addWidget(self.add_bulk_recursive_enable)
+
+        self.add_bulk_layout.setStretch(0, 1)
+
+        self.verticalLayout_2.addLayout(self.add_bulk_layout)
+
+        self.add_bulk_progress = QProgressBar(subset_list_ui)
+        self.add_bulk_progress.setObjectName(u"add_bulk_progress")
+        self.add_bulk_progress.setValue(0)
+
+        self.verticalLayout_2.addWidget(self.add_bulk_progress)
 
         self.horizontalLayout = QHBoxLayout()
         self.horizontalLayout.setObjectName(u"horizontalLayout")
@@ -55,7 +74,21 @@ class Ui_subset_list_ui(object):
 
         self.verticalLayout_2.addLayout(self.horizontalLayout)
 
-        self.subset_scroll_area = QScrollArea(subset_list_ui)
+        self.subset_splitter = QSplitter(subset_list_ui)
+        self.subset_splitter.setObjectName(u"subset_splitter")
+        self.subset_splitter.setOrientation(Qt.Vertical)
+        self.subset_splitter.setChildrenCollapsible(False)
+        self.subset_table = QTableView(self.subset_splitter)
+        self.subset_table.setObjectName(u"subset_table")
+        self.subset_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.subset_table.setAlternatingRowColors(True)
+        self.subset_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.subset_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.subset_table.setWordWrap(False)
+        self.subset_splitter.addWidget(self.subset_table)
+        self.subset_table.horizontalHeader().setStretchLastSection(True)
+        self.subset_table.verticalHeader().setVisible(False)
+        self.subset_scroll_area = QScrollArea(self.subset_splitter)
         self.subset_scroll_area.setObjectName(u"subset_scroll_area")
         sizePolicy1 = QSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         sizePolicy1.setHorizontalStretch(0)
@@ -75,8 +108,9 @@ class Ui_subset_list_ui(object):
         self.verticalLayout = QVBoxLayout(self.subset_scroll_area_content)
         self.verticalLayout.setObjectName(u"verticalLayout")
         self.subset_scroll_area.setWidget(self.subset_scroll_area_content)
+        self.subset_splitter.addWidget(self.subset_scroll_area)
 
-        self.verticalLayout_2.addWidget(self.subset_scroll_area)
+        self.verticalLayout_2.addWidget(self.subset_splitter)
 
 
         self.retranslateUi(subset_list_ui)
@@ -90,6 +124,10 @@ class Ui_subset_list_ui(object):
         self.add_bulk_button.setToolTip(QCoreApplication.translate("subset_list_ui", u"<html><head/><body><p>Provide the folder that contains all other dataset folders in them to add all subsets</p></body></html>", None))
 #endif // QT_CONFIG(tooltip)
         self.add_bulk_button.setText(QCoreApplication.translate("subset_list_ui", u"Add All Subfolders From Folder", None))
+#if QT_CONFIG(tooltip)
+        self.add_bulk_recursive_enable.setToolTip(QCoreApplication.translate("subset_list_ui", u"<html><head/><body><p>Look through nested folders as well, every folder that holds images becomes a subset, its own subfolders are not added</p></body></html>", None))
+#endif // QT_CONFIG(tooltip)
+        self.add_bulk_recursive_enable.setText(QCoreApplication.translate("subset_list_ui", u"Nested Folders", None))
         self.add_subset_name_input.setPlaceholderText(QCoreApplication.translate("subset_list_ui", u"Subset Name", None))
         self.add_subset_button.setText(QCoreApplication.translate("subset_list_ui", u"Add Subset", None))
     # retranslateUi